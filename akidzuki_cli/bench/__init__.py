@@ -0,0 +1,14 @@
+import importlib
+
+_EXPORTS = {
+    'LoopbackSSHServer': '.server',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(module, __name__), name)
@@ -0,0 +1,230 @@
+import json
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from ..config.manager import ConfigManager
+from ..models.connection import SSHConnection
+from ..services.connection_service import ConnectionService
+from ..services.session_service import SessionService
+from ..settings import Settings
+from ..ssh.client import SSHClient
+from ..ssh.timing import MemoryTimingHistory, percentile, summarize
+from .crypto import _download
+from .inventory import generate_connections
+from .results import run_metadata
+from .server import BENCH_PASSWORD, BENCH_USER, LoopbackSSHServer
+
+BENCHMARKS = ('connect', 'fleet', 'echo', 'bulk', 'config')
+# a metric is reported as a regression when it is this much worse than the baseline
+REGRESSION_THRESHOLD = 10.0
+
+# sample counts per --rounds
+CONNECTS_PER_ROUND = 4
+ECHOES_PER_ROUND = 40
+CONFIG_OPERATIONS = 20
+
+
+def _metric(benchmark: str, metric: str, value: float, unit: str, better: str = 'lower') -> Dict[str, Any]:
+    return {"benchmark": benchmark, "metric": metric, "value": round(value, 3), "unit": unit, "better": better}
+
+
+def _connection(server: LoopbackSSHServer, name: str) -> SSHConnection:
+    return SSHConnection(name=name, host=server.host, port=server.port, user=BENCH_USER, password=BENCH_PASSWORD)
+
+
+def bench_connect(server: LoopbackSSHServer, config_manager: ConfigManager, settings: Settings,
+                  rounds: int) -> List[Dict[str, Any]]:
+    client = SSHClient(config_manager, timeout=10, settings=settings)
+    history = MemoryTimingHistory(rounds * CONNECTS_PER_ROUND)
+    client.timing_history = history
+    connection = _connection(server, "bench-connect")
+    
+    for _ in range(rounds * CONNECTS_PER_ROUND):
+        success, error, ssh_client = client.connect(connection, operation="bench")
+        if not success:
+            raise RuntimeError(f"connect failed: {error}")
+        ssh_client.close()
+    
+    records = list(history.records())
+    totals = sorted(record["total_ms"] for record in records)
+    results = [
+        _metric('connect', 'p50_ms', percentile(totals, 50), 'ms'),
+        _metric('connect', 'p90_ms', percentile(totals, 90), 'ms'),
+    ]
+    for row in summarize(records, name=connection.name):
+        if row["phase"] != "total":
+            results.append(_metric('connect', f"{row['phase']}_p50_ms", row["p50_ms"], 'ms'))
+    return results
+
+
+def bench_fleet(server: LoopbackSSHServer, config_manager: ConfigManager, settings: Settings,
+                hosts: int, jobs: int) -> List[Dict[str, Any]]:
+    service = ConnectionService(config_manager, settings)
+    service.ssh_client.timing_history = None
+    connections = [_connection(server, f"bench-fleet-{i:04d}") for i in range(hosts)]
+    
+    elapsed = []
+    failures = 0
+    started = time.perf_counter()
+    for _, success, _, elapsed_ms in service.test_connections(connections, jobs=jobs):
+        elapsed.append(elapsed_ms)
+        failures += not success
+    wall = time.perf_counter() - started
+    
+    elapsed.sort()
+    return [
+        _metric('fleet', 'hosts_per_s', hosts / wall, 'hosts/s', 'higher'),
+        _metric('fleet', 'p50_ms', percentile(elapsed, 50), 'ms'),
+        _metric('fleet', 'p90_ms', percentile(elapsed, 90), 'ms'),
+        _metric('fleet', 'failures', failures, 'count'),
+    ]
+
+
+def _open_session(server: LoopbackSSHServer, config_manager: ConfigManager, settings: Settings,
+                  name: str) -> SessionService:
+    service = SessionService(config_manager, settings)
+    service.ssh_client_wrapper.timing_history = None
+    success, error, _ = service.connect(_connection(server, name), record=False)
+    if not success:
+        raise RuntimeError(f"session failed: {error}")
+    return service
+
+
+def bench_echo(server: LoopbackSSHServer, config_manager: ConfigManager, settings: Settings,
+               rounds: int) -> List[Dict[str, Any]]:
+    service = _open_session(server, config_manager, settings, "bench-echo")
+    session = service.get_active_session()
+    try:
+        # the channel is opened like an interactive shell, but driven without a terminal
+        session.channel = session.ssh_client.invoke_shell(term='xterm-256color')
+        session.channel.settimeout(10)
+        samples = []
+        for i in range(rounds * ECHOES_PER_ROUND):
+            key = bytes([97 + i % 26])
+            started = time.perf_counter()
+            session.channel.sendall(key)
+            if session.channel.recv(64) != key:
+                raise RuntimeError("echo returned unexpected data")
+            samples.append((time.perf_counter() - started) * 1000)
+    finally:
+        service.close_session(close_connection=True)
+    
+    samples.sort()
+    return [
+        _metric('echo', 'p50_ms', percentile(samples, 50), 'ms'),
+        _metric('echo', 'p99_ms', percentile(samples, 99), 'ms'),
+    ]
+
+
+def bench_bulk(server: LoopbackSSHServer, config_manager: ConfigManager, settings: Settings,
+               rounds: int, size_mb: int) -> List[Dict[str, Any]]:
+    service = _open_session(server, config_manager, settings, "bench-bulk")
+    try:
+        transport = service.get_active_session().ssh_client.get_transport()
+        text = [_download(transport, size_mb * 1024 * 1024, True) for _ in range(rounds)]
+        binary = [_download(transport, size_mb * 1024 * 1024, False) for _ in range(rounds)]
+    finally:
+        service.close_session(close_connection=True)
+    
+    return [
+        _metric('bulk', 'text_mb_s', statistics.median(text), 'MB/s', 'higher'),
+        _metric('bulk', 'random_mb_s', statistics.median(binary), 'MB/s', 'higher'),
+    ]
+
+
+def _timed(operation: Callable[[], Any], count: int = 1) -> float:
+    started = time.perf_counter()
+    operation()
+    return (time.perf_counter() - started) * 1000 / count
+
+
+def bench_config(directory: Path, rounds: int, count: int) -> List[Dict[str, Any]]:
+    config_manager = ConfigManager(str(directory / "bench_config_ops"))
+    config_manager.append_connections(generate_connections(count))
+    names = [conn.name for conn in generate_connections(count)]
+    names = random.Random(0).sample(names, min(count, CONFIG_OPERATIONS))
+    
+    load = statistics.median(
+        _timed(lambda: sum(1 for _ in config_manager.iter_connections())) for _ in range(rounds)
+    )
+    lookup = _timed(lambda: [config_manager.get_connection_by_name(name) for name in names], len(names))
+    added = [SSHConnection(name=f"bench-added-{i}", host="192.0.2.1", user="deploy") for i in range(CONFIG_OPERATIONS)]
+    add = _timed(lambda: [config_manager.add_connection(conn) for conn in added], len(added))
+    
+    def update_all():
+        for conn in added:
+            conn.group = "updated"
+            config_manager.update_connection(conn.name, conn)
+    
+    update = _timed(update_all, len(added))
+    delete = _timed(lambda: [config_manager.delete_connection(conn.name) for conn in added], len(added))
+    
+    return [
+        _metric('config', 'load_ms', load, 'ms'),
+        _metric('config', 'lookup_ms', lookup, 'ms'),
+        _metric('config', 'add_ms', add, 'ms'),
+        _metric('config', 'update_ms', update, 'ms'),
+        _metric('config', 'delete_ms', delete, 'ms'),
+    ]
+
+
+def run_client_benchmark(benchmarks: Optional[List[str]] = None, rounds: int = 5, size_mb: int = 32,
+                         latency_ms: float = 0, hosts: int = 50, jobs: int = 8, connections: int = 2000,
+                         settings: Optional[Settings] = None) -> Dict[str, Any]:
+    import paramiko
+    
+    settings = settings or Settings()
+    benchmarks = benchmarks or list(BENCHMARKS)
+    results: List[Dict[str, Any]] = []
+    
+    with tempfile.TemporaryDirectory() as tmp, LoopbackSSHServer(latency_ms=latency_ms) as server:
+        config_manager = ConfigManager(str(Path(tmp) / "bench_ssh_config"))
+        for benchmark in benchmarks:
+            if benchmark == 'connect':
+                results += bench_connect(server, config_manager, settings, rounds)
+            elif benchmark == 'fleet':
+                results += bench_fleet(server, config_manager, settings, hosts, jobs)
+            elif benchmark == 'echo':
+                results += bench_echo(server, config_manager, settings, rounds)
+            elif benchmark == 'bulk':
+                results += bench_bulk(server, config_manager, settings, rounds, size_mb)
+            elif benchmark == 'config':
+                results += bench_config(Path(tmp), rounds, connections)
+            else:
+                raise ValueError(f"unknown benchmark: {benchmark}")
+    
+    document = run_metadata(rounds=rounds, size_mb=size_mb, latency_ms=latency_ms, hosts=hosts, jobs=jobs,
+                            connections=connections)
+    document["paramiko"] = paramiko.__version__
+    document["results"] = results
+    return document
+
+
+def load_results(path: str) -> Dict[str, Any]:
+    with open(path, 'r', encoding='utf-8') as f:
+        document = json.load(f)
+    if not isinstance(document, dict) or not isinstance(document.get("results"), list):
+        raise ValueError(f"{path} is not a client benchmark result file")
+    return document
+
+
+def compare_results(current: Dict[str, Any], baseline: Dict[str, Any],
+                    threshold: float = REGRESSION_THRESHOLD) -> List[Dict[str, Any]]:
+    # adds change_pct (positive is better) and regression to every metric found in both runs
+    previous = {(result["benchmark"], result["metric"]): result["value"] for result in baseline["results"]}
+    compared = []
+    for result in current["results"]:
+        before = previous.get((result["benchmark"], result["metric"]))
+        row = dict(result, baseline=before, change_pct=None, regression=False)
+        if before:
+            change = (result["value"] - before) / before * 100
+            if result["better"] == 'lower':
+                change = -change
+            row["change_pct"] = round(change, 1)
+            row["regression"] = change < -threshold and result["unit"] != 'count'
+        compared.append(row)
+    return compared
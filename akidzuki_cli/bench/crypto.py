@@ -0,0 +1,107 @@
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from ..config.manager import ConfigManager
+from ..models.connection import SSHConnection
+from ..settings import Settings
+from ..ssh.client import SSHClient
+from ..ssh.profiles import available_profiles
+from .server import BENCH_PASSWORD, BENCH_USER, CHUNK_SIZE, LoopbackSSHServer
+
+
+def _download(transport, size: int, text: bool) -> float:
+    channel = transport.open_session()
+    started = time.perf_counter()
+    channel.exec_command(f"download {size} text" if text else f"download {size}")
+    received = 0
+    while True:
+        data = channel.recv(CHUNK_SIZE)
+        if not data:
+            break
+        received += len(data)
+    elapsed = time.perf_counter() - started
+    channel.close()
+    return received / elapsed / (1024 * 1024)
+
+
+def _upload(transport, size: int) -> float:
+    channel = transport.open_session()
+    payload = b"\0" * CHUNK_SIZE
+    started = time.perf_counter()
+    channel.exec_command("upload")
+    remaining = size
+    while remaining > 0:
+        chunk = payload[:min(CHUNK_SIZE, remaining)]
+        channel.sendall(chunk)
+        remaining -= len(chunk)
+    channel.shutdown_write()
+    channel.recv_exit_status()
+    elapsed = time.perf_counter() - started
+    channel.close()
+    return size / elapsed / (1024 * 1024)
+
+
+def benchmark_profile(server: LoopbackSSHServer, config_manager: ConfigManager, settings: Settings,
+                      profile: str, rounds: int = 5, size_mb: int = 32, text: bool = False) -> Dict[str, Any]:
+    client = SSHClient(config_manager, timeout=10, settings=settings)
+    # loopback handshakes would skew the connect statistics of real hosts
+    client.timing_history = None
+    connection = SSHConnection(
+        name=f"bench-{profile}",
+        host=server.host,
+        port=server.port,
+        user=BENCH_USER,
+        password=BENCH_PASSWORD,
+        crypto_profile=profile
+    )
+    
+    handshakes = []
+    downloads = []
+    uploads = []
+    negotiated = {}
+    size = size_mb * 1024 * 1024
+    
+    for _ in range(rounds):
+        started = time.perf_counter()
+        success, error, ssh_client = client.connect(connection, operation="bench")
+        if not success:
+            return {"profile": profile, "error": error}
+        handshakes.append((time.perf_counter() - started) * 1000)
+        
+        transport = ssh_client.get_transport()
+        negotiated = {
+            "cipher": transport.local_cipher,
+            "mac": transport.local_mac,
+            "compression": transport.local_compression,
+        }
+        downloads.append(_download(transport, size, text))
+        uploads.append(_upload(transport, size))
+        ssh_client.close()
+    
+    return {
+        "profile": profile,
+        **negotiated,
+        "handshake_ms": round(statistics.median(handshakes), 2),
+        "handshake_ms_min": round(min(handshakes), 2),
+        "download_mb_s": round(statistics.median(downloads), 2),
+        "upload_mb_s": round(statistics.median(uploads), 2),
+        "rounds": rounds,
+        "size_mb": size_mb,
+        "payload": "text" if text else "random",
+    }
+
+
+def run_crypto_benchmark(profiles: Optional[List[str]] = None, rounds: int = 5, size_mb: int = 32,
+                         text: bool = False, settings: Optional[Settings] = None) -> List[Dict[str, Any]]:
+    settings = settings or Settings()
+    profiles = profiles or list(available_profiles(settings))
+    
+    with tempfile.TemporaryDirectory() as tmp, LoopbackSSHServer() as server:
+        config_manager = ConfigManager(str(Path(tmp) / "bench_ssh_config"))
+        return [
+            benchmark_profile(server, config_manager, settings, profile, rounds, size_mb, text)
+            for profile in profiles
+        ]
@@ -0,0 +1,58 @@
+import random
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Iterator, Union
+
+from ..config.manager import ConfigManager
+from ..models.connection import SSHConnection
+
+ENVIRONMENTS = ('prod', 'staging', 'dev', 'qa')
+ENVIRONMENT_WEIGHTS = (40, 25, 25, 10)
+ROLES = ('web', 'api', 'db', 'cache', 'queue', 'worker', 'search', 'lb', 'mon', 'ci')
+REGIONS = ('eu-west', 'eu-central', 'us-east', 'us-west', 'ap-south')
+USERS = ('deploy', 'ubuntu', 'ec2-user', 'admin', 'root')
+USER_WEIGHTS = (45, 25, 15, 10, 5)
+# timestamps are relative to a fixed date so the same seed always gives the same file
+GENERATED_AT = datetime(2026, 1, 1)
+
+
+def synthetic_connection(index: int, seed: int = 0) -> SSHConnection:
+    # every host is derived from (seed, index) alone, so ranges of indexes can be generated
+    # independently and overlap with an existing inventory on purpose
+    rng = random.Random(seed * 1_000_003 + index)
+    environment = rng.choices(ENVIRONMENTS, ENVIRONMENT_WEIGHTS)[0]
+    role = rng.choice(ROLES)
+    region = rng.choice(REGIONS)
+    
+    if rng.random() < 0.6:
+        hostname = f"{role}-{index:05d}.{environment}.{region}.example.internal"
+    else:
+        hostname = f"10.{index // 65536 % 256}.{index // 256 % 256}.{index % 256}"
+    
+    created_at = GENERATED_AT - timedelta(days=rng.uniform(90, 730))
+    last_used = None
+    if rng.random() < 0.3:
+        last_used = (GENERATED_AT - timedelta(seconds=rng.uniform(0, 90 * 86400))).replace(microsecond=0)
+    
+    return SSHConnection(
+        name=f"{role}-{environment}-{region}-{index:05d}",
+        host=hostname,
+        port=22 if rng.random() < 0.9 else 2222,
+        user=rng.choices(USERS, USER_WEIGHTS)[0],
+        identity_file=f"~/.ssh/id_ed25519_{environment}" if rng.random() < 0.3 else None,
+        proxy_jump=f"jump@bastion.{region}.example.internal" if environment == 'prod' and rng.random() < 0.15 else None,
+        remote_session="tmux" if rng.random() < 0.05 else None,
+        group=f"{environment}-{role}" if rng.random() < 0.9 else None,
+        favorite=rng.random() < 0.02,
+        last_used=last_used,
+        created_at=created_at.replace(microsecond=0),
+    )
+
+
+def generate_connections(count: int, seed: int = 0, start: int = 0) -> Iterator[SSHConnection]:
+    for index in range(start, start + count):
+        yield synthetic_connection(index, seed)
+
+
+def write_inventory(path: Union[str, Path], count: int, seed: int = 0) -> int:
+    return ConfigManager(str(path)).append_connections(generate_connections(count, seed))
@@ -0,0 +1,33 @@
+import platform
+import subprocess
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+RESULTS_VERSION = 1
+
+
+def git_commit() -> Optional[str]:
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=Path(__file__).resolve().parents[2],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True
+        )
+    except OSError:
+        return None
+    return result.stdout.strip() or None
+
+
+def run_metadata(**parameters: Any) -> Dict[str, Any]:
+    # what a result file needs to be compared with one from another commit or machine
+    return {
+        "version": RESULTS_VERSION,
+        "created_at": datetime.now().isoformat(timespec='seconds'),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "parameters": parameters,
+    }
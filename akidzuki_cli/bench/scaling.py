@@ -0,0 +1,155 @@
+import math
+import statistics
+import tempfile
+import time
+import tracemalloc
+from dataclasses import replace
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from ..config.manager import ConfigManager
+from ..services.connection_service import ConnectionService
+from ..utils.export_import import import_connections, write_connections
+from .inventory import generate_connections, synthetic_connection
+from .results import run_metadata
+
+SCALING_SIZES = [1000, 10000, 100000]
+OPERATIONS = ('list', 'filter', 'sort', 'add', 'update', 'delete', 'mark_as_used', 'import')
+# single-connection writes timed per size; each is averaged over this many calls
+WRITES_PER_ROUND = 3
+# an import brings in this share of the inventory, half of it already known
+IMPORT_SHARE = 10
+
+
+class _Inventory:
+    # one generated config plus the state the write operations need between rounds
+    
+    def __init__(self, directory: Path, size: int):
+        self.directory = directory
+        self.size = size
+        self.config_manager = ConfigManager(str(directory / f"inventory-{size}"))
+        self.config_manager.append_connections(generate_connections(size))
+        self.service = ConnectionService(self.config_manager)
+        self.next_index = size
+        self.added: List[str] = []
+        self.imports = 0
+    
+    def existing(self, offset: int):
+        return synthetic_connection((offset * 7919) % self.size)
+    
+    def new_connection(self):
+        conn = synthetic_connection(self.next_index, seed=1)
+        self.next_index += 1
+        return replace(conn, name=f"bench-{conn.name}")
+    
+    def import_file(self) -> Path:
+        # half of the records are known names (skipped), half are new
+        count = max(100, self.size // IMPORT_SHARE)
+        start = self.size - count // 2 + self.imports * count
+        path = self.directory / f"import-{self.size}-{self.imports}.ndjson"
+        self.imports += 1
+        with open(path, 'w', encoding='utf-8') as f:
+            write_connections(generate_connections(count, start=start), f)
+        return path
+
+
+def _run(inventory: _Inventory, operation: str, round_number: int,
+         writes: int = WRITES_PER_ROUND) -> Callable[[], Any]:
+    # returns the work for one measurement; preparation that should not be timed happens here
+    service = inventory.service
+    if operation == 'list':
+        return lambda: service.list_connections(sort_by=None)
+    if operation == 'filter':
+        return lambda: service.list_connections(filter_text="prod-eu", sort_by=None)
+    if operation == 'sort':
+        return lambda: service.list_connections(sort_by="last_used")
+    if operation == 'add':
+        connections = [inventory.new_connection() for _ in range(writes)]
+        inventory.added += [conn.name for conn in connections]
+        return lambda: [service.add_connection(conn) for conn in connections]
+    if operation == 'update':
+        connections = [inventory.existing(round_number * writes + i) for i in range(writes)]
+        for conn in connections:
+            conn.group = f"updated-{round_number}"
+        return lambda: [service.update_connection(conn.name, conn) for conn in connections]
+    if operation == 'mark_as_used':
+        connections = [inventory.existing(round_number * writes + i) for i in range(writes)]
+        return lambda: [service.mark_as_used(conn) for conn in connections]
+    if operation == 'delete':
+        if len(inventory.added) < writes:
+            connections = [inventory.new_connection() for _ in range(writes)]
+            inventory.config_manager.append_connections(connections)
+            inventory.added += [conn.name for conn in connections]
+        names = inventory.added[:writes]
+        del inventory.added[:writes]
+        return lambda: [service.delete_connection(name) for name in names]
+    if operation == 'import':
+        path = inventory.import_file()
+        return lambda: import_connections(inventory.config_manager, path, 'ndjson', 'skip')
+    raise ValueError(f"unknown operation: {operation}")
+
+
+def measure(inventory: _Inventory, operation: str, rounds: int) -> Dict[str, Any]:
+    calls = WRITES_PER_ROUND if operation in ('add', 'update', 'delete', 'mark_as_used') else 1
+    samples = []
+    for round_number in range(rounds):
+        work = _run(inventory, operation, round_number)
+        started = time.perf_counter()
+        work()
+        samples.append((time.perf_counter() - started) * 1000 / calls)
+    
+    # tracing slows everything down, so memory is measured in one extra call of its own
+    work = _run(inventory, operation, rounds, writes=1)
+    tracemalloc.start()
+    try:
+        work()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    
+    return {"size": inventory.size, "ms": round(statistics.median(samples), 3), "peak_kib": round(peak / 1024, 1)}
+
+
+def scaling_exponent(points: List[Dict[str, Any]]) -> Optional[float]:
+    # least-squares slope of log(time) over log(size): ~1 is linear, ~2 quadratic
+    points = [point for point in points if point["ms"] > 0]
+    if len(points) < 2:
+        return None
+    xs = [math.log(point["size"]) for point in points]
+    ys = [math.log(point["ms"]) for point in points]
+    mean_x = sum(xs) / len(xs)
+    mean_y = sum(ys) / len(ys)
+    variance = sum((x - mean_x) ** 2 for x in xs)
+    if not variance:
+        return None
+    return round(sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / variance, 2)
+
+
+def run_scaling_benchmark(sizes: Optional[List[int]] = None, operations: Optional[List[str]] = None,
+                          rounds: int = 3, progress: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+    sizes = sorted(sizes or SCALING_SIZES)
+    operations = operations or list(OPERATIONS)
+    points: Dict[str, List[Dict[str, Any]]] = {operation: [] for operation in operations}
+    generated = {}
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            if progress:
+                progress(f"Generating {size} hosts")
+            started = time.perf_counter()
+            inventory = _Inventory(Path(tmp), size)
+            generated[size] = round((time.perf_counter() - started) * 1000, 1)
+            
+            # read-only operations first, deletes after adds, import last since it grows the file
+            for operation in sorted(operations, key=OPERATIONS.index):
+                if progress:
+                    progress(f"{operation} at {size} hosts")
+                points[operation].append(measure(inventory, operation, rounds))
+    
+    document = run_metadata(sizes=sizes, rounds=rounds, writes_per_round=WRITES_PER_ROUND)
+    document["generated_ms"] = generated
+    document["results"] = [
+        {"operation": operation, "exponent": scaling_exponent(points[operation]), "points": points[operation]}
+        for operation in operations
+    ]
+    return document
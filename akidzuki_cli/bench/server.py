@@ -0,0 +1,245 @@
+import logging
+import os
+import queue
+import socket
+import threading
+import time
+import paramiko
+from typing import List, Optional
+
+
+logger = logging.getLogger(__name__)
+# Client disconnects show up as socket resets on the server side; keep them out of the console
+logging.getLogger(f"{__name__}.transport").setLevel(logging.CRITICAL)
+
+BENCH_USER = "bench"
+BENCH_PASSWORD = "bench"
+CHUNK_SIZE = 32768
+# chunks in flight per direction of a delayed connection; a full queue stops reading,
+# which pushes back on the sender the way a real bandwidth-delay window does
+RELAY_QUEUE_SIZE = 256
+
+RANDOM_PAYLOAD = os.urandom(CHUNK_SIZE)
+TEXT_PAYLOAD = (b"2026-01-21 18:32:00 INFO worker[1042]: processed request id=8f3a status=200 in 12ms\n" * 512)[:CHUNK_SIZE]
+
+
+def _close_quietly(channel: paramiko.Channel):
+    try:
+        channel.close()
+    except (EOFError, OSError, paramiko.SSHException):
+        pass
+
+
+def _relay(source: socket.socket, target: socket.socket, delay: float):
+    pending: queue.Queue = queue.Queue(RELAY_QUEUE_SIZE)
+    
+    def deliver():
+        while True:
+            due, data = pending.get()
+            if data is None:
+                break
+            wait = due - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            try:
+                target.sendall(data)
+            except OSError:
+                break
+        try:
+            target.shutdown(socket.SHUT_WR)
+        except OSError:
+            pass
+    
+    writer = threading.Thread(target=deliver, daemon=True)
+    writer.start()
+    try:
+        while True:
+            data = source.recv(CHUNK_SIZE)
+            if not data:
+                break
+            pending.put((time.monotonic() + delay, data))
+    except OSError:
+        pass
+    pending.put((0.0, None))
+    writer.join()
+
+
+class _BenchServerInterface(paramiko.ServerInterface):
+    
+    def __init__(self, server: 'LoopbackSSHServer'):
+        self.server = server
+    
+    def get_allowed_auths(self, username):
+        return "password"
+    
+    def check_auth_password(self, username, password):
+        if username == BENCH_USER and password == BENCH_PASSWORD:
+            return paramiko.AUTH_SUCCESSFUL
+        return paramiko.AUTH_FAILED
+    
+    def check_channel_request(self, kind, chanid):
+        if kind == "session":
+            return paramiko.OPEN_SUCCEEDED
+        return paramiko.OPEN_FAILED_ADMINISTRATIVELY_PROHIBITED
+    
+    def check_channel_pty_request(self, channel, term, width, height, pixelwidth, pixelheight, modes):
+        return True
+    
+    def check_channel_shell_request(self, channel):
+        self.server._spawn(self.server._echo, channel)
+        return True
+    
+    def check_channel_exec_request(self, channel, command):
+        parts = command.decode('utf-8', 'replace').split()
+        if len(parts) in (2, 3) and parts[0] == "download" and parts[1].isdigit():
+            text = len(parts) == 3 and parts[2] == "text"
+            self.server._spawn(self.server._download, channel, int(parts[1]), text)
+            return True
+        if len(parts) == 1 and parts[0] == "upload":
+            self.server._spawn(self.server._upload, channel)
+            return True
+        if len(parts) >= 1 and parts[0] == "true":
+            self.server._spawn(self.server._exit, channel, 0)
+            return True
+        return False
+
+
+class LoopbackSSHServer:
+    
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency_ms: float = 0):
+        self.host = host
+        self.port = port
+        # added round-trip time, split evenly between both directions
+        self.latency_ms = latency_ms
+        self.handshakes = 0
+        self._host_key = paramiko.ECDSAKey.generate()
+        self._sock: Optional[socket.socket] = None
+        self._transports: List[paramiko.Transport] = []
+        self._lock = threading.Lock()
+        self._running = False
+    
+    def __enter__(self) -> 'LoopbackSSHServer':
+        self.start()
+        return self
+    
+    def __exit__(self, *exc):
+        self.stop()
+    
+    def start(self):
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._sock.bind((self.host, self.port))
+        self._sock.listen(128)
+        self.port = self._sock.getsockname()[1]
+        self._running = True
+        self._spawn(self._accept_loop)
+        logger.debug(f"Loopback SSH server listening on {self.host}:{self.port}")
+    
+    def stop(self):
+        self._running = False
+        if self._sock:
+            try:
+                self._sock.close()
+            except Exception:
+                pass
+        with self._lock:
+            transports = list(self._transports)
+            self._transports.clear()
+        for transport in transports:
+            transport.close()
+    
+    def _spawn(self, target, *args):
+        thread = threading.Thread(target=target, args=args, daemon=True)
+        thread.start()
+        return thread
+    
+    def _accept_loop(self):
+        while self._running:
+            try:
+                client, _ = self._sock.accept()
+            except OSError:
+                break
+            self._spawn(self._serve_connection, client)
+    
+    def _delayed(self, client: socket.socket) -> socket.socket:
+        # the transport talks to one end of a socket pair and the other end is relayed to
+        # the client, so every byte arrives late but bulk transfers are still pipelined
+        inner, outer = socket.socketpair()
+        delay = self.latency_ms / 2000
+        self._spawn(_relay, client, outer, delay)
+        self._spawn(_relay, outer, client, delay)
+        return inner
+    
+    def _serve_connection(self, client: socket.socket):
+        client.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        if self.latency_ms > 0:
+            client = self._delayed(client)
+        transport = paramiko.Transport(client)
+        transport.set_log_channel(f"{__name__}.transport")
+        transport.add_server_key(self._host_key)
+        transport.use_compression(True)
+        with self._lock:
+            self._transports.append(transport)
+            self.handshakes += 1
+        try:
+            transport.start_server(server=_BenchServerInterface(self))
+        except Exception as e:
+            logger.debug(f"Loopback SSH server handshake failed: {e}")
+            return
+        self._drain_accepts(transport)
+    
+    def _drain_accepts(self, transport: paramiko.Transport):
+        # paramiko tracks channels weakly; keep accepted ones alive until they close
+        channels = []
+        while transport.is_active():
+            channel = transport.accept(1)
+            channels = [c for c in channels if not c.closed]
+            if channel is not None:
+                channels.append(channel)
+    
+    def _echo(self, channel: paramiko.Channel):
+        try:
+            while True:
+                data = channel.recv(CHUNK_SIZE)
+                if not data:
+                    break
+                channel.sendall(data)
+        except Exception:
+            pass
+        finally:
+            _close_quietly(channel)
+    
+    def _download(self, channel: paramiko.Channel, size: int, text: bool = False):
+        payload = TEXT_PAYLOAD if text else RANDOM_PAYLOAD
+        try:
+            remaining = size
+            while remaining > 0:
+                chunk = payload[:min(CHUNK_SIZE, remaining)]
+                channel.sendall(chunk)
+                remaining -= len(chunk)
+            channel.send_exit_status(0)
+        except Exception:
+            pass
+        finally:
+            _close_quietly(channel)
+    
+    def _upload(self, channel: paramiko.Channel):
+        received = 0
+        try:
+            while True:
+                data = channel.recv(CHUNK_SIZE)
+                if not data:
+                    break
+                received += len(data)
+            channel.sendall(str(received).encode())
+            channel.send_exit_status(0)
+        except Exception:
+            pass
+        finally:
+            _close_quietly(channel)
+    
+    def _exit(self, channel: paramiko.Channel, status: int):
+        try:
+            channel.send_exit_status(status)
+        finally:
+            _close_quietly(channel)
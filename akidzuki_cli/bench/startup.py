@@ -0,0 +1,99 @@
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+STARTUP_COMMANDS: Dict[str, List[str]] = {
+    "help": ["--help"],
+    "list": ["list"],
+    "connect": ["connect", "__akidzuki_startup_probe__"],
+}
+
+# Sum of top-level import times reported by -X importtime, in milliseconds
+STARTUP_BUDGETS_MS: Dict[str, float] = {
+    "help": 80,
+    "list": 200,
+    "connect": 350,
+}
+
+FORBIDDEN_MODULES: Dict[str, List[str]] = {
+    "help": ["rich", "paramiko", "cryptography", "keyring"],
+    "list": ["paramiko", "cryptography", "keyring"],
+    "connect": [],
+}
+
+_IMPORT_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def parse_importtime(output: str) -> List[Tuple[str, int, int]]:
+    modules = []
+    for line in output.splitlines():
+        match = _IMPORT_LINE.match(line)
+        if match:
+            depth = len(match.group(3)) // 2
+            modules.append((match.group(4), int(match.group(2)), depth))
+    return modules
+
+
+def _run_command(args: List[str], cwd: str) -> Tuple[float, List[Tuple[str, int, int]]]:
+    env = dict(os.environ)
+    package_root = str(Path(__file__).resolve().parents[2])
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [package_root, env.get("PYTHONPATH")]))
+    
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "akidzuki_cli.cli", *args],
+        cwd=cwd,
+        env=env,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True
+    )
+    wall_ms = (time.perf_counter() - started) * 1000
+    return wall_ms, parse_importtime(result.stderr)
+
+
+def benchmark_command(name: str, runs: int, cwd: str) -> Dict[str, Any]:
+    import_times = []
+    wall_times = []
+    modules: List[Tuple[str, int, int]] = []
+    
+    # first run warms the bytecode cache and is not counted
+    _run_command(STARTUP_COMMANDS[name], cwd)
+    for _ in range(runs):
+        wall_ms, modules = _run_command(STARTUP_COMMANDS[name], cwd)
+        wall_times.append(wall_ms)
+        import_times.append(sum(cumulative for _, cumulative, depth in modules if depth == 0) / 1000)
+    
+    loaded = {module.split('.')[0] for module, _, _ in modules}
+    forbidden = [module for module in FORBIDDEN_MODULES[name] if module in loaded]
+    heaviest = sorted(
+        ((module, cumulative) for module, cumulative, depth in modules if depth == 0),
+        key=lambda item: item[1],
+        reverse=True
+    )[:5]
+    import_ms = statistics.median(import_times)
+    budget_ms = STARTUP_BUDGETS_MS[name]
+    
+    return {
+        "command": name,
+        "import_ms": round(import_ms, 1),
+        "wall_ms": round(statistics.median(wall_times), 1),
+        "budget_ms": budget_ms,
+        "modules": len(modules),
+        "heaviest": [{"module": module, "ms": round(cumulative / 1000, 1)} for module, cumulative in heaviest],
+        "forbidden": forbidden,
+        "ok": import_ms <= budget_ms and not forbidden,
+    }
+
+
+def run_startup_benchmark(commands: Optional[List[str]] = None, rounds: int = 5) -> List[Dict[str, Any]]:
+    commands = commands or list(STARTUP_COMMANDS)
+    with tempfile.TemporaryDirectory() as tmp:
+        return [benchmark_command(name, rounds, tmp) for name in commands]
@@ -1,18 +1,46 @@
+from __future__ import annotations
+
 import argparse
+import json
+import logging
+import os
 import sys
-from rich.console import Console
-from rich.table import Table
+from typing import TYPE_CHECKING
+
+from .utils.profiling import PROFILE_MODES, normalize_profile_args
+
+if TYPE_CHECKING:
+    from rich.console import Console
+    from .settings import Settings
+    from .services.connection_service import ConnectionService
+    from .services.session_service import SessionService
+
 
-from .config.manager import ConfigManager
-from .services.connection_service import ConnectionService
-from .services.session_service import SessionService
-from .ssh.session import SSHSession
-from .utils.logger import setup_logging
-from .settings import Settings
+def _output_fields(args, default, available, console: Console):
+    from .utils.output import parse_fields
+    
+    try:
+        return parse_fields(args.fields, default, available)
+    except ValueError as e:
+        console.print(f"[red]{e}[/red]")
+        sys.exit(2)
 
 
 def cmd_list(args, connection_service: ConnectionService, console: Console):
-    connections = connection_service.list_connections(sort_by=args.sort)
+    if args.format != 'table':
+        from .utils.output import CONNECTION_FIELDS, LIST_DEFAULT_FIELDS, connection_record, write_records
+        
+        fields = _output_fields(args, LIST_DEFAULT_FIELDS, CONNECTION_FIELDS, console)
+        records = (
+            connection_record(conn, fields)
+            for conn in connection_service.iter_connections(group=args.group, sort_by=args.sort)
+        )
+        write_records(records, args.format, fields, header=not args.no_header)
+        return
+    
+    from rich.table import Table
+    
+    connections = connection_service.list_connections(group=args.group, sort_by=args.sort)
     
     if not connections:
         console.print("[yellow]No connections found.[/yellow]")
@@ -40,10 +68,124 @@ def cmd_list(args, connection_service: ConnectionService, console: Console):
     console.print(table)
 
 
+def _pick_connection(query: str, entries, console: Console):
+    from rich.prompt import IntPrompt
+    from rich.table import Table
+    
+    table = Table(show_header=True, header_style="bold cyan")
+    table.add_column("#", justify="right")
+    table.add_column("Name", style="cyan")
+    table.add_column("User@Host", style="white")
+    table.add_column("Group", style="dim")
+    for number, entry in enumerate(entries, 1):
+        table.add_row(str(number), entry.name, f"{entry.user}@{entry.hostname}", entry.group)
+    
+    console.print(f"[yellow]'{query}' matches several connections:[/yellow]")
+    console.print(table)
+    try:
+        choice = IntPrompt.ask("Select", choices=[str(n) for n in range(1, len(entries) + 1)], default=1,
+                               show_choices=False, console=console)
+    except (KeyboardInterrupt, EOFError):
+        return None
+    return entries[choice - 1]
+
+
+def _resolve_connection(query: str, connection_service: ConnectionService, console: Console, first: bool = False):
+    from .utils.fuzzy import is_unambiguous
+    
+    ranked = connection_service.resolve_connections(query)
+    if not ranked:
+        console.print(f"[red]Connection '{query}' not found.[/red]")
+        return None
+    
+    if first or is_unambiguous(ranked):
+        entry = ranked[0][1]
+    elif sys.stdin.isatty() and console.is_terminal:
+        entry = _pick_connection(query, [entry for _, entry in ranked], console)
+        if entry is None:
+            return None
+    else:
+        names = ", ".join(entry.name for _, entry in ranked)
+        console.print(f"[red]'{query}' is ambiguous: {names}[/red]")
+        console.print("[dim]Use a more specific name or --first.[/dim]")
+        return None
+    
+    if entry.name != query:
+        console.print(f"[dim]Resolved '{query}' to {entry.name}[/dim]")
+    return connection_service.get_connection(entry.name)
+
+
+def _select_connections(args, connection_service: ConnectionService, console: Console):
+    if args.all or args.group:
+        return connection_service.iter_connections(group=args.group, sort_by=None)
+    
+    connections = []
+    for name in args.names:
+        conn = _resolve_connection(name, connection_service, console, args.first)
+        if not conn:
+            sys.exit(1)
+        connections.append(conn)
+    return connections
+
+
 def cmd_test(args, connection_service: ConnectionService, console: Console):
-    conn = connection_service.get_connection(args.name)
+    if not args.names and not args.all and not args.group:
+        console.print("[red]Specify connection names, --group or --all.[/red]")
+        sys.exit(2)
+    
+    if args.format == 'table' and len(args.names) == 1 and not args.all and not args.group:
+        cmd_test_single(args.names[0], connection_service, console, args.first)
+        return
+    
+    connections = _select_connections(args, connection_service, console)
+    results = connection_service.test_connections(connections, jobs=args.jobs)
+    if args.metrics_file:
+        results = _record_results(results)
+    failed = 0
+    
+    if args.format != 'table':
+        from .utils.output import (
+            CONNECTION_FIELDS, TEST_DEFAULT_FIELDS, TEST_RESULT_FIELDS, connection_record, write_records
+        )
+        
+        fields = _output_fields(args, TEST_DEFAULT_FIELDS, CONNECTION_FIELDS + TEST_RESULT_FIELDS, console)
+        
+        def records():
+            nonlocal failed
+            for conn, success, message, elapsed_ms in results:
+                failed += not success
+                extra = {"ok": success, "message": message, "elapsed_ms": round(elapsed_ms, 1)}
+                yield connection_record(conn, fields, extra)
+        
+        write_records(records(), args.format, fields, header=not args.no_header, flush=True)
+    else:
+        total = 0
+        for conn, success, message, elapsed_ms in results:
+            total += 1
+            failed += not success
+            mark = "[green]✓[/green]" if success else "[red]✗[/red]"
+            console.print(f"{mark} {conn.name} ({conn.hostname}:{conn.port}) {message} [dim]{elapsed_ms:.0f} ms[/dim]")
+        console.print(f"\n{total - failed} ok, {failed} failed")
+    
+    if args.metrics_file:
+        from .utils.metrics import get_metrics
+        get_metrics().write_textfile(args.metrics_file)
+    
+    if failed:
+        sys.exit(1)
+
+
+def _record_results(results):
+    from .services.monitor_service import record_host
+    
+    for conn, success, message, elapsed_ms in results:
+        record_host(conn, success, elapsed_ms)
+        yield conn, success, message, elapsed_ms
+
+
+def cmd_test_single(name: str, connection_service: ConnectionService, console: Console, first: bool = False):
+    conn = _resolve_connection(name, connection_service, console, first)
     if not conn:
-        console.print(f"[red]Connection '{args.name}' not found.[/red]")
         return
     
     console.print(f"[cyan]Testing connection: {conn.name}[/cyan]")
@@ -59,17 +201,21 @@ def cmd_test(args, connection_service: ConnectionService, console: Console):
         sys.exit(1)
 
 
-def cmd_connect(args, connection_service: ConnectionService, session_service: SessionService, console: Console):
-    conn = connection_service.get_connection(args.name)
+def cmd_connect(args, connection_service: ConnectionService, console: Console):
+    from .services.session_service import SessionService
+    
+    conn = _resolve_connection(args.name, connection_service, console, args.first)
     if not conn:
-        console.print(f"[red]Connection '{args.name}' not found.[/red]")
         sys.exit(1)
     
     console.print(f"[cyan]Connecting to {conn.name}...[/cyan]")
     console.print(f"Host: {conn.hostname}:{conn.port}")
     console.print()
     
-    success, error, session = session_service.connect(conn)
+    record = True if args.record else None
+    record_input = True if args.record_input else None
+    session_service = SessionService(connection_service.config_manager, connection_service.settings)
+    success, error, session = session_service.connect(conn, record=record, record_input=record_input)
     
     if not success:
         console.print(f"[red]Connection failed: {error}[/red]")
@@ -82,42 +228,738 @@ def cmd_connect(args, connection_service: ConnectionService, session_service: Se
     console.print()
     
     try:
-        session.start_interactive_shell()
+        session_service.run_interactive(session)
     except KeyboardInterrupt:
         pass
     finally:
         session.close()
+    
+    if session.recorder:
+        console.print(f"\n[dim]Session recorded to {session.recorder.path}[/dim]")
+
+
+def cmd_replay(args, console: Console):
+    from .ssh.recorder import replay_recording
+    
+    try:
+        replay_recording(args.file, seek=args.seek, speed=args.speed, idle_limit=args.idle_limit)
+    except KeyboardInterrupt:
+        pass
+    except (OSError, ValueError, RuntimeError) as e:
+        console.print(f"[red]Failed to replay recording: {e}[/red]")
+        sys.exit(1)
+
+
+def cmd_bench(args, settings: Settings, console: Console):
+    if args.suite == 'startup':
+        cmd_bench_startup(args, console)
+        return
+    if args.suite == 'client':
+        cmd_bench_client(args, settings, console)
+        return
+    if args.suite == 'scaling':
+        cmd_bench_scaling(args, console)
+        return
+    if args.suite == 'inventory':
+        cmd_bench_inventory(args, console)
+        return
+    
+    from rich.table import Table
+    from .bench.crypto import run_crypto_benchmark
+    
+    profiles = [p.strip() for p in args.profiles.split(',')] if args.profiles else None
+    with console.status("[bold green]Running crypto benchmark against a loopback SSH server..."):
+        results = run_crypto_benchmark(profiles, rounds=args.rounds, size_mb=args.size_mb,
+                                       text=args.payload == 'text', settings=settings)
+    
+    table = Table(show_header=True, header_style="bold cyan")
+    table.add_column("Profile", style="cyan")
+    table.add_column("Cipher", style="white")
+    table.add_column("MAC", style="white")
+    table.add_column("Compression", style="white")
+    table.add_column("Handshake (ms)", justify="right")
+    table.add_column("Download (MB/s)", justify="right")
+    table.add_column("Upload (MB/s)", justify="right")
+    
+    for result in results:
+        if "error" in result:
+            table.add_row(result["profile"], f"[red]{result['error']}[/red]", "", "", "", "", "")
+            continue
+        table.add_row(
+            result["profile"],
+            result["cipher"],
+            result["mac"],
+            result["compression"],
+            f"{result['handshake_ms']:.1f}",
+            f"{result['download_mb_s']:.1f}",
+            f"{result['upload_mb_s']:.1f}"
+        )
+    
+    console.print(table)
+    
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        console.print(f"[dim]Results written to {args.json}[/dim]")
+
+
+def cmd_bench_startup(args, console: Console):
+    from rich.table import Table
+    from .bench.startup import run_startup_benchmark
+    
+    with console.status("[bold green]Measuring CLI startup..."):
+        results = run_startup_benchmark(rounds=args.rounds)
+    
+    table = Table(show_header=True, header_style="bold cyan")
+    table.add_column("Command", style="cyan")
+    table.add_column("Imports (ms)", justify="right")
+    table.add_column("Budget (ms)", justify="right")
+    table.add_column("Wall (ms)", justify="right")
+    table.add_column("Heaviest imports", style="dim")
+    table.add_column("Status")
+    
+    for result in results:
+        heaviest = ", ".join(f"{item['module']} {item['ms']:.0f}" for item in result["heaviest"][:2])
+        if result["forbidden"]:
+            status = f"[red]loads {', '.join(result['forbidden'])}[/red]"
+        elif not result["ok"]:
+            status = "[red]over budget[/red]"
+        else:
+            status = "[green]ok[/green]"
+        table.add_row(
+            result["command"],
+            f"{result['import_ms']:.1f}",
+            f"{result['budget_ms']:.0f}",
+            f"{result['wall_ms']:.1f}",
+            heaviest,
+            status
+        )
+    
+    console.print(table)
+    
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        console.print(f"[dim]Results written to {args.json}[/dim]")
+    
+    if not all(result["ok"] for result in results):
+        sys.exit(1)
+
+
+def cmd_bench_client(args, settings: Settings, console: Console):
+    from rich.table import Table
+    from .bench.client import BENCHMARKS, compare_results, load_results, run_client_benchmark
+    
+    benchmarks = [b.strip() for b in args.only.split(',')] if args.only else None
+    unknown = [b for b in benchmarks or [] if b not in BENCHMARKS]
+    if unknown:
+        console.print(f"[red]Unknown benchmarks: {', '.join(unknown)} (available: {', '.join(BENCHMARKS)})[/red]")
+        sys.exit(2)
+    
+    baseline = None
+    if args.baseline:
+        try:
+            baseline = load_results(args.baseline)
+        except (OSError, ValueError) as e:
+            console.print(f"[red]Cannot read baseline: {e}[/red]")
+            sys.exit(2)
+    
+    with console.status("[bold green]Running client benchmarks against a loopback SSH server..."):
+        try:
+            document = run_client_benchmark(
+                benchmarks, rounds=args.rounds, size_mb=args.size_mb, latency_ms=args.latency_ms,
+                hosts=args.hosts, jobs=args.jobs, connections=args.connections, settings=settings
+            )
+        except RuntimeError as e:
+            console.print(f"[red]Benchmark failed: {e}[/red]")
+            sys.exit(1)
+    
+    results = compare_results(document, baseline, args.threshold) if baseline else document["results"]
+    if baseline and baseline.get("parameters") != document["parameters"]:
+        console.print(f"[yellow]Baseline was run with different parameters: {baseline.get('parameters')}[/yellow]")
+    
+    table = Table(show_header=True, header_style="bold cyan")
+    table.add_column("Benchmark", style="cyan")
+    table.add_column("Metric", style="white")
+    table.add_column("Value", justify="right")
+    table.add_column("Unit", style="dim")
+    if baseline:
+        table.add_column(f"vs {baseline.get('commit') or 'baseline'}", justify="right")
+    
+    for result in results:
+        row = [result["benchmark"], result["metric"], f"{result['value']:.2f}", result["unit"]]
+        if baseline:
+            change = result["change_pct"]
+            if change is None:
+                row.append("[dim]-[/dim]")
+            else:
+                color = "red" if result["regression"] else "green" if change > 0 else "white"
+                row.append(f"[{color}]{change:+.1f}%[/{color}]")
+        table.add_row(*row)
+    
+    console.print(table)
+    
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(document, f, indent=2)
+        console.print(f"[dim]Results written to {args.json}[/dim]")
+    
+    if baseline and any(result["regression"] for result in results):
+        sys.exit(1)
+
 
+def _size_label(size: int) -> str:
+    if size >= 1000 and size % 1000 == 0:
+        return f"{size // 1000}k"
+    return str(size)
 
-def main_cli():
+
+def cmd_bench_scaling(args, console: Console):
+    from rich.table import Table
+    from .bench.scaling import OPERATIONS, run_scaling_benchmark
+    
+    operations = [op.strip() for op in args.only.split(',')] if args.only else None
+    unknown = [op for op in operations or [] if op not in OPERATIONS]
+    if unknown:
+        console.print(f"[red]Unknown operations: {', '.join(unknown)} (available: {', '.join(OPERATIONS)})[/red]")
+        sys.exit(2)
+    try:
+        sizes = [int(size) for size in args.sizes.split(',')] if args.sizes else None
+    except ValueError:
+        console.print(f"[red]Invalid --sizes: {args.sizes}[/red]")
+        sys.exit(2)
+    
+    with console.status("[bold green]Measuring config scaling...") as status:
+        document = run_scaling_benchmark(
+            sizes, operations, rounds=args.rounds,
+            progress=lambda message: status.update(f"[bold green]Measuring config scaling: {message}...")
+        )
+    
+    sizes = document["parameters"]["sizes"]
+    table = Table(show_header=True, header_style="bold cyan")
+    table.add_column("Operation", style="cyan")
+    for size in sizes:
+        table.add_column(f"{_size_label(size)} (ms)", justify="right")
+    table.add_column("Scaling", justify="right")
+    table.add_column(f"Peak {_size_label(sizes[-1])}", justify="right")
+    
+    for result in document["results"]:
+        exponent = result["exponent"]
+        if exponent is None:
+            scaling = "[dim]-[/dim]"
+        else:
+            color = "red" if exponent >= 1.5 else "yellow" if exponent >= 1.15 else "green"
+            scaling = f"[{color}]n^{exponent:.2f}[/{color}]"
+        table.add_row(
+            result["operation"],
+            *(f"{point['ms']:.2f}" for point in result["points"]),
+            scaling,
+            f"{result['points'][-1]['peak_kib'] / 1024:.1f} MiB"
+        )
+    
+    console.print(table)
+    console.print("[dim]Writes are per call; scaling is the slope of time over inventory size on a log-log scale.[/dim]")
+    
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(document, f, indent=2)
+        console.print(f"[dim]Results written to {args.json}[/dim]")
+
+
+def cmd_bench_inventory(args, console: Console):
+    from .bench.inventory import write_inventory
+    
+    if not args.output:
+        console.print("[red]bench inventory needs --output FILE[/red]")
+        sys.exit(2)
+    if os.path.exists(args.output) and os.path.getsize(args.output) > 0:
+        console.print(f"[red]{args.output} already exists[/red]")
+        sys.exit(1)
+    
+    count = write_inventory(args.output, args.hosts, seed=args.seed)
+    console.print(f"[green]Generated {count} connections in {args.output}[/green]")
+
+
+def _bundle_passphrase(console: Console, confirm: bool = False) -> str:
+    from getpass import getpass
+    
+    passphrase = os.environ.get('AKIDZUKI_BUNDLE_PASSPHRASE')
+    if passphrase:
+        return passphrase
+    
+    passphrase = getpass("Bundle passphrase: ")
+    if confirm and getpass("Repeat passphrase: ") != passphrase:
+        console.print("[red]Passphrases do not match[/red]")
+        sys.exit(1)
+    if not passphrase:
+        console.print("[red]A passphrase is required[/red]")
+        sys.exit(1)
+    return passphrase
+
+
+def cmd_export_bundle(args, connection_service: ConnectionService, console: Console):
+    from .utils.bundle import export_bundle
+    
+    passphrase = _bundle_passphrase(console, confirm=True)
+    try:
+        with console.status("[bold green]Writing encrypted bundle...") as status:
+            count, secrets = export_bundle(connection_service.config_manager, args.file, passphrase,
+                                           secrets=not args.no_secrets,
+                                           progress=lambda n: status.update(f"[bold green]Exported {n} connections..."))
+    except (OSError, ValueError) as e:
+        console.print(f"[red]Export failed: {e}[/red]")
+        sys.exit(1)
+    
+    if args.file != '-':
+        console.print(f"[green]Exported {count} connections and {secrets} passwords to {args.file}[/green]")
+
+
+def cmd_export(args, connection_service: ConnectionService, console: Console):
+    from .utils.bundle import BUNDLE_SUFFIX
+    from .utils.export_import import detect_format, export_connections
+    
+    output_format = args.data_format or detect_format(args.file, default='ndjson')
+    if args.data_format == 'bundle' or (args.data_format is None and args.file.endswith(BUNDLE_SUFFIX)):
+        cmd_export_bundle(args, connection_service, console)
+        return
+    if args.file == '-':
+        export_connections(connection_service.config_manager, '-', output_format)
+        return
+    
+    try:
+        with console.status("[bold green]Exporting connections...") as status:
+            count = export_connections(connection_service.config_manager, args.file, output_format,
+                                       progress=lambda n: status.update(f"[bold green]Exported {n} connections..."))
+    except OSError as e:
+        console.print(f"[red]Export failed: {e}[/red]")
+        sys.exit(1)
+    
+    console.print(f"[green]Exported {count} connections to {args.file} ({output_format})[/green]")
+
+
+def cmd_import(args, connection_service: ConnectionService, console: Console):
+    from .utils.bundle import import_bundle, is_bundle
+    from .utils.export_import import import_connections
+    
+    bundle = args.data_format == 'bundle' or (args.data_format is None and is_bundle(args.file))
+    passphrase = _bundle_passphrase(console) if bundle else None
+    try:
+        with console.status("[bold green]Importing connections...") as status:
+            progress = lambda n: status.update(f"[bold green]Read {n} records...")
+            if bundle:
+                report = import_bundle(connection_service.config_manager, args.file, passphrase, args.merge,
+                                       progress=progress)
+            else:
+                report = import_connections(connection_service.config_manager, args.file, args.data_format,
+                                            args.merge, progress=progress)
+    except (OSError, ValueError) as e:
+        console.print(f"[red]Import failed: {e}[/red]")
+        sys.exit(1)
+    
+    source = 'stdin' if args.file == '-' else args.file
+    for error in report.errors[:args.max_errors]:
+        name = f" ({error.name})" if error.name else ""
+        console.print(f"[red]{source}:{error.line}{name}: {error.message}[/red]", highlight=False)
+    if len(report.errors) > args.max_errors:
+        console.print(f"[red]... and {len(report.errors) - args.max_errors} more errors[/red]")
+    
+    renamed = f" ({report.renamed} renamed)" if report.renamed else ""
+    secrets = f", restored {report.secrets} passwords" if bundle else ""
+    console.print(f"[green]Imported {report.imported}[/green]{renamed}, updated {report.updated}, "
+                  f"skipped {report.skipped}, {report.conflicts} name conflicts, {len(report.errors)} errors{secrets}")
+    if report.errors:
+        sys.exit(1)
+
+
+def cmd_sync(args, connection_service: ConnectionService, console: Console):
+    from rich.markup import escape
+    from .services.sync_service import SyncService, changed_fields
+    
+    sync_service = SyncService(connection_service.config_manager)
+    try:
+        with console.status("[bold green]Comparing inventories..."):
+            plan = sync_service.plan(args.source, args.data_format)
+    except (OSError, UnicodeDecodeError, ValueError) as e:
+        console.print(f"[red]Sync failed: {e}[/red]")
+        sys.exit(1)
+    
+    source = 'stdin' if args.source == '-' else args.source
+    for error in plan.report.errors[:20]:
+        console.print(f"[red]{source}:{error.line}: {error.message}[/red]", highlight=False)
+    
+    markers = {'add': "[green]+[/green]", 'remove': "[red]-[/red]", 'update': "[yellow]~[/yellow]",
+               'conflict': "[magenta]![/magenta]"}
+    for change in plan.changes[:args.show]:
+        conn = change.remote or change.local
+        detail = f"{conn.user}@{conn.hostname}:{conn.port}"
+        if change.action == 'update' or change.remote_action == 'update':
+            detail = ", ".join(f"{field}: {getattr(change.local, field)} -> {getattr(change.remote, field)}"
+                               for field in changed_fields(change.local, change.remote))
+        elif change.remote_action == 'remove':
+            detail = "removed upstream, changed here"
+        elif change.remote_action == 'add':
+            detail = "changed upstream, deleted here"
+        console.print(f"{markers[change.action]} {escape(change.name)}  [dim]{escape(detail)}[/dim]", highlight=False)
+    if len(plan.changes) > args.show:
+        console.print(f"[dim]... and {len(plan.changes) - args.show} more[/dim]")
+    
+    console.print(f"{plan.count('add')} to add, {plan.count('update')} to update, {plan.count('remove')} to remove, "
+                  f"{plan.count('conflict')} conflicts, {plan.unchanged} unchanged, {plan.local_only} local only"
+                  + (" (first sync)" if plan.first_sync else ""))
+    if plan.report.errors:
+        console.print("[red]Not applied: the source has unreadable records[/red]")
+        sys.exit(1)
+    if args.dry_run:
+        return
+    
+    applied = sync_service.apply(plan, prefer=args.prefer)
+    kept = "" if args.prefer == 'remote' or not plan.count('conflict') else ", conflicts kept local"
+    console.print(f"[green]Applied {applied} changes{kept}[/green]")
+
+
+def cmd_stats(args, settings: Settings, console: Console):
+    from .ssh.timing import STATS_FIELDS, TimingHistory, summarize
+    
+    history_file = settings.get_timing_history_file()
+    if not history_file:
+        console.print("[yellow]Connect timing history is disabled (timing_history_file)[/yellow]")
+        return
+    
+    rows = summarize(TimingHistory(history_file).records(), args.name, args.op)
+    if args.name is None and args.top:
+        totals = [row for row in rows if row["phase"] == "total"][:args.top]
+        rows = totals + [row for row in rows if row["phase"] != "total"]
+    
+    if args.format != 'table':
+        from .utils.output import write_records
+        
+        fields = _output_fields(args, STATS_FIELDS, STATS_FIELDS, console)
+        write_records(({field: row[field] for field in fields} for row in rows), args.format, fields,
+                      header=not args.no_header)
+        return
+    
+    if not rows:
+        console.print("[yellow]No timings recorded yet.[/yellow]" if args.name is None
+                      else f"[yellow]No timings recorded for {args.name}.[/yellow]")
+        return
+    
+    from rich.table import Table
+    
+    table = Table(show_header=True, header_style="bold cyan")
+    table.add_column("Connection", style="cyan")
+    table.add_column("Phase", style="white")
+    table.add_column("Count", justify="right")
+    table.add_column("Failed", justify="right")
+    table.add_column("p50 (ms)", justify="right")
+    table.add_column("p90 (ms)", justify="right")
+    table.add_column("p99 (ms)", justify="right")
+    table.add_column("Max (ms)", justify="right")
+    
+    previous = None
+    for row in rows:
+        if previous is not None and previous["phase"] == "total" and row["phase"] != "total":
+            table.add_section()
+        table.add_row(
+            row["connection"],
+            row["phase"],
+            str(row["count"]),
+            f"[red]{row['failures']}[/red]" if row["failures"] else "0",
+            f"{row['p50_ms']:.1f}",
+            f"{row['p90_ms']:.1f}",
+            f"{row['p99_ms']:.1f}",
+            f"{row['max_ms']:.1f}"
+        )
+        previous = row
+    
+    console.print(table)
+
+
+def _parse_listen(value: str):
+    host, _, port = value.rpartition(':')
+    if not port.isdigit():
+        raise ValueError(f"expected HOST:PORT or PORT, got {value!r}")
+    return host.strip('[]') or '127.0.0.1', int(port)
+
+
+def cmd_monitor(args, connection_service: ConnectionService, console: Console):
+    import time
+    from .services.monitor_service import MonitorService
+    from .utils.metrics import get_metrics, serve_metrics
+    
+    if not args.listen and not args.textfile and not args.once:
+        console.print("[red]Specify --listen, --textfile or --once.[/red]")
+        sys.exit(2)
+    
+    monitor = MonitorService(connection_service, check=args.check, interval=args.interval, jobs=args.jobs,
+                             group=args.group, textfile=args.textfile)
+    
+    if args.once:
+        up, down = monitor.run_cycle()
+        if not args.textfile:
+            sys.stdout.write(get_metrics().render())
+        console.print(f"{up} up, {down} down")
+        if down:
+            sys.exit(1)
+        return
+    
+    server = None
+    if args.listen:
+        try:
+            host, port = _parse_listen(args.listen)
+            server = serve_metrics(host, port)
+        except (OSError, ValueError) as e:
+            console.print(f"[red]Cannot listen on {args.listen}: {e}[/red]")
+            sys.exit(1)
+        console.print(f"[cyan]Serving metrics on http://{host}:{server.server_address[1]}/metrics[/cyan]")
+    if args.textfile:
+        console.print(f"[cyan]Writing metrics to {args.textfile}[/cyan]")
+    console.print(f"[dim]{args.check} check every {monitor.interval:g} s, {monitor.jobs} in parallel; "
+                  f"Ctrl+C to stop[/dim]")
+    
+    def report(up: int, down: int):
+        style = "red" if down else "green"
+        console.print(f"[{style}]{time.strftime('%H:%M:%S')} {up} up, {down} down[/{style}]")
+    
+    try:
+        monitor.run(on_cycle=report)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        monitor.stop()
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+
+
+def cmd_completion(args):
+    from .config.manager import ConfigManager
+    from .settings import Settings
+    from .utils.completion import completion_script
+    
+    config_manager = ConfigManager(args.config or Settings().get_config_path())
+    if args.shell == 'index':
+        config_manager.write_index()
+        print(config_manager.index_path.resolve())
+        return
+    
+    if not config_manager.index_is_current():
+        config_manager.write_index()
+    sys.stdout.write(completion_script(args.shell, config_manager.config_path, config_manager.index_path))
+
+
+def _add_output_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument('--format', choices=['table', 'json', 'ndjson', 'tsv'],
+                        help='Output format (default: table on a terminal, tsv otherwise)')
+    parser.add_argument('--fields', help='Comma-separated fields for json/ndjson/tsv output, or "all"')
+    parser.add_argument('--no-header', action='store_true', help='Omit the TSV header line')
+
+
+def _add_profile_argument(parser: argparse.ArgumentParser, default):
+    parser.add_argument('--profile', choices=PROFILE_MODES, default=default, metavar='{cpu,alloc}',
+                        help='Profile the run with cProfile (--profile, --profile cpu) or tracemalloc '
+                             '(--profile alloc) and print a summary on exit')
+
+
+def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="Akidzuki - SSH Connection Manager CLI")
+    _add_profile_argument(parser, None)
     subparsers = parser.add_subparsers(dest='command', help='Command to execute')
     
     list_parser = subparsers.add_parser('list', help='List all connections')
-    list_parser.add_argument('--sort', choices=['name', 'host', 'last_used', 'group'], default='name', help='Sort order')
+    list_parser.add_argument('--sort', choices=['name', 'host', 'last_used', 'group', 'none'], default='name',
+                             help='Sort order (none keeps file order and streams without buffering)')
+    list_parser.add_argument('--group', help='Only connections in this group')
+    _add_output_arguments(list_parser)
     
-    test_parser = subparsers.add_parser('test', help='Test a connection')
-    test_parser.add_argument('name', help='Connection name')
+    test_parser = subparsers.add_parser('test', help='Test one or more connections')
+    test_parser.add_argument('names', nargs='*', help='Connection names')
+    test_parser.add_argument('--all', action='store_true', help='Test every connection')
+    test_parser.add_argument('--group', help='Test every connection in this group')
+    test_parser.add_argument('--jobs', type=int, default=8, help='Connections tested in parallel')
+    test_parser.add_argument('--first', action='store_true', help='Use the best match when a name is ambiguous')
+    test_parser.add_argument('--metrics-file', help='Also write the results as a Prometheus textfile')
+    _add_output_arguments(test_parser)
     
     connect_parser = subparsers.add_parser('connect', help='Connect to a server')
-    connect_parser.add_argument('name', help='Connection name')
+    connect_parser.add_argument('name', help='Connection name, or part of a name, host or user@host')
+    connect_parser.add_argument('--first', action='store_true', help='Use the best match when the name is ambiguous')
+    connect_parser.add_argument('--record', action='store_true', help='Record the session (asciicast v2)')
+    connect_parser.add_argument('--record-input', action='store_true', help='Also record keyboard input')
+    
+    replay_parser = subparsers.add_parser('replay', help='Replay a recorded session')
+    replay_parser.add_argument('file', help='Recording file (.cast, .cast.gz, .cast.zst)')
+    replay_parser.add_argument('--seek', type=float, default=0.0, help='Start playback at this offset (seconds)')
+    replay_parser.add_argument('--speed', type=float, default=1.0, help='Playback speed multiplier')
+    replay_parser.add_argument('--idle-limit', type=float, default=None, help='Cap pauses to this many seconds')
+    
+    bench_parser = subparsers.add_parser('bench', help='Run built-in benchmarks against a loopback SSH server')
+    bench_parser.add_argument('suite', choices=['crypto', 'startup', 'client', 'scaling', 'inventory'],
+                              help="Benchmark suite, or 'inventory' to generate a synthetic config file")
+    bench_parser.add_argument('--profiles', help='Comma-separated crypto profiles (default: all)')
+    bench_parser.add_argument('--rounds', type=int, default=5, help='Rounds per profile or command')
+    bench_parser.add_argument('--size-mb', type=int, default=32, help='Bulk transfer size per round')
+    bench_parser.add_argument('--payload', choices=['random', 'text'], default='random', help='Bulk payload type')
+    bench_parser.add_argument('--json', help='Write results to a JSON file')
+    bench_parser.add_argument('--only', help='client, scaling: comma-separated benchmarks or operations to run')
+    bench_parser.add_argument('--latency-ms', type=float, default=0, help='client: round-trip time added by the server')
+    bench_parser.add_argument('--hosts', type=int, default=50,
+                              help='client: connections tested by the fleet benchmark; inventory: hosts to generate')
+    bench_parser.add_argument('--jobs', type=int, default=8, help='client: parallel tests in the fleet benchmark')
+    bench_parser.add_argument('--connections', type=int, default=2000, help='client: config size for config operations')
+    bench_parser.add_argument('--baseline', help='client: compare with an earlier --json result file')
+    bench_parser.add_argument('--threshold', type=float, default=10.0,
+                              help='client: percent change that counts as a regression (default: 10)')
+    bench_parser.add_argument('--sizes', help='scaling: comma-separated inventory sizes (default: 1000,10000,100000)')
+    bench_parser.add_argument('--output', help='inventory: config file to write')
+    bench_parser.add_argument('--seed', type=int, default=0, help='inventory: random seed')
+    
+    export_parser = subparsers.add_parser('export', help='Export connections as JSON, NDJSON or an encrypted bundle')
+    export_parser.add_argument('file', nargs='?', default='-', help='Output file, or - for stdout (default)')
+    export_parser.add_argument('--format', dest='data_format', choices=['json', 'ndjson', 'bundle'],
+                               help='Format (default: from the file extension, ndjson for stdout)')
+    export_parser.add_argument('--no-secrets', action='store_true', help='Leave keyring passwords out of a bundle')
+    
+    import_parser = subparsers.add_parser('import', help='Import connections from JSON, NDJSON, CSV or an SSH config')
+    import_parser.add_argument('file', help='Input file, or - for stdin')
+    import_parser.add_argument('--format', dest='data_format', choices=['json', 'ndjson', 'csv', 'ssh_config', 'bundle'],
+                               help='Format (default: detected from the first line)')
+    import_parser.add_argument('--merge', choices=['skip', 'overwrite', 'rename', 'update-metadata'], default='skip',
+                               help='What to do with known hosts and taken names (default: skip)')
+    import_parser.add_argument('--max-errors', type=int, default=20, help='Record errors to print')
+    
+    sync_parser = subparsers.add_parser('sync', help='Sync with a shared inventory (three-way merge)')
+    sync_parser.add_argument('source', help='Shared inventory: JSON, NDJSON, CSV or SSH config file, or - for stdin')
+    sync_parser.add_argument('--format', dest='data_format', choices=['json', 'ndjson', 'csv', 'ssh_config'],
+                             help='Format (default: detected from the first line)')
+    sync_parser.add_argument('--dry-run', action='store_true', help='Only show what would change')
+    sync_parser.add_argument('--prefer', choices=['local', 'remote'], default='local',
+                             help='Which side wins when both changed a connection (default: local)')
+    sync_parser.add_argument('--show', type=int, default=50, help='Changes to list')
+    
+    stats_parser = subparsers.add_parser('stats', help='Connect latency percentiles per connection and phase')
+    stats_parser.add_argument('name', nargs='?', help='Only this connection, broken down by phase')
+    stats_parser.add_argument('--op', choices=['connect', 'test', 'reconnect', 'shell', 'exec'],
+                              help='Only this kind of operation')
+    stats_parser.add_argument('--top', type=int, default=20, help='Slowest connections to list (0 for all)')
+    _add_output_arguments(stats_parser)
+    
+    monitor_parser = subparsers.add_parser('monitor',
+                                           help='Check the inventory periodically and export Prometheus metrics')
+    monitor_parser.add_argument('--group', help='Only connections in this group')
+    monitor_parser.add_argument('--check', choices=['tcp', 'ssh'], default='tcp',
+                                help='tcp: open the port; ssh: authenticate like test (default: tcp)')
+    monitor_parser.add_argument('--interval', type=float, help='Seconds between checks (default: probe_interval)')
+    monitor_parser.add_argument('--jobs', type=int, help='Hosts checked in parallel (default: probe_concurrency)')
+    monitor_parser.add_argument('--listen', help='Serve /metrics on HOST:PORT (e.g. 127.0.0.1:9712)')
+    monitor_parser.add_argument('--textfile', help='Write metrics to this file after every check (node_exporter)')
+    monitor_parser.add_argument('--once', action='store_true',
+                                help='Check once and exit; prints the metrics unless --textfile is given')
     
-    args = parser.parse_args()
+    completion_parser = subparsers.add_parser('completion', help='Print a shell completion script')
+    completion_parser.add_argument('shell', choices=['bash', 'zsh', 'fish', 'index'],
+                                   help='Target shell, or "index" to rebuild the completion index')
+    completion_parser.add_argument('--config', help='SSH config file (default: from settings)')
+    
+    # accepted after the subcommand as well; SUPPRESS keeps a subcommand from resetting it
+    for name, subparser in subparsers.choices.items():
+        if name != 'completion':
+            _add_profile_argument(subparser, argparse.SUPPRESS)
+    
+    return parser
+
+
+def main_cli(argv=None):
+    # rich, paramiko and keyring are imported inside the commands that need them,
+    # so --help and argument errors return before any of them is loaded
+    parser = build_parser()
+    args = parser.parse_args(normalize_profile_args(sys.argv[1:] if argv is None else list(argv)))
+    
+    if args.command is None and not args.profile:
+        parser.print_help()
+        return
+    
+    if args.command == 'completion':
+        cmd_completion(args)
+        return
+    
+    if args.profile:
+        from .settings import Settings
+        from .utils.profiling import Profiler
+        
+        with Profiler(args.profile, args.command or 'menu', Settings().get_profile_dir()):
+            run_command(args)
+        return
+    
+    run_command(args)
+
+
+def run_command(args):
+    if args.command is None:
+        from .main import run_menu
+        run_menu()
+        return
+    
+    from rich.console import Console
+    from .config.manager import ConfigManager
+    from .services.connection_service import ConnectionService
+    from .settings import Settings
+    from .utils.logger import setup_logging
+    
+    if hasattr(args, 'format') and args.format is None:
+        args.format = 'table' if sys.stdout.isatty() else 'tsv'
+    # machine-readable output owns stdout; logs and messages go to stderr
+    machine_output = getattr(args, 'format', None) not in (None, 'table') or \
+        (args.command == 'export' and args.file == '-') or \
+        (args.command == 'monitor' and args.once and not args.textfile)
     
     settings = Settings()
     log_level = getattr(logging, settings.get_log_level(), logging.INFO)
-    setup_logging(settings.get_log_file(), log_level)
+    # warnings reach stderr, except during an interactive session where they would
+    # end up inside the remote terminal
+    setup_logging(settings.get_log_file(), log_level, stream=None if args.command == 'connect' else sys.stderr,
+                  log_format=settings.get_log_format(), levels=settings.get_log_levels())
     
     config_manager = ConfigManager(settings.get_config_path())
-    connection_service = ConnectionService(config_manager)
-    session_service = SessionService(config_manager, settings)
-    console = Console()
-    
-    if args.command == 'list':
-        cmd_list(args, connection_service, console)
-    elif args.command == 'test':
-        cmd_test(args, connection_service, console)
-    elif args.command == 'connect':
-        cmd_connect(args, connection_service, session_service, console)
-    else:
-        parser.print_help()
+    connection_service = ConnectionService(config_manager, settings)
+    console = Console(stderr=machine_output)
+    
+    try:
+        if args.command == 'list':
+            cmd_list(args, connection_service, console)
+        elif args.command == 'test':
+            cmd_test(args, connection_service, console)
+        elif args.command == 'connect':
+            cmd_connect(args, connection_service, console)
+        elif args.command == 'replay':
+            cmd_replay(args, console)
+        elif args.command == 'bench':
+            cmd_bench(args, settings, console)
+        elif args.command == 'export':
+            cmd_export(args, connection_service, console)
+        elif args.command == 'import':
+            cmd_import(args, connection_service, console)
+        elif args.command == 'sync':
+            cmd_sync(args, connection_service, console)
+        elif args.command == 'stats':
+            cmd_stats(args, settings, console)
+        elif args.command == 'monitor':
+            cmd_monitor(args, connection_service, console)
+    except BrokenPipeError:
+        # the reader went away (e.g. `| head`); keep the interpreter from
+        # complaining when it flushes stdout on exit
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        sys.exit(1)
+
+
+def main():
+    if len(sys.argv) > 1:
+        main_cli()
+        return
+    
+    from .main import main as run_menu
+    run_menu()
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -1,10 +1,68 @@
 import os
+import re
+import threading
 from pathlib import Path
-from typing import List, Optional
-import keyring
+from typing import Callable, Iterable, Iterator, List, NamedTuple, Optional, Tuple
 
 from ..models.connection import SSHConnection
 
+INDEX_FIELDS = ('name', 'hostname', 'user', 'port', 'group')
+
+_BLOCK_END = re.compile(r'\n[ \t]*(?:\n|host[ \t])', re.IGNORECASE)
+
+JOURNAL_SIZE = 256
+# larger batches are journaled without names, which makes consumers reload
+JOURNAL_MAX_NAMES = 1000
+
+FileSignature = Optional[Tuple[int, int]]
+
+
+class IndexEntry(NamedTuple):
+    name: str
+    hostname: str
+    user: str
+    port: str
+    group: str
+
+
+class ConfigChange(NamedTuple):
+    revision: int
+    before: FileSignature
+    after: FileSignature
+    names: Optional[Tuple[str, ...]]
+
+
+def iter_blocks(lines: Iterable[str], blank_lines: bool = True) -> Iterator[Tuple[int, str]]:
+    # yields (first line number, block); a Host or Match line always starts a new block,
+    # and so does a blank line unless blank_lines is False (OpenSSH ignores them)
+    current_block = []
+    start = 0
+    
+    for number, line in enumerate(lines, 1):
+        stripped = line.strip()
+        if not stripped:
+            if current_block and blank_lines:
+                yield start, '\n'.join(current_block)
+                current_block = []
+            continue
+        
+        keyword = stripped.split(None, 1)[0].split('=', 1)[0].lower()
+        if keyword in ('host', 'match') and current_block:
+            yield start, '\n'.join(current_block)
+            current_block = []
+        if not current_block:
+            start = number
+        current_block.append(line)
+    
+    if current_block:
+        yield start, '\n'.join(current_block)
+
+
+def _index_value(value) -> str:
+    if value is None:
+        return ""
+    return str(value).replace('\t', ' ').replace('\n', ' ')
+
 
 class ConfigManager:
     
@@ -13,6 +71,10 @@ class ConfigManager:
             self.config_path = Path(".ssh_config")
         else:
             self.config_path = Path(config_path)
+        # connections are tested concurrently and may persist their auth method
+        self._lock = threading.RLock()
+        self.revision = 0
+        self._journal: List[ConfigChange] = []
         
         if not self.config_path.exists():
             self.config_path.touch()
@@ -23,139 +85,314 @@ class ConfigManager:
         except Exception:
             return ""
     
-    def _write_config_file(self, content: str):
+    def _write_config_file(self, content: str, names: Iterable[str] = ()):
+        before = self.file_signature()
         self.config_path.write_text(content, encoding='utf-8')
+        self._record_change(before, tuple(names))
     
-    def _parse_blocks(self, content: str) -> List[str]:
-        blocks = []
-        current_block = []
-        
-        for line in content.split('\n'):
-            stripped = line.strip()
-            if not stripped:
-                if current_block:
-                    blocks.append('\n'.join(current_block))
-                    current_block = []
-                continue
-            
-            if stripped.lower().startswith('host ') and current_block:
-                blocks.append('\n'.join(current_block))
-                current_block = [line]
-            else:
-                current_block.append(line)
-        
-        if current_block:
-            blocks.append('\n'.join(current_block))
-        
-        return blocks
+    def _record_change(self, before: FileSignature, names: Optional[Tuple[str, ...]]):
+        self.revision += 1
+        self._journal.append(ConfigChange(self.revision, before, self.file_signature(), names))
+        del self._journal[:-JOURNAL_SIZE]
     
-    def get_all_connections(self) -> List[SSHConnection]:
-        content = self._read_config_file()
-        blocks = self._parse_blocks(content)
+    def file_signature(self) -> FileSignature:
+        try:
+            stat = self.config_path.stat()
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+    
+    def snapshot(self) -> Tuple[int, FileSignature]:
+        with self._lock:
+            return self.revision, self.file_signature()
+    
+    def changes_since(self, revision: int, signature: FileSignature) -> Optional[List[str]]:
+        # names touched by this process since a snapshot, or None when the caller has to
+        # reload: the file was edited elsewhere or the journal does not reach back far enough
+        with self._lock:
+            changes = [change for change in self._journal if change.revision > revision]
+            if revision < self.revision and (not changes or changes[0].revision != revision + 1):
+                return None
+            
+            expected = signature
+            for change in changes:
+                if change.before != expected or change.names is None:
+                    return None
+                expected = change.after
+            if self.file_signature() != expected:
+                return None
+            return list(dict.fromkeys(name for change in changes for name in change.names))
+    
+    @property
+    def index_path(self) -> Path:
+        return self.config_path.with_name(self.config_path.name + '.index')
+    
+    def index_is_current(self) -> bool:
+        try:
+            return self.index_path.stat().st_mtime_ns >= self.config_path.stat().st_mtime_ns
+        except OSError:
+            return False
+    
+    def write_index(self, connections: Optional[Iterable[SSHConnection]] = None):
+        # one tab-separated line per connection (see INDEX_FIELDS), read by the
+        # shell completion scripts and name resolution without parsing the config
+        if connections is None:
+            connections = self.iter_connections()
         
-        connections = []
-        for block in blocks:
+        tmp_path = self.index_path.with_name(f"{self.index_path.name}.{os.getpid()}.tmp")
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                for conn in connections:
+                    f.write('\t'.join(_index_value(getattr(conn, field)) for field in INDEX_FIELDS) + '\n')
+            os.replace(tmp_path, self.index_path)
+        except OSError:
+            try:
+                tmp_path.unlink()
+            except OSError:
+                pass
+    
+    def _iter_config_lines(self) -> Iterator[str]:
+        try:
+            f = open(self.config_path, 'r', encoding='utf-8')
+        except Exception:
+            return
+        with f:
+            for line in f:
+                yield line.rstrip('\n')
+    
+    def iter_connections(self) -> Iterator[SSHConnection]:
+        for _, block in iter_blocks(self._iter_config_lines()):
             conn = SSHConnection.from_ssh_config_block(block)
             if conn:
-                connections.append(conn)
-        
-        return connections
+                yield conn
+    
+    def get_all_connections(self) -> List[SSHConnection]:
+        return list(self.iter_connections())
+    
+    def read_index_text(self) -> str:
+        if not self.index_is_current():
+            self.write_index()
+        try:
+            return self.index_path.read_text(encoding='utf-8')
+        except OSError:
+            return ''.join(
+                '\t'.join(_index_value(getattr(conn, field)) for field in INDEX_FIELDS) + '\n'
+                for conn in self.iter_connections()
+            )
+    
+    def read_index(self) -> List[IndexEntry]:
+        entries = []
+        for line in self.read_index_text().splitlines():
+            fields = line.split('\t')
+            if len(fields) == len(INDEX_FIELDS):
+                entries.append(IndexEntry(*fields))
+        return entries
     
     def get_connection_by_name(self, name: str) -> Optional[SSHConnection]:
-        connections = self.get_all_connections()
-        for conn in connections:
-            if conn.name == name:
-                return conn
+        content = self._read_config_file()
+        # jump straight to the Host line instead of parsing every block
+        position = content.find(name)
+        while position != -1:
+            start = content.rfind('\n', 0, position) + 1
+            end = content.find('\n', position)
+            line = content[start:end if end != -1 else len(content)].split(None, 1)
+            if len(line) == 2 and line[0].lower() == 'host' and line[1].strip() == name:
+                block_end = _BLOCK_END.search(content, start)
+                block = content[start:block_end.start() if block_end else len(content)]
+                conn = SSHConnection.from_ssh_config_block(block)
+                if conn and conn.name == name:
+                    return conn
+            position = content.find(name, position + 1)
         return None
     
     def add_connection(self, connection: SSHConnection) -> bool:
-        existing = self.get_connection_by_name(connection.name)
-        if existing:
-            return False
-        
-        if connection.password:
-            keyring.set_password(
-                "ssh-cli",
-                f"{connection.name}@{connection.host}",
-                connection.password
-            )
-        
-        config_content = self._read_config_file()
-        new_block = connection.to_ssh_config_format()
-        
-        if config_content and not config_content.endswith('\n'):
-            config_content += '\n'
-        
-        config_content += new_block + '\n'
-        self._write_config_file(config_content)
-        
-        return True
+        with self._lock:
+            connections = self.get_all_connections()
+            if any(conn.name == connection.name for conn in connections):
+                return False
+            
+            if connection.password:
+                import keyring
+                keyring.set_password(
+                    "ssh-cli",
+                    f"{connection.name}@{connection.host}",
+                    connection.password
+                )
+            
+            config_content = self._read_config_file()
+            new_block = connection.to_ssh_config_format()
+            
+            if config_content and not config_content.endswith('\n'):
+                config_content += '\n'
+            
+            config_content += new_block + '\n'
+            self._write_config_file(config_content, [connection.name])
+            self.write_index(connections + [connection])
+            
+            return True
     
-    def update_connection(self, old_name: str, connection: SSHConnection) -> bool:
-        connections = self.get_all_connections()
-        
-        found = False
-        updated_connections = []
-        
-        for conn in connections:
-            if conn.name == old_name:
-                found = True
-                if connection.password:
-                    keyring.set_password(
-                        "ssh-cli",
-                        f"{connection.name}@{connection.host}",
-                        connection.password
-                    )
-                updated_connections.append(connection)
-            else:
-                updated_connections.append(conn)
-        
-        if not found:
-            return False
-        
-        content = '\n\n'.join([
-            conn.to_ssh_config_format().strip() 
-            for conn in updated_connections
-        ])
-        
-        if content:
-            content += '\n'
-        
-        self._write_config_file(content)
-        return True
+    def append_connections(self, connections: Iterable[SSHConnection]) -> int:
+        # streams Host blocks to the end of the file in one pass; callers filter out
+        # names that already exist before handing connections over
+        with self._lock:
+            before = self.file_signature()
+            names: Optional[List[str]] = []
+            count = 0
+            
+            with open(self.config_path, 'a+', encoding='utf-8') as f:
+                if f.tell() > 0:
+                    f.seek(f.tell() - 1)
+                    needs_newline = f.read(1) != '\n'
+                    f.seek(0, os.SEEK_END)
+                    if needs_newline:
+                        f.write('\n')
+                
+                for conn in connections:
+                    if conn.password:
+                        import keyring
+                        keyring.set_password(
+                            "ssh-cli",
+                            f"{conn.name}@{conn.host}",
+                            conn.password
+                        )
+                    f.write(conn.to_ssh_config_format() + '\n')
+                    count += 1
+                    if names is not None:
+                        names.append(conn.name)
+                        if len(names) > JOURNAL_MAX_NAMES:
+                            names = None
+            
+            if self.file_signature() != before:
+                self._record_change(before, tuple(names) if names is not None else None)
+                self.write_index()
+            return count
     
-    def delete_connection(self, name: str) -> bool:
-        connections = self.get_all_connections()
-        
-        found = False
-        remaining_connections = []
-        
-        for conn in connections:
-            if conn.name == name:
-                found = True
+    def rewrite_connections(self, transform: Callable[[SSHConnection], Optional[SSHConnection]],
+                            additions: Iterable[SSHConnection] = ()) -> int:
+        # one pass over the file for batch changes: transform returns the connection to keep
+        # (the same object when unchanged) or None to drop it, additions are written at the end
+        with self._lock:
+            before = self.file_signature()
+            names: Optional[List[str]] = []
+            written = []
+            
+            def changed(name: str):
+                nonlocal names
+                if names is not None:
+                    names.append(name)
+                    if len(names) > JOURNAL_MAX_NAMES:
+                        names = None
+            
+            def connections() -> Iterator[SSHConnection]:
+                for conn in self.iter_connections():
+                    new = transform(conn)
+                    if new is not conn:
+                        changed(conn.name)
+                        if new is not None and new.name != conn.name:
+                            changed(new.name)
+                    if new is not None:
+                        yield new
+                for conn in additions:
+                    changed(conn.name)
+                    yield conn
+            
+            tmp_path = self.config_path.with_name(f"{self.config_path.name}.{os.getpid()}.tmp")
+            try:
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    for conn in connections():
+                        if conn.password:
+                            import keyring
+                            keyring.set_password(
+                                "ssh-cli",
+                                f"{conn.name}@{conn.host}",
+                                conn.password
+                            )
+                        f.write(('\n' if written else '') + conn.to_ssh_config_format())
+                        written.append(conn)
+                os.replace(tmp_path, self.config_path)
+            except BaseException:
                 try:
-                    keyring.delete_password("ssh-cli", f"{name}@{conn.host}")
-                except Exception:
+                    tmp_path.unlink()
+                except OSError:
                     pass
-            else:
-                remaining_connections.append(conn)
-        
-        if not found:
-            return False
-        
-        content = '\n\n'.join([
-            conn.to_ssh_config_format().strip() 
-            for conn in remaining_connections
-        ])
-        
-        if content:
-            content += '\n'
-        
-        self._write_config_file(content)
-        return True
+                raise
+            
+            self._record_change(before, tuple(names) if names is not None else None)
+            self.write_index(written)
+            return len(written)
+    
+    def update_connection(self, old_name: str, connection: SSHConnection) -> bool:
+        with self._lock:
+            connections = self.get_all_connections()
+            
+            found = False
+            updated_connections = []
+            
+            for conn in connections:
+                if conn.name == old_name:
+                    found = True
+                    if connection.password:
+                        import keyring
+                        keyring.set_password(
+                            "ssh-cli",
+                            f"{connection.name}@{connection.host}",
+                            connection.password
+                        )
+                    updated_connections.append(connection)
+                else:
+                    updated_connections.append(conn)
+            
+            if not found:
+                return False
+            
+            content = '\n\n'.join([
+                conn.to_ssh_config_format().strip() 
+                for conn in updated_connections
+            ])
+            
+            if content:
+                content += '\n'
+            
+            self._write_config_file(content, [old_name, connection.name])
+            self.write_index(updated_connections)
+            return True
+    
+    def delete_connection(self, name: str) -> bool:
+        with self._lock:
+            connections = self.get_all_connections()
+            
+            found = False
+            remaining_connections = []
+            
+            for conn in connections:
+                if conn.name == name:
+                    found = True
+                    try:
+                        import keyring
+                        keyring.delete_password("ssh-cli", f"{name}@{conn.host}")
+                    except Exception:
+                        pass
+                else:
+                    remaining_connections.append(conn)
+            
+            if not found:
+                return False
+            
+            content = '\n\n'.join([
+                conn.to_ssh_config_format().strip() 
+                for conn in remaining_connections
+            ])
+            
+            if content:
+                content += '\n'
+            
+            self._write_config_file(content, [name])
+            self.write_index(remaining_connections)
+            return True
     
     def get_password(self, connection: SSHConnection) -> Optional[str]:
         try:
+            import keyring
             return keyring.get_password(
                 "ssh-cli",
                 f"{connection.name}@{connection.host}"
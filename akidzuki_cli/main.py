@@ -14,12 +14,26 @@ from .ssh.session import SSHSession
 from .ui.menu import MainMenu
 from .settings import Settings
 from .utils.logger import setup_logging
+from .utils.profiling import Profiler, profile_mode_from_env
 
 
 def main():
+    # AKIDZUKI_PROFILE=cpu|alloc profiles the menu when it is started without the CLI
+    mode = profile_mode_from_env()
+    if mode is None:
+        run_menu()
+        return
+    
+    with Profiler(mode, 'menu', Settings().get_profile_dir()):
+        run_menu()
+
+
+def run_menu():
     settings = Settings()
     log_level = getattr(logging, settings.get_log_level(), logging.INFO)
-    setup_logging(settings.get_log_file(), log_level)
+    # the menu and the sessions own the terminal, so logs only go to the file
+    setup_logging(settings.get_log_file(), log_level, log_format=settings.get_log_format(),
+                  levels=settings.get_log_levels())
     
     console = Console()
     
@@ -48,14 +62,15 @@ def main():
     console.print()
     
     config_manager = ConfigManager(settings.get_config_path())
-    connection_service = ConnectionService(config_manager)
+    connection_service = ConnectionService(config_manager, settings)
     session_service = SessionService(config_manager, settings)
     
     active_session: SSHSession = None
+    # one menu for the whole process: sort, filter and position survive sessions
+    menu = MainMenu(connection_service)
     
     try:
         while True:
-            menu = MainMenu(connection_service)
             selected_connection = menu.run()
             
             if selected_connection is None:
@@ -73,6 +88,11 @@ def main():
                 reuse_connection = Confirm.ask("Reconnect to existing session?", default=True)
             
             if not reuse_connection:
+                if active_session:
+                    # a session left with Ctrl+B that is not resumed: close it and stop its keepalives
+                    session_service.close_session(close_connection=True)
+                    active_session = None
+                
                 console.clear()
                 console.print(f"[cyan]Connecting to {selected_connection.name}...[/cyan]")
                 console.print(f"Host: {selected_connection.hostname}:{selected_connection.port}")
@@ -112,12 +132,11 @@ def main():
                 
                 console.clear()
                 
-                session.start_interactive_shell(on_exit=return_to_menu)
+                session_service.run_interactive(session, on_exit=return_to_menu)
                 
                 if session.returned_to_menu:
                     session.returned_to_menu = False
                     session.stop()
-                    active_session = None
                     continue
                 
                 session.close()
@@ -144,6 +163,7 @@ def main():
         console.print(f"[red]Unexpected error: {e}[/red]")
         console.print_exception()
     finally:
+        menu.close()
         if active_session:
             try:
                 active_session.close()
@@ -14,10 +14,15 @@ class SSHConnection:
     password: Optional[str] = None
     key_file: Optional[str] = None
     identity_file: Optional[str] = None
+    proxy_jump: Optional[str] = None
+    crypto_profile: Optional[str] = None
+    remote_session: Optional[str] = None
     group: Optional[str] = None
     favorite: bool = False
     last_used: Optional[datetime] = None
     created_at: Optional[datetime] = None
+    auth_method: Optional[str] = None
+    auth_key: Optional[str] = None
     
     def __post_init__(self):
         if self.hostname is None:
@@ -36,18 +41,33 @@ class SSHConnection:
         if self.identity_file:
             lines.append(f"  IdentityFile {self.identity_file}")
         
+        if self.proxy_jump:
+            lines.append(f"  ProxyJump {self.proxy_jump}")
+        
         if self.group:
             lines.append(f"  # Group: {self.group}")
         
         if self.favorite:
             lines.append(f"  # Favorite: true")
         
+        if self.crypto_profile:
+            lines.append(f"  # CryptoProfile: {self.crypto_profile}")
+        
+        if self.remote_session:
+            lines.append(f"  # RemoteSession: {self.remote_session}")
+        
         if self.last_used:
             lines.append(f"  # LastUsed: {self.last_used.isoformat()}")
         
         if self.created_at:
             lines.append(f"  # CreatedAt: {self.created_at.isoformat()}")
         
+        if self.auth_method:
+            lines.append(f"  # AuthMethod: {self.auth_method}")
+        
+        if self.auth_key:
+            lines.append(f"  # AuthKey: {self.auth_key}")
+        
         return "\n".join(lines) + "\n"
     
     @classmethod
@@ -62,10 +82,15 @@ class SSHConnection:
         user = None
         port = 22
         identity_file = None
+        proxy_jump = None
+        crypto_profile = None
+        remote_session = None
         group = None
         favorite = False
         last_used = None
         created_at = None
+        auth_method = None
+        auth_key = None
         
         for line in lines:
             if line.startswith('#'):
@@ -84,6 +109,14 @@ class SSHConnection:
                         created_at = datetime.fromisoformat(comment.split(':', 1)[1].strip())
                     except:
                         pass
+                elif comment.startswith('CryptoProfile:'):
+                    crypto_profile = comment.split(':', 1)[1].strip() or None
+                elif comment.startswith('RemoteSession:'):
+                    remote_session = comment.split(':', 1)[1].strip() or None
+                elif comment.startswith('AuthMethod:'):
+                    auth_method = comment.split(':', 1)[1].strip() or None
+                elif comment.startswith('AuthKey:'):
+                    auth_key = comment.split(':', 1)[1].strip() or None
                 continue
             
             parts = line.split(None, 1)
@@ -106,6 +139,8 @@ class SSHConnection:
                     pass
             elif key == 'identityfile':
                 identity_file = value
+            elif key == 'proxyjump':
+                proxy_jump = value
         
         if not name or not hostname:
             return None
@@ -117,8 +152,13 @@ class SSHConnection:
             user=user or "root",
             port=port,
             identity_file=identity_file,
+            proxy_jump=proxy_jump,
+            crypto_profile=crypto_profile,
+            remote_session=remote_session,
             group=group,
             favorite=favorite,
             last_used=last_used,
-            created_at=created_at
+            created_at=created_at,
+            auth_method=auth_method,
+            auth_key=auth_key
         )
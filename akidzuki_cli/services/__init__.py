@@ -1,4 +1,19 @@
-from .connection_service import ConnectionService
-from .session_service import SessionService
+import importlib
 
-__all__ = ['ConnectionService', 'SessionService']
+_EXPORTS = {
+    'ConnectionService': '.connection_service',
+    'SessionService': '.session_service',
+    'ProbeService': '.probe_service',
+    'SyncService': '.sync_service',
+    'MonitorService': '.monitor_service',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    # resolved on first use so importing one submodule does not pull in paramiko
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(module, __name__), name)
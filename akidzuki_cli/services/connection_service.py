@@ -1,54 +1,99 @@
 import logging
-from typing import List, Optional
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import TYPE_CHECKING, Iterable, Iterator, List, Optional, Tuple
 from datetime import datetime
 
 from ..models.connection import SSHConnection
-from ..config.manager import ConfigManager
-from ..ssh.client import SSHClient
+from ..config.manager import ConfigManager, INDEX_FIELDS, IndexEntry
+from ..settings import Settings
+
+if TYPE_CHECKING:
+    from ..ssh.client import SSHClient
 
 
 logger = logging.getLogger(__name__)
 
 
+def _last_used_key(connection: SSHConnection):
+    # newest first, connections never used last
+    if connection.last_used is None:
+        return (1, 0.0)
+    return (0, -connection.last_used.timestamp())
+
+
+SORT_KEYS = {
+    "name": lambda x: x.name.lower(),
+    "host": lambda x: x.hostname.lower(),
+    "last_used": _last_used_key,
+    "group": lambda x: (x.group or "", x.name.lower()),
+}
+
+
 class ConnectionService:
     
-    def __init__(self, config_manager: ConfigManager):
+    def __init__(self, config_manager: ConfigManager, settings: Optional[Settings] = None):
         self.config_manager = config_manager
-        self.ssh_client = SSHClient(config_manager)
+        self.settings = settings
+        self.timeout = settings.get_test_timeout() if settings else 10
+        self._ssh_client: Optional['SSHClient'] = None
         self._connection_cache = {}
         self._test_cache = {}
     
+    @property
+    def ssh_client(self) -> 'SSHClient':
+        # paramiko is only needed once a connection is actually tested
+        if self._ssh_client is None:
+            from ..ssh.client import SSHClient
+            self._ssh_client = SSHClient(self.config_manager, timeout=self.timeout, settings=self.settings)
+        return self._ssh_client
+    
     def list_connections(self, filter_text: Optional[str] = None, group: Optional[str] = None, 
-                        favorite_only: bool = False, sort_by: str = "name") -> List[SSHConnection]:
-        connections = self.config_manager.get_all_connections()
+                        favorite_only: bool = False, sort_by: str = "name",
+                        source: Optional[Iterable[SSHConnection]] = None) -> List[SSHConnection]:
+        return list(self.iter_connections(filter_text, group, favorite_only, sort_by, source))
+    
+    def iter_connections(self, filter_text: Optional[str] = None, group: Optional[str] = None,
+                         favorite_only: bool = False, sort_by: Optional[str] = "name",
+                         source: Optional[Iterable[SSHConnection]] = None) -> Iterator[SSHConnection]:
+        connections = iter(source) if source is not None else self.config_manager.iter_connections()
         
         if filter_text:
             filter_lower = filter_text.lower()
-            connections = [
+            connections = (
                 c for c in connections
                 if filter_lower in c.name.lower() or filter_lower in c.hostname.lower()
-            ]
+            )
         
         if group:
-            connections = [c for c in connections if c.group == group]
+            connections = (c for c in connections if c.group == group)
         
         if favorite_only:
-            connections = [c for c in connections if c.favorite]
+            connections = (c for c in connections if c.favorite)
+        
+        if not sort_by or sort_by == "none":
+            yield from connections
+            return
         
-        if sort_by == "name":
-            connections.sort(key=lambda x: x.name.lower())
-        elif sort_by == "host":
-            connections.sort(key=lambda x: x.hostname.lower())
-        elif sort_by == "last_used":
-            connections.sort(key=lambda x: x.last_used or datetime.min, reverse=True)
-        elif sort_by == "group":
-            connections.sort(key=lambda x: (x.group or "", x.name.lower()))
+        connections = list(connections)
+        if sort_by in SORT_KEYS:
+            connections.sort(key=SORT_KEYS[sort_by])
         
-        return connections
+        yield from connections
     
     def get_connection(self, name: str) -> Optional[SSHConnection]:
         return self.config_manager.get_connection_by_name(name)
     
+    def resolve_connections(self, query: str, limit: int = 10) -> List[Tuple[int, IndexEntry]]:
+        from ..utils.fuzzy import candidate_lines, rank_entries
+        
+        entries = []
+        for line in candidate_lines(query, self.config_manager.read_index_text()):
+            fields = line.split('\t')
+            if len(fields) == len(INDEX_FIELDS):
+                entries.append(IndexEntry(*fields))
+        return rank_entries(query, entries, limit)
+    
     def add_connection(self, connection: SSHConnection) -> bool:
         result = self.config_manager.add_connection(connection)
         if result:
@@ -89,6 +134,28 @@ class ConnectionService:
         
         return success, message
     
+    def test_connections(self, connections: Iterable[SSHConnection],
+                         jobs: int = 8) -> Iterator[Tuple[SSHConnection, bool, str, float]]:
+        def run(connection: SSHConnection):
+            started = time.perf_counter()
+            success, message = self.test_connection(connection, use_cache=False)
+            return connection, success, message, (time.perf_counter() - started) * 1000
+        
+        # keep at most a few batches in flight so huge inventories are not queued up front
+        pending = set()
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            for connection in connections:
+                pending.add(executor.submit(run, connection))
+                if len(pending) >= jobs * 2:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield future.result()
+            
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+    
     def mark_as_used(self, connection: SSHConnection):
         connection.last_used = datetime.now()
         self.config_manager.update_connection(connection.name, connection)
@@ -101,16 +168,17 @@ class ConnectionService:
             logger.info(f"Toggled favorite for connection: {connection.name} -> {connection.favorite}")
         return result
     
-    def get_groups(self) -> List[str]:
-        connections = self.config_manager.get_all_connections()
+    def get_groups(self, source: Optional[Iterable[SSHConnection]] = None) -> List[str]:
+        connections = source if source is not None else self.config_manager.get_all_connections()
         groups = set()
         for conn in connections:
             if conn.group:
                 groups.add(conn.group)
         return sorted(list(groups))
     
-    def get_recent_connections(self, limit: int = 5) -> List[SSHConnection]:
-        connections = self.config_manager.get_all_connections()
+    def get_recent_connections(self, limit: int = 5,
+                               source: Optional[Iterable[SSHConnection]] = None) -> List[SSHConnection]:
+        connections = source if source is not None else self.config_manager.get_all_connections()
         connections_with_date = [c for c in connections if c.last_used]
         connections_with_date.sort(key=lambda x: x.last_used, reverse=True)
         return connections_with_date[:limit]
@@ -0,0 +1,144 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Set, Tuple, Union
+
+from ..models.connection import SSHConnection
+from ..settings import Settings
+from ..utils.metrics import get_metrics
+from .connection_service import ConnectionService
+from .probe_service import ProbeService
+
+
+logger = logging.getLogger(__name__)
+
+CHECKS = ('tcp', 'ssh')
+
+HostKey = Tuple[str, str, str]
+CheckResult = Tuple[SSHConnection, bool, str, float, str]
+
+
+def _host_key(connection: SSHConnection, check: str) -> HostKey:
+    return connection.name, f"{connection.hostname}:{connection.port}", check
+
+
+def record_host(connection: SSHConnection, up: bool, elapsed_ms: float, check: str = 'ssh'):
+    metrics = get_metrics()
+    name, host, _ = _host_key(connection, check)
+    labels = ('connection', 'host', 'check')
+    metrics.gauge('akidzuki_host_up', 'Whether the last check of a connection succeeded', labels).set(
+        1 if up else 0, connection=name, host=host, check=check
+    )
+    metrics.gauge('akidzuki_host_check_seconds', 'Duration of the last check of a connection', labels).set(
+        round(elapsed_ms / 1000, 4), connection=name, host=host, check=check
+    )
+    metrics.gauge('akidzuki_host_last_check_timestamp_seconds', 'Unix time of the last check', labels).set(
+        round(time.time(), 3), connection=name, host=host, check=check
+    )
+
+
+def forget_host(key: HostKey):
+    metrics = get_metrics()
+    name, host, check = key
+    for metric in ('akidzuki_host_up', 'akidzuki_host_check_seconds', 'akidzuki_host_last_check_timestamp_seconds'):
+        metrics.gauge(metric, '', ('connection', 'host', 'check')).remove(connection=name, host=host, check=check)
+
+
+class MonitorService:
+    # Checks the whole inventory (or one group) every interval and keeps per-host gauges
+    # in the metrics registry. 'tcp' only opens the port, 'ssh' authenticates like `test`.
+    # Hosts behind a ProxyJump cannot be reached directly and get the ssh check in either mode.
+    # The inventory is re-read each cycle, so hosts added or removed show up on the next one.
+    
+    def __init__(self, connection_service: ConnectionService, settings: Optional[Settings] = None,
+                 check: str = 'tcp', interval: Optional[float] = None, jobs: Optional[int] = None,
+                 group: Optional[str] = None, textfile: Optional[Union[str, Path]] = None):
+        if check not in CHECKS:
+            raise ValueError(f"Unknown check: {check}")
+        settings = settings or connection_service.settings
+        self.connection_service = connection_service
+        self.check = check
+        self.interval = max(1.0, interval if interval is not None else settings.get_probe_interval())
+        self.jobs = max(1, jobs or settings.get_probe_concurrency())
+        self.group = group
+        self.textfile = textfile
+        self.cycles = 0
+        self.probe = ProbeService(settings)
+        self._known: Set[HostKey] = set()
+        self._stop = threading.Event()
+        self._jump_hosts_logged = False
+    
+    def _probe_one(self, connection: SSHConnection) -> CheckResult:
+        target = ProbeService.target(connection)
+        started = time.perf_counter()
+        if target is None:
+            success, message = self.connection_service.test_connection(connection, use_cache=False)
+            return connection, success, message, (time.perf_counter() - started) * 1000, 'ssh'
+        result = self.probe.check(target)
+        message = f"{result.rtt_ms} ms" if result.reachable else result.error
+        return connection, result.reachable, message, (time.perf_counter() - started) * 1000, 'tcp'
+    
+    def _probe_all(self, connections: List[SSHConnection]) -> Iterator[CheckResult]:
+        if not self._jump_hosts_logged and any(ProbeService.target(conn) is None for conn in connections):
+            logger.info("Monitor: hosts behind a ProxyJump are checked over SSH")
+            self._jump_hosts_logged = True
+        with ThreadPoolExecutor(max_workers=self.jobs, thread_name_prefix="akidzuki-monitor") as executor:
+            yield from executor.map(self._probe_one, connections)
+    
+    def _results(self, connections: List[SSHConnection]) -> Iterable[CheckResult]:
+        if self.check == 'ssh':
+            results = self.connection_service.test_connections(connections, jobs=self.jobs)
+            return (result + ('ssh',) for result in results)
+        return self._probe_all(connections)
+    
+    def run_cycle(self) -> Tuple[int, int]:
+        started = time.perf_counter()
+        connections = list(self.connection_service.iter_connections(group=self.group, sort_by=None))
+        seen: Set[HostKey] = set()
+        up = down = 0
+        for conn, success, message, elapsed_ms, check in self._results(connections):
+            record_host(conn, success, elapsed_ms, check)
+            seen.add(_host_key(conn, check))
+            if success:
+                up += 1
+            else:
+                down += 1
+                logger.info(f"Monitor: {conn.name} is down: {message}")
+        
+        for key in self._known - seen:
+            forget_host(key)
+        self._known = seen
+        
+        metrics = get_metrics()
+        hosts = metrics.gauge('akidzuki_monitor_hosts', 'Hosts by state in the last monitor cycle', ('state',))
+        hosts.set(up, state='up')
+        hosts.set(down, state='down')
+        metrics.gauge('akidzuki_monitor_cycle_seconds', 'Duration of the last monitor cycle').set(
+            round(time.perf_counter() - started, 4)
+        )
+        metrics.counter('akidzuki_monitor_cycles_total', 'Completed monitor cycles').inc()
+        self.cycles += 1
+        
+        if self.textfile:
+            try:
+                metrics.write_textfile(self.textfile)
+            except OSError as e:
+                logger.error(f"Could not write metrics to {self.textfile}: {e}")
+        return up, down
+    
+    def run(self, cycles: Optional[int] = None, on_cycle=None):
+        # cycles start on a fixed schedule; a cycle that overruns the interval starts the next one at once
+        next_start = time.monotonic()
+        while not self._stop.is_set():
+            up, down = self.run_cycle()
+            if on_cycle:
+                on_cycle(up, down)
+            if cycles is not None and self.cycles >= cycles:
+                return
+            next_start = max(next_start + self.interval, time.monotonic())
+            self._stop.wait(next_start - time.monotonic())
+    
+    def stop(self):
+        self._stop.set()
@@ -0,0 +1,197 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from ..models.connection import SSHConnection
+from ..settings import Settings
+from ..ssh.dns import get_dns_cache
+from ..utils.metrics import get_metrics
+
+
+logger = logging.getLogger(__name__)
+
+ProbeTarget = Tuple[str, int]
+
+
+class ProbeResult(NamedTuple):
+    reachable: bool
+    rtt_ms: Optional[float]
+    error: Optional[str]
+    checked_at: float
+
+
+class ProbeService:
+    
+    def __init__(self, settings: Optional[Settings] = None, on_update: Optional[Callable[[], None]] = None):
+        self.enabled = settings.get_probe_enabled() if settings else True
+        self.interval = settings.get_probe_interval() if settings else 60
+        self.timeout = settings.get_probe_timeout() if settings else 3
+        self.concurrency = max(1, settings.get_probe_concurrency() if settings else 8)
+        self.rate = max(0.1, settings.get_probe_rate() if settings else 20)
+        self.on_update = on_update
+        self.probes = 0
+        
+        self._results: Dict[ProbeTarget, ProbeResult] = {}
+        self._in_flight: Set[ProbeTarget] = set()
+        self._visible: List[ProbeTarget] = []
+        self._inventory: List[ProbeTarget] = []
+        self._cursor = 0
+        self._next_slot = 0.0
+        self._paused = True
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+    
+    @staticmethod
+    def target(connection: SSHConnection) -> Optional[ProbeTarget]:
+        # hosts behind a ProxyJump are usually not reachable directly, so they are not probed
+        if connection.proxy_jump:
+            return None
+        return (connection.hostname, connection.port)
+    
+    def _targets(self, connections: Iterable[SSHConnection]) -> List[ProbeTarget]:
+        targets = (self.target(connection) for connection in connections)
+        return list(dict.fromkeys(target for target in targets if target is not None))
+    
+    def set_inventory(self, connections: Iterable[SSHConnection]):
+        targets = self._targets(connections)
+        with self._cond:
+            self._inventory = targets
+            self._cursor = 0
+            self._cond.notify()
+    
+    def set_visible(self, connections: Iterable[SSHConnection]):
+        targets = self._targets(connections)
+        with self._cond:
+            if targets != self._visible:
+                self._visible = targets
+                self._cond.notify()
+    
+    def result(self, connection: SSHConnection) -> Optional[ProbeResult]:
+        target = self.target(connection)
+        return self._results.get(target) if target is not None else None
+    
+    def start(self):
+        if not self.enabled:
+            return
+        
+        with self._cond:
+            self._paused = False
+            if self._thread is None or not self._thread.is_alive():
+                self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="akidzuki-probe")
+                self._thread = threading.Thread(target=self._run, name="akidzuki-probe-scheduler", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+    
+    def pause(self):
+        with self._cond:
+            self._paused = True
+    
+    def stop(self):
+        # probes already running finish on their own; queued ones are dropped
+        with self._cond:
+            executor, self._executor = self._executor, None
+            self._thread = None
+            # cancelled probes never reach _probe, which would release their slots
+            self._in_flight.clear()
+            self._cond.notify_all()
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    def _is_stale(self, target: ProbeTarget, now: float) -> bool:
+        if target in self._in_flight:
+            return False
+        result = self._results.get(target)
+        return result is None or now - result.checked_at >= self.interval
+    
+    def _next_target(self, now: float) -> Optional[ProbeTarget]:
+        # rows on screen first, then the rest of the inventory round-robin
+        for target in self._visible:
+            if self._is_stale(target, now):
+                return target
+        
+        count = len(self._inventory)
+        for _ in range(count):
+            target = self._inventory[self._cursor % count]
+            self._cursor = (self._cursor + 1) % count
+            if self._is_stale(target, now):
+                return target
+        return None
+    
+    def _run(self):
+        executor = self._executor
+        while True:
+            with self._cond:
+                if self._thread is not threading.current_thread():
+                    # stopped, and maybe started again with a new thread and executor
+                    return
+                if self._paused or len(self._in_flight) >= self.concurrency:
+                    self._cond.wait()
+                    continue
+                
+                now = time.monotonic()
+                if now < self._next_slot:
+                    self._cond.wait(self._next_slot - now)
+                    continue
+                
+                target = self._next_target(now)
+                if target is None:
+                    # everything is fresh; new visible rows or inventory changes notify earlier
+                    self._cond.wait(self.interval / 4)
+                    continue
+                
+                self._in_flight.add(target)
+                self._next_slot = max(now, self._next_slot) + 1.0 / self.rate
+            
+            try:
+                executor.submit(self._probe, target)
+            except RuntimeError:
+                # stop() shut the executor down in the meantime
+                with self._cond:
+                    self._in_flight.discard(target)
+                return
+    
+    def check(self, target: ProbeTarget) -> ProbeResult:
+        hostname, port = target
+        dns_cache = get_dns_cache()
+        try:
+            dns_cache.resolve(hostname, port)
+            started = time.perf_counter()
+            sock = dns_cache.create_connection(hostname, port, timeout=self.timeout)
+            rtt_ms = (time.perf_counter() - started) * 1000
+            sock.close()
+            result = ProbeResult(True, round(rtt_ms, 1), None, time.monotonic())
+        except Exception as e:
+            # not only OSError: a malformed name makes getaddrinfo raise UnicodeError
+            result = ProbeResult(False, None, str(e) or type(e).__name__, time.monotonic())
+            logger.debug(f"Probe of {hostname}:{port} failed: {result.error}")
+        
+        metrics = get_metrics()
+        metrics.counter('akidzuki_probes_total', 'TCP reachability probes by result', ('result',)).inc(
+            result='reachable' if result.reachable else 'unreachable'
+        )
+        if result.reachable:
+            metrics.histogram('akidzuki_probe_rtt_seconds', 'TCP connect time of reachable probes').observe(
+                result.rtt_ms / 1000
+            )
+        return result
+    
+    def _probe(self, target: ProbeTarget):
+        result = None
+        try:
+            result = self.check(target)
+        finally:
+            # an exception here is otherwise swallowed by the executor future, and the
+            # target would hold its concurrency slot and never be probed again
+            with self._cond:
+                if result is not None:
+                    self._results[target] = result
+                self._in_flight.discard(target)
+                self.probes += 1
+                visible = target in self._visible
+                self._cond.notify()
+        
+        if visible and self.on_update:
+            self.on_update()
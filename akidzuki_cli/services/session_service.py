@@ -1,14 +1,41 @@
 import logging
-from typing import Optional
+import shlex
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Optional
 
 from ..models.connection import SSHConnection
 from ..ssh.client import SSHClient
 from ..ssh.session import SSHSession
+from ..ssh.recorder import SessionRecorder, recording_suffix
+from ..ssh.health import get_health_scheduler
 from ..config.manager import ConfigManager
+from ..settings import Settings
+from ..utils.metrics import get_metrics
 
 
 logger = logging.getLogger(__name__)
 
+RECONNECT_BASE_DELAY = 0.25
+
+
+def remote_session_command(remote_session: Optional[str], connection_name: str) -> Optional[str]:
+    if not remote_session:
+        return None
+    
+    kind, _, name = remote_session.partition(':')
+    name = shlex.quote(name or f"akidzuki-{connection_name}")
+    kind = kind.strip().lower()
+    if kind == "tmux":
+        return f"tmux new-session -A -s {name}"
+    if kind == "screen":
+        return f"screen -D -RR -S {name}"
+    
+    logger.warning(f"Unknown remote session type: {remote_session}")
+    return None
+
 
 class SessionService:
     
@@ -16,30 +43,126 @@ class SessionService:
         self.config_manager = config_manager
         self.settings = settings or Settings()
         timeout = self.settings.get_ssh_timeout()
-        self.ssh_client_wrapper = SSHClient(config_manager, timeout=timeout)
+        self.ssh_client_wrapper = SSHClient(config_manager, timeout=timeout, settings=self.settings)
         self.active_session: Optional[SSHSession] = None
         self.active_ssh_client = None
+        self.health = get_health_scheduler()
     
-    def connect(self, connection: SSHConnection) -> tuple[bool, Optional[str], Optional[SSHSession]]:
+    def _create_recorder(self, connection: SSHConnection, record_input: Optional[bool] = None) -> SessionRecorder:
+        compression = self.settings.get_recording_compression()
+        timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        safe_name = "".join(c if c.isalnum() or c in "-_." else "_" for c in connection.name)
+        path = Path(self.settings.get_recordings_dir()) / f"{safe_name}-{timestamp}{recording_suffix(compression)}"
+        
+        if record_input is None:
+            record_input = self.settings.get_record_input()
+        
+        return SessionRecorder(
+            str(path),
+            record_input=record_input,
+            compression=compression,
+            title=f"{connection.user}@{connection.hostname} ({connection.name})"
+        )
+    
+    def connect(self, connection: SSHConnection, record: Optional[bool] = None,
+                record_input: Optional[bool] = None) -> tuple[bool, Optional[str], Optional[SSHSession]]:
         logger.info(f"Connecting to: {connection.name} ({connection.hostname}:{connection.port})")
         
         success, error, ssh_client = self.ssh_client_wrapper.connect(connection)
+        get_metrics().counter('akidzuki_sessions_total', 'Interactive session connects by result', ('result',)).inc(
+            result='ok' if success else 'failed'
+        )
         
         if not success:
             logger.error(f"Connection failed: {connection.name} - {error}")
             return False, error, None
         
-        session = SSHSession(ssh_client, connection.name)
+        if record is None:
+            record = self.settings.get_record_sessions()
+        recorder = self._create_recorder(connection, record_input) if record else None
+        
+        session = SSHSession(
+            ssh_client,
+            connection.name,
+            recorder=recorder,
+            connection=connection,
+            remote_command=remote_session_command(
+                connection.remote_session or self.settings.get_remote_session(), connection.name
+            )
+        )
         self.active_session = session
         self.active_ssh_client = ssh_client
-        
-        if ssh_client.get_transport():
-            keepalive = self.settings.get_keepalive_interval()
-            ssh_client.get_transport().set_keepalive(keepalive)
+        self._start_keepalive(session)
         
         logger.info(f"Successfully connected to: {connection.name}")
         return True, None, session
     
+    def _start_keepalive(self, session: SSHSession):
+        transport = session.ssh_client.get_transport()
+        interval = self.settings.get_keepalive_interval()
+        if transport and interval:
+            session.keepalive = self.health.watch(
+                transport, session.connection_name, interval, self.settings.get_keepalive_count_max()
+            )
+    
+    def _stop_keepalive(self, session: SSHSession):
+        transport = session.ssh_client.get_transport() if session.ssh_client else None
+        if transport:
+            self.health.unwatch(transport)
+        session.keepalive = None
+    
+    def _notify(self, message: str):
+        sys.stdout.write(f"\n[akidzuki] {message}\n")
+        sys.stdout.flush()
+    
+    def reconnect(self, session: SSHSession) -> bool:
+        connection = session.connection
+        if connection is None:
+            return False
+        
+        max_attempts = self.settings.get_reconnect_max_attempts()
+        max_delay = self.settings.get_reconnect_max_delay()
+        reconnects = get_metrics().counter('akidzuki_reconnects_total', 'Automatic reconnects by result', ('result',))
+        delay = 0.0
+        
+        for attempt in range(1, max_attempts + 1):
+            if delay:
+                time.sleep(delay)
+            
+            self._notify(f"Connection lost, reconnecting to {connection.name} ({attempt}/{max_attempts})...")
+            started = time.monotonic()
+            success, error, ssh_client = self.ssh_client_wrapper.connect(connection, operation="reconnect")
+            
+            if success:
+                elapsed_ms = (time.monotonic() - started) * 1000
+                self._stop_keepalive(session)
+                session.resume(ssh_client)
+                self.active_ssh_client = ssh_client
+                self._start_keepalive(session)
+                logger.info(f"Reconnected to {connection.name} in {elapsed_ms:.0f} ms (attempt {attempt})")
+                self._notify(f"Reconnected in {elapsed_ms:.0f} ms")
+                reconnects.inc(result='ok')
+                return True
+            
+            logger.warning(f"Reconnect attempt {attempt} to {connection.name} failed: {error}")
+            delay = min(max_delay, RECONNECT_BASE_DELAY * (2 ** (attempt - 1)))
+        
+        self._notify(f"Could not reconnect to {connection.name}")
+        reconnects.inc(result='failed')
+        return False
+    
+    def run_interactive(self, session: SSHSession, on_exit: Optional[Callable] = None):
+        while True:
+            session.start_interactive_shell(on_exit=on_exit)
+            
+            if not session.connection_lost:
+                return
+            
+            logger.warning(f"Transport to {session.connection_name} lost")
+            if not self.settings.get_auto_reconnect() or not self.reconnect(session):
+                session.connection_lost = False
+                return
+    
     def can_reuse_connection(self, connection: SSHConnection) -> bool:
         if not self.active_ssh_client or not self.active_ssh_client.get_transport():
             return False
@@ -63,6 +186,7 @@ class SessionService:
     def close_session(self, close_connection: bool = False):
         if self.active_session:
             if close_connection:
+                self._stop_keepalive(self.active_session)
                 self.active_session.close()
                 self.active_ssh_client = None
             else:
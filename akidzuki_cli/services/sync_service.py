@@ -0,0 +1,200 @@
+import hashlib
+import json
+import logging
+import os
+import sys
+from dataclasses import replace
+from datetime import datetime
+from pathlib import Path
+from typing import IO, Dict, List, NamedTuple, Optional, Tuple, Union
+
+from ..models.connection import SSHConnection
+from ..config.manager import ConfigManager
+from ..utils.export_import import LOCAL_FIELDS, ImportReport, read_connections
+
+
+logger = logging.getLogger(__name__)
+
+# fields that come from the shared inventory and make up a connection's content hash;
+# everything else (LOCAL_FIELDS) is local to this machine and survives a sync untouched
+SHARED_FIELDS = (
+    'name', 'hostname', 'port', 'user', 'identity_file', 'proxy_jump', 'crypto_profile', 'remote_session', 'group',
+)
+
+
+def content_hash(conn: SSHConnection) -> str:
+    values = (getattr(conn, field) for field in SHARED_FIELDS)
+    text = '\x1f'.join('' if value is None else str(value) for value in values)
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=12).hexdigest()
+
+
+def changed_fields(local: Optional[SSHConnection], remote: Optional[SSHConnection]) -> Tuple[str, ...]:
+    if local is None or remote is None:
+        return ()
+    return tuple(field for field in SHARED_FIELDS if getattr(local, field) != getattr(remote, field))
+
+
+class SyncChange(NamedTuple):
+    action: str
+    name: str
+    local: Optional[SSHConnection]
+    remote: Optional[SSHConnection]
+    # for conflicts: what applying the remote side would do ('add', 'update' or 'remove')
+    remote_action: Optional[str] = None
+
+
+class SyncPlan:
+    
+    def __init__(self, source: str):
+        self.source = source
+        self.changes: List[SyncChange] = []
+        self.remote_hashes: Dict[str, str] = {}
+        self.unchanged = 0
+        self.local_only = 0
+        self.first_sync = True
+        self.report = ImportReport()
+    
+    def count(self, action: str) -> int:
+        return sum(1 for change in self.changes if change.action == action)
+
+
+class SyncService:
+    # Three-way sync against a shared inventory. The base is the set of content hashes the
+    # source had at the last sync, stored next to the config file; comparing local, remote
+    # and base hashes per name tells which side changed, so no field-level history is needed.
+    
+    def __init__(self, config_manager: ConfigManager):
+        self.config_manager = config_manager
+    
+    @property
+    def state_path(self) -> Path:
+        return self.config_manager.config_path.with_name(f"{self.config_manager.config_path.name}.sync.json")
+    
+    @staticmethod
+    def source_key(source: Union[str, Path]) -> str:
+        return '-' if str(source) == '-' else str(Path(source).expanduser().resolve())
+    
+    def _load_state(self) -> Dict[str, Dict[str, str]]:
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable sync state {self.state_path}: {e}")
+            return {}
+        return state.get("sources", {}) if isinstance(state, dict) else {}
+    
+    def _save_state(self, sources: Dict[str, Dict[str, str]]):
+        tmp_path = self.state_path.with_name(f"{self.state_path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"version": 1, "sources": sources}, f, separators=(',', ':'))
+        os.replace(tmp_path, self.state_path)
+    
+    def _read_remote(self, source: Union[str, Path, IO[str]], plan: SyncPlan,
+                     input_format: Optional[str]) -> Dict[str, SSHConnection]:
+        remote = {}
+        
+        def collect(stream: IO[str]):
+            for _, conn in read_connections(stream, plan.report, input_format):
+                remote[conn.name] = conn
+                plan.remote_hashes[conn.name] = content_hash(conn)
+        
+        if isinstance(source, (str, Path)) and str(source) != '-':
+            with open(source, 'r', encoding='utf-8', newline='') as f:
+                collect(f)
+        else:
+            collect(sys.stdin if isinstance(source, (str, Path)) else source)
+        return remote
+    
+    def plan(self, source: Union[str, Path], input_format: Optional[str] = None) -> SyncPlan:
+        plan = SyncPlan(self.source_key(source))
+        base = self._load_state().get(plan.source)
+        plan.first_sync = base is None
+        base = base or {}
+        remote = self._read_remote(source, plan, input_format)
+        
+        # one pass over the local file and one dict lookup per name on each side
+        seen = set()
+        for local in self.config_manager.iter_connections():
+            name = local.name
+            seen.add(name)
+            local_hash = content_hash(local)
+            remote_hash = plan.remote_hashes.get(name)
+            base_hash = base.get(name)
+            
+            if remote_hash is None:
+                if base_hash is None:
+                    plan.local_only += 1
+                elif local_hash == base_hash:
+                    plan.changes.append(SyncChange('remove', name, local, None))
+                else:
+                    plan.changes.append(SyncChange('conflict', name, local, None, 'remove'))
+            elif local_hash == remote_hash or remote_hash == base_hash:
+                # identical, or only changed here: the local version stays
+                plan.unchanged += 1
+            elif local_hash == base_hash:
+                plan.changes.append(SyncChange('update', name, local, remote[name]))
+            else:
+                plan.changes.append(SyncChange('conflict', name, local, remote[name], 'update'))
+        
+        for name, conn in remote.items():
+            if name in seen:
+                continue
+            base_hash = base.get(name)
+            if base_hash is None:
+                plan.changes.append(SyncChange('add', name, None, conn))
+            elif base_hash == plan.remote_hashes[name]:
+                # deleted here after the last sync and unchanged upstream
+                plan.unchanged += 1
+            else:
+                plan.changes.append(SyncChange('conflict', name, None, conn, 'add'))
+        
+        return plan
+    
+    def apply(self, plan: SyncPlan, prefer: str = 'local') -> int:
+        if plan.report.errors:
+            raise ValueError(f"{len(plan.report.errors)} records in the source could not be read")
+        
+        removals = set()
+        updates: Dict[str, SSHConnection] = {}
+        additions = []
+        for change in plan.changes:
+            action = change.action
+            if action == 'conflict':
+                if prefer != 'remote':
+                    continue
+                action = change.remote_action
+            
+            if action == 'remove':
+                removals.add(change.name)
+            elif action == 'update':
+                updates[change.name] = change.remote
+            elif action == 'add':
+                # favorites, last use and auth details of whoever exported the source stay theirs
+                additions.append(replace(change.remote, favorite=False, last_used=None, created_at=datetime.now(),
+                                         auth_method=None, auth_key=None))
+        
+        def transform(conn: SSHConnection) -> Optional[SSHConnection]:
+            if conn.name in removals:
+                return None
+            remote = updates.get(conn.name)
+            if remote is not None:
+                return replace(remote, **{field: getattr(conn, field) for field in LOCAL_FIELDS})
+            return conn
+        
+        if removals or updates or additions:
+            self.config_manager.rewrite_connections(transform, additions)
+        if removals:
+            import keyring
+            for change in plan.changes:
+                if change.name in removals:
+                    try:
+                        keyring.delete_password("ssh-cli", f"{change.name}@{change.local.host}")
+                    except Exception:
+                        pass
+        
+        sources = self._load_state()
+        sources[plan.source] = plan.remote_hashes
+        self._save_state(sources)
+        return len(removals) + len(updates) + len(additions)
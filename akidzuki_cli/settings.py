@@ -27,13 +27,36 @@ class Settings:
             "config_path": ".ssh_config",
             "log_file": "ssh_cli.log",
             "log_level": "INFO",
+            "log_format": "text",
+            "log_levels": {"paramiko": "WARNING"},
             "ssh_timeout": 10,
             "test_timeout": 5,
             "keepalive_interval": 30,
             "show_colors": True,
             "sort_by": "name",
             "default_group": None,
-            "recent_limit": 5
+            "recent_limit": 5,
+            "record_sessions": False,
+            "record_input": False,
+            "recordings_dir": "recordings",
+            "recording_compression": "gzip",
+            "crypto_profile": "default",
+            "group_crypto_profiles": {},
+            "crypto_profiles": {},
+            "keepalive_count_max": 3,
+            "bastion_idle_timeout": 300,
+            "auto_reconnect": True,
+            "reconnect_max_attempts": 8,
+            "reconnect_max_delay": 30,
+            "remote_session": None,
+            "probe_enabled": True,
+            "probe_interval": 60,
+            "probe_timeout": 3,
+            "probe_concurrency": 8,
+            "probe_rate": 20,
+            "timing_history_file": "connect_timings.ndjson",
+            "timing_history_size": 5000,
+            "profile_dir": "profiles"
         }
     
     def _save_settings(self):
@@ -59,6 +82,12 @@ class Settings:
     def get_log_level(self) -> str:
         return self.get("log_level", "INFO")
     
+    def get_log_format(self) -> str:
+        return self.get("log_format", "text")
+    
+    def get_log_levels(self) -> Dict[str, str]:
+        return self.get("log_levels", {"paramiko": "WARNING"})
+    
     def get_ssh_timeout(self) -> int:
         return self.get("ssh_timeout", 10)
     
@@ -79,3 +108,66 @@ class Settings:
     
     def get_recent_limit(self) -> int:
         return self.get("recent_limit", 5)
+    
+    def get_record_sessions(self) -> bool:
+        return self.get("record_sessions", False)
+    
+    def get_record_input(self) -> bool:
+        return self.get("record_input", False)
+    
+    def get_recordings_dir(self) -> str:
+        return self.get("recordings_dir", "recordings")
+    
+    def get_recording_compression(self) -> str:
+        return self.get("recording_compression", "gzip")
+    
+    def get_crypto_profile(self) -> str:
+        return self.get("crypto_profile", "default")
+    
+    def get_group_crypto_profiles(self) -> Dict[str, str]:
+        return self.get("group_crypto_profiles") or {}
+    
+    def get_crypto_profiles(self) -> Dict[str, Dict[str, Any]]:
+        return self.get("crypto_profiles") or {}
+    
+    def get_keepalive_count_max(self) -> int:
+        return self.get("keepalive_count_max", 3)
+    
+    def get_bastion_idle_timeout(self) -> float:
+        return self.get("bastion_idle_timeout", 300)
+    
+    def get_auto_reconnect(self) -> bool:
+        return self.get("auto_reconnect", True)
+    
+    def get_reconnect_max_attempts(self) -> int:
+        return self.get("reconnect_max_attempts", 8)
+    
+    def get_reconnect_max_delay(self) -> float:
+        return self.get("reconnect_max_delay", 30)
+    
+    def get_remote_session(self) -> Optional[str]:
+        return self.get("remote_session")
+    
+    def get_probe_enabled(self) -> bool:
+        return self.get("probe_enabled", True)
+    
+    def get_probe_interval(self) -> float:
+        return self.get("probe_interval", 60)
+    
+    def get_probe_timeout(self) -> float:
+        return self.get("probe_timeout", 3)
+    
+    def get_probe_concurrency(self) -> int:
+        return self.get("probe_concurrency", 8)
+    
+    def get_probe_rate(self) -> float:
+        return self.get("probe_rate", 20)
+    
+    def get_timing_history_file(self) -> Optional[str]:
+        return self.get("timing_history_file", "connect_timings.ndjson")
+    
+    def get_timing_history_size(self) -> int:
+        return self.get("timing_history_size", 5000)
+    
+    def get_profile_dir(self) -> str:
+        return self.get("profile_dir", "profiles")
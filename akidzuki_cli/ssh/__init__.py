@@ -1,4 +1,15 @@
-from .client import SSHClient
-from .session import SSHSession
+import importlib
 
-__all__ = ['SSHClient', 'SSHSession']
+_EXPORTS = {
+    'SSHClient': '.client',
+    'SSHSession': '.session',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(module, __name__), name)
@@ -0,0 +1,158 @@
+import logging
+import os
+import paramiko
+from dataclasses import dataclass
+from typing import Iterator, List, Optional, Set
+
+from ..models.connection import SSHConnection
+from .keys import KeyManager, get_key_manager
+
+
+logger = logging.getLogger(__name__)
+
+AUTH_NONE = "none"
+AUTH_PUBLICKEY = "publickey"
+AUTH_AGENT = "agent"
+AUTH_PASSWORD = "password"
+AUTH_INTERACTIVE = "keyboard-interactive"
+
+DEFAULT_KEY_FILES = ["~/.ssh/id_ed25519", "~/.ssh/id_ecdsa", "~/.ssh/id_rsa"]
+# sshd drops the connection after MaxAuthTries (6 by default) failures; when a password is
+# known, stop offering keys early enough that password and keyboard-interactive still fit
+MAX_KEYS_BEFORE_PASSWORD = 3
+
+
+@dataclass(frozen=True)
+class AuthAttempt:
+    
+    method: str
+    key: Optional[str] = None
+    
+    @property
+    def server_method(self) -> str:
+        return AUTH_PUBLICKEY if self.method == AUTH_AGENT else self.method
+
+
+class AuthStrategy:
+    
+    def __init__(self, connection: SSHConnection, password: Optional[str] = None,
+                 key_manager: Optional[KeyManager] = None):
+        self.connection = connection
+        self.password = password
+        self.key_manager = key_manager or get_key_manager()
+        self._offered_keys = set()
+    
+    def remembered(self) -> Optional[AuthAttempt]:
+        if not self.connection.auth_method:
+            return None
+        return AuthAttempt(self.connection.auth_method, self.connection.auth_key)
+    
+    def _identity_files(self) -> List[str]:
+        key_file = self.connection.key_file or self.connection.identity_file
+        files = [key_file] if key_file else []
+        for default in DEFAULT_KEY_FILES:
+            if default not in files and os.path.isfile(os.path.expanduser(default)):
+                files.append(default)
+        return files
+    
+    def candidates(self) -> Iterator[AuthAttempt]:
+        seen = set()
+        remembered = self.remembered()
+        if remembered:
+            seen.add(remembered)
+            yield remembered
+        
+        ordered = [AuthAttempt(AUTH_PUBLICKEY, path) for path in self._identity_files()]
+        for attempt in ordered:
+            if attempt not in seen:
+                seen.add(attempt)
+                yield attempt
+        
+        for key in self.key_manager.agent_keys():
+            attempt = AuthAttempt(AUTH_AGENT, key.get_fingerprint().hex())
+            if attempt not in seen:
+                seen.add(attempt)
+                yield attempt
+        
+        if self.password:
+            for method in (AUTH_PASSWORD, AUTH_INTERACTIVE):
+                attempt = AuthAttempt(method)
+                if attempt not in seen:
+                    seen.add(attempt)
+                    yield attempt
+    
+    def _load_key(self, attempt: AuthAttempt) -> Optional[paramiko.PKey]:
+        if attempt.method == AUTH_AGENT:
+            return self.key_manager.find_agent_key(attempt.key)
+        if not os.path.isfile(os.path.expanduser(attempt.key)):
+            return None
+        return self.key_manager.load(attempt.key, self.password)
+    
+    def _interactive_handler(self, title, instructions, prompt_list):
+        return [self.password if not echo else "" for _, echo in prompt_list]
+    
+    def _try(self, transport: paramiko.Transport, attempt: AuthAttempt) -> List[str]:
+        username = self.connection.user
+        if attempt.method in (AUTH_PUBLICKEY, AUTH_AGENT):
+            key = self._load_key(attempt)
+            if key is None:
+                raise paramiko.AuthenticationException(f"Key not available: {attempt.key}")
+            fingerprint = key.get_fingerprint()
+            if fingerprint in self._offered_keys:
+                raise paramiko.AuthenticationException(f"Key already offered: {attempt.key}")
+            self._offered_keys.add(fingerprint)
+            return transport.auth_publickey(username, key)
+        if attempt.method == AUTH_PASSWORD:
+            return transport.auth_password(username, self.password, fallback=False)
+        if attempt.method == AUTH_INTERACTIVE:
+            return transport.auth_interactive(username, self._interactive_handler)
+        if attempt.method == AUTH_NONE:
+            return transport.auth_none(username)
+        raise paramiko.AuthenticationException(f"Unknown auth method: {attempt.method}")
+    
+    def _key_limit_reached(self, attempt: AuthAttempt) -> bool:
+        return (attempt.server_method == AUTH_PUBLICKEY and bool(self.password)
+                and len(self._offered_keys) >= MAX_KEYS_BEFORE_PASSWORD)
+    
+    def authenticate(self, transport: paramiko.Transport) -> AuthAttempt:
+        allowed: Optional[Set[str]] = None
+        try:
+            transport.auth_none(self.connection.user)
+            if transport.is_authenticated():
+                return AuthAttempt(AUTH_NONE)
+        except paramiko.BadAuthenticationType as e:
+            allowed = set(e.allowed_types)
+        
+        succeeded = None
+        saved_exception: Optional[Exception] = None
+        
+        for attempt in self.candidates():
+            if allowed is not None and attempt.server_method not in allowed:
+                continue
+            if not transport.is_active():
+                break
+            if self._key_limit_reached(attempt):
+                logger.debug(f"Skipping {attempt.method} ({attempt.key}): {len(self._offered_keys)} keys offered")
+                continue
+            
+            try:
+                remaining = self._try(transport, attempt)
+            except paramiko.BadAuthenticationType as e:
+                allowed = set(e.allowed_types)
+                saved_exception = e
+                continue
+            except (paramiko.SSHException, OSError, ValueError, TypeError) as e:
+                logger.debug(f"Auth attempt {attempt.method} ({attempt.key}) failed: {e}")
+                saved_exception = e
+                continue
+            
+            if transport.is_authenticated():
+                return succeeded or attempt
+            
+            # Partial success (e.g. key + password): keep the first factor as the one to remember
+            succeeded = succeeded or attempt
+            allowed = set(remaining)
+        
+        if isinstance(saved_exception, paramiko.SSHException):
+            raise saved_exception
+        raise paramiko.AuthenticationException("No authentication methods available")
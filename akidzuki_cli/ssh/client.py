@@ -1,63 +1,170 @@
+import logging
 import paramiko
-from typing import Optional
+from dataclasses import replace
+from typing import List, Optional, Tuple
 import socket
-import time
 
 from ..models.connection import SSHConnection
 from ..config.manager import ConfigManager
+from ..settings import Settings
+from .auth import AuthStrategy, AuthAttempt
+from .profiles import apply_crypto_profile, resolve_crypto_profile
+from .dns import get_dns_cache
+from .health import get_health_scheduler
+from .jump import get_bastion_pool, parse_jump_spec, split_jump_chain
+from .timing import ConnectTimer, TimingHistory, get_timing_history
+from .transport import TransportClient
+
+
+logger = logging.getLogger(__name__)
 
 
 class SSHClient:
     
-    def __init__(self, config_manager: ConfigManager, timeout: int = 10):
+    def __init__(self, config_manager: ConfigManager, timeout: int = 10, settings: Optional[Settings] = None):
         self.config_manager = config_manager
         self.timeout = timeout
+        self.settings = settings
+        self.bastion_pool = get_bastion_pool()
+        self.dns_cache = get_dns_cache()
+        self.health = get_health_scheduler()
+        self.timing_history: Optional[TimingHistory] = None
+        history_file = (settings or Settings()).get_timing_history_file()
+        if history_file:
+            self.timing_history = get_timing_history(history_file, (settings or Settings()).get_timing_history_size())
     
-    def connect(self, connection: SSHConnection) -> tuple[bool, Optional[str], Optional[paramiko.SSHClient]]:
-        client = paramiko.SSHClient()
-        client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-        
+    def _open_transport(self, connection: SSHConnection, sock=None) -> paramiko.Transport:
+        if sock is None:
+            sock = self.dns_cache.create_connection(connection.hostname, connection.port, self.timeout)
         try:
-            password = connection.password
-            if not password:
-                password = self.config_manager.get_password(connection)
-            
-            kwargs = {
-                'hostname': connection.hostname,
-                'port': connection.port,
-                'username': connection.user,
-                'timeout': self.timeout
-            }
+            transport = paramiko.Transport(sock)
+            transport.banner_timeout = self.timeout
+            transport.auth_timeout = self.timeout
+            profile_name, profile = resolve_crypto_profile(connection, self.settings)
+            if profile:
+                apply_crypto_profile(transport, profile)
+                logger.debug(f"Using crypto profile '{profile_name}' for {connection.name}")
+            transport.start_client(timeout=self.timeout)
+        except Exception:
+            sock.close()
+            raise
+        return transport
+    
+    def _authenticate(self, transport: paramiko.Transport, connection: SSHConnection,
+                      remember: bool = True) -> AuthAttempt:
+        password = connection.password
+        if not password:
+            password = self.config_manager.get_password(connection)
+        
+        attempt = AuthStrategy(connection, password).authenticate(transport)
+        if remember:
+            self._remember_auth(connection, attempt)
+        return attempt
+    
+    def _resolve_jumps(self, connection: SSHConnection) -> List[Tuple[SSHConnection, bool]]:
+        jumps = []
+        for spec in split_jump_chain(connection.proxy_jump):
+            jump = self.config_manager.get_connection_by_name(spec)
+            if jump and jump.name != connection.name:
+                jumps.append((jump, True))
+            else:
+                jumps.append((parse_jump_spec(spec, connection.user), False))
+        return jumps
+    
+    def _bastion_transport(self, jumps: List[Tuple[SSHConnection, bool]]) -> paramiko.Transport:
+        transport = None
+        key = ()
+        for jump, known in jumps:
+            key += ((jump.user, jump.hostname, jump.port),)
             
-            if connection.key_file or connection.identity_file:
-                key_file = connection.key_file or connection.identity_file
+            def open_bastion(jump=jump, known=known, upstream=transport):
+                sock = None
+                if upstream is not None:
+                    sock = self.bastion_pool.open_channel(upstream, jump.hostname, jump.port, self.timeout)
+                bastion = self._open_transport(jump, sock)
                 try:
-                    client.connect(**kwargs, key_filename=key_file)
-                except Exception as e:
-                    if password:
-                        kwargs['password'] = password
-                        client.connect(**kwargs)
-                    else:
-                        raise
-            elif password:
-                kwargs['password'] = password
-                client.connect(**kwargs)
-            else:
-                client.connect(**kwargs)
+                    self._authenticate(bastion, jump, remember=known)
+                except Exception:
+                    bastion.close()
+                    raise
+                self._watch_bastion(bastion, jump)
+                return bastion
+            
+            transport = self.bastion_pool.get(key, open_bastion)
+        return transport
+    
+    def _watch_bastion(self, transport: paramiko.Transport, jump: SSHConnection):
+        settings = self.settings or Settings()
+        interval = settings.get_keepalive_interval()
+        if interval:
+            self.health.watch(
+                transport,
+                jump.name,
+                interval,
+                settings.get_keepalive_count_max(),
+                idle_timeout=settings.get_bastion_idle_timeout(),
+                channels=lambda: self.bastion_pool.open_channels(transport)
+            )
+    
+    def _open_socket(self, connection: SSHConnection, timer: ConnectTimer):
+        jumps = self._resolve_jumps(connection)
+        if not jumps:
+            with timer.phase('dns'):
+                self.dns_cache.resolve(connection.hostname, connection.port)
+            with timer.phase('tcp'):
+                return self.dns_cache.create_connection(connection.hostname, connection.port, self.timeout)
+        
+        with timer.phase('jump'):
+            bastion = self._bastion_transport(jumps)
+        with timer.phase('tcp'):
+            return self.bastion_pool.open_channel(bastion, connection.hostname, connection.port, self.timeout)
+    
+    def _remember_auth(self, connection: SSHConnection, attempt: AuthAttempt):
+        if connection.auth_method == attempt.method and connection.auth_key == attempt.key:
+            return
+        
+        connection.auth_method = attempt.method
+        connection.auth_key = attempt.key
+        try:
+            self.config_manager.update_connection(connection.name, replace(connection, password=None))
+            logger.debug(f"Remembered auth method for {connection.name}: {attempt.method}")
+        except Exception as e:
+            logger.warning(f"Failed to remember auth method for {connection.name}: {e}")
+    
+    def connect(self, connection: SSHConnection,
+                operation: str = "connect") -> tuple[bool, Optional[str], Optional[TransportClient]]:
+        transport = None
+        timer = ConnectTimer(operation, connection, self.timing_history)
+        
+        try:
+            sock = self._open_socket(connection, timer)
+            with timer.phase('kex'):
+                transport = self._open_transport(connection, sock)
+            with timer.phase('auth'):
+                attempt = self._authenticate(transport, connection, remember=False)
+            timer.finish(True)
+            # persisting a newly detected auth method rewrites the config, which is not
+            # part of the connect latency
+            self._remember_auth(connection, attempt)
             
-            return True, None, client
+            return True, None, TransportClient(transport, timer)
         
         except paramiko.AuthenticationException:
-            return False, "Authentication failed. Check username and password.", None
+            error = "Authentication failed. Check username and password."
         except paramiko.SSHException as e:
-            return False, f"SSH connection error: {str(e)}", None
+            error = f"SSH connection error: {str(e)}"
         except socket.error as e:
-            return False, f"Network error: {str(e)}", None
+            error = f"Network error: {str(e)}"
         except Exception as e:
-            return False, f"Unexpected error: {str(e)}", None
+            error = f"Unexpected error: {str(e)}"
+        
+        timer.finish(False, error)
+        if transport:
+            transport.close()
+        return False, error, None
     
     def test_connection(self, connection: SSHConnection) -> tuple[bool, str]:
-        success, error, client = self.connect(connection)
+        success, error, client = self.connect(connection, operation="test")
         if success and client:
             client.close()
             return True, "Connection successful"
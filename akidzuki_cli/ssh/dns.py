@@ -0,0 +1,59 @@
+import socket
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+AddressInfo = Tuple[int, int, int, str, tuple]
+
+
+class DNSCache:
+    
+    def __init__(self, ttl: float = 300.0):
+        self.ttl = ttl
+        self._entries: Dict[Tuple[str, int], Tuple[float, List[AddressInfo]]] = {}
+        self._lock = threading.Lock()
+    
+    def resolve(self, hostname: str, port: int) -> List[AddressInfo]:
+        key = (hostname, port)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > now:
+                return entry[1]
+        
+        addresses = socket.getaddrinfo(hostname, port, 0, socket.SOCK_STREAM)
+        with self._lock:
+            self._entries[key] = (now + self.ttl, addresses)
+        return addresses
+    
+    def invalidate(self, hostname: str, port: int):
+        with self._lock:
+            self._entries.pop((hostname, port), None)
+    
+    def create_connection(self, hostname: str, port: int, timeout: Optional[float] = None) -> socket.socket:
+        error: Optional[Exception] = None
+        for family, socktype, proto, _, address in self.resolve(hostname, port):
+            sock = socket.socket(family, socktype, proto)
+            try:
+                sock.settimeout(timeout)
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                sock.connect(address)
+                return sock
+            except OSError as e:
+                sock.close()
+                error = e
+        
+        self.invalidate(hostname, port)
+        raise error or OSError(f"Could not resolve {hostname}")
+
+
+_dns_cache: Optional[DNSCache] = None
+_dns_cache_lock = threading.Lock()
+
+
+def get_dns_cache() -> DNSCache:
+    global _dns_cache
+    with _dns_cache_lock:
+        if _dns_cache is None:
+            _dns_cache = DNSCache()
+        return _dns_cache
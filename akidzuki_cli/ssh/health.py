@@ -0,0 +1,187 @@
+import logging
+import threading
+import time
+import paramiko
+from typing import Any, Callable, Dict, List, Optional
+
+from .keepalive import KeepaliveProbe
+
+
+logger = logging.getLogger(__name__)
+
+WHEEL_TICK = 0.5
+WHEEL_SLOTS = 512
+
+
+class _Watch:
+    
+    __slots__ = ("name", "transport", "probe", "idle_timeout", "channels", "on_close", "idle_since", "due_tick")
+    
+    def __init__(self, name: str, transport: paramiko.Transport, probe: KeepaliveProbe,
+                 idle_timeout: Optional[float], channels: Optional[Callable[[], int]],
+                 on_close: Optional[Callable[[str], None]]):
+        self.name = name
+        self.transport = transport
+        self.probe = probe
+        self.idle_timeout = idle_timeout
+        self.channels = channels
+        self.on_close = on_close
+        self.idle_since: Optional[float] = None
+        self.due_tick = 0
+
+
+class HealthScheduler:
+    
+    def __init__(self, tick: float = WHEEL_TICK, slots: int = WHEEL_SLOTS):
+        self.tick = tick
+        self._slots: List[List[_Watch]] = [[] for _ in range(slots)]
+        self._watches: Dict[int, _Watch] = {}
+        self._origin = time.monotonic()
+        self._cursor = 0
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self.wakeups = 0
+    
+    def _tick_of(self, deadline: float) -> int:
+        return max(self._cursor, int((deadline - self._origin) / self.tick))
+    
+    def _schedule(self, watch: _Watch, deadline: float):
+        watch.due_tick = self._tick_of(deadline)
+        self._slots[watch.due_tick % len(self._slots)].append(watch)
+    
+    def watch(self, transport: paramiko.Transport, name: str, interval: float, count_max: int = 3,
+              idle_timeout: Optional[float] = None, channels: Optional[Callable[[], int]] = None,
+              on_close: Optional[Callable[[str], None]] = None) -> KeepaliveProbe:
+        # idle_timeout needs channels, a count of the channels open on the transport
+        with self._cond:
+            existing = self._watches.get(id(transport))
+            if existing is not None and existing.transport is transport:
+                return existing.probe
+            
+            watch = _Watch(name, transport, KeepaliveProbe(transport, interval, count_max), idle_timeout, channels,
+                           on_close)
+            self._watches[id(transport)] = watch
+            self._schedule(watch, watch.probe.next_deadline())
+            
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="akidzuki-health", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+            return watch.probe
+    
+    def unwatch(self, transport: paramiko.Transport):
+        # the entry stays in its slot and is skipped when that slot comes due
+        with self._cond:
+            watch = self._watches.get(id(transport))
+            if watch is not None and watch.transport is transport:
+                del self._watches[id(transport)]
+                watch.probe.close()
+    
+    def stats(self) -> List[Dict[str, Any]]:
+        now = time.monotonic()
+        with self._cond:
+            watches = list(self._watches.values())
+        return [
+            {
+                "name": watch.name,
+                "active": watch.probe.alive,
+                "rtt_ms": round(watch.probe.rtt * 1000, 2) if watch.probe.rtt is not None else None,
+                "failures": watch.probe.failures,
+                "idle_s": round(now - watch.idle_since, 1) if watch.idle_since is not None else 0.0,
+            }
+            for watch in watches
+        ]
+    
+    def _next_wakeup(self) -> Optional[float]:
+        slots = len(self._slots)
+        for offset in range(slots):
+            if self._slots[(self._cursor + offset) % slots]:
+                return self._origin + (self._cursor + offset) * self.tick
+        return None
+    
+    def _collect_due(self) -> List[_Watch]:
+        current = int((time.monotonic() - self._origin) / self.tick)
+        slots = len(self._slots)
+        due = []
+        while self._cursor <= current:
+            index = self._cursor % slots
+            bucket = self._slots[index]
+            if bucket:
+                keep = []
+                for watch in bucket:
+                    if self._watches.get(id(watch.transport)) is not watch:
+                        continue
+                    if watch.due_tick <= self._cursor:
+                        due.append(watch)
+                    else:
+                        keep.append(watch)
+                self._slots[index] = keep
+            self._cursor += 1
+        return due
+    
+    def _run(self):
+        while True:
+            with self._cond:
+                due = self._collect_due()
+                if not due:
+                    wakeup = self._next_wakeup()
+                    self._cond.wait(None if wakeup is None else max(0.0, wakeup - time.monotonic()))
+                    continue
+            
+            self.wakeups += 1
+            now = time.monotonic()
+            for watch in due:
+                deadline = self._check(watch, now)
+                with self._cond:
+                    if self._watches.get(id(watch.transport)) is not watch:
+                        continue
+                    if deadline is None:
+                        del self._watches[id(watch.transport)]
+                        watch.probe.close()
+                    else:
+                        self._schedule(watch, deadline)
+    
+    def _check(self, watch: _Watch, now: float) -> Optional[float]:
+        if not watch.probe.poll(now, slack=self.tick):
+            logger.warning(f"Transport to {watch.name} is dead ({watch.probe.failures} unanswered keepalives)")
+            self._close(watch, "dead")
+            return None
+        
+        deadline = watch.probe.next_deadline()
+        if watch.idle_timeout and watch.channels is not None:
+            # a transport without open channels is idle
+            if watch.channels():
+                watch.idle_since = None
+            elif watch.idle_since is None:
+                watch.idle_since = now
+            elif now + self.tick - watch.idle_since >= watch.idle_timeout:
+                logger.info(f"Closing idle transport to {watch.name}")
+                self._close(watch, "idle")
+                return None
+            
+            if watch.idle_since is not None:
+                deadline = min(deadline, watch.idle_since + watch.idle_timeout)
+        return deadline
+    
+    def _close(self, watch: _Watch, reason: str):
+        try:
+            watch.transport.close()
+        except Exception:
+            pass
+        if watch.on_close:
+            try:
+                watch.on_close(reason)
+            except Exception as e:
+                logger.debug(f"Health close callback for {watch.name} failed: {e}")
+
+
+_health_scheduler: Optional[HealthScheduler] = None
+_health_scheduler_lock = threading.Lock()
+
+
+def get_health_scheduler() -> HealthScheduler:
+    global _health_scheduler
+    with _health_scheduler_lock:
+        if _health_scheduler is None:
+            _health_scheduler = HealthScheduler()
+        return _health_scheduler
@@ -0,0 +1,106 @@
+import logging
+import threading
+import paramiko
+from typing import Callable, Dict, List, Optional, Tuple
+
+from ..models.connection import SSHConnection
+from .transport import ChannelTracker
+
+
+logger = logging.getLogger(__name__)
+
+BastionKey = Tuple[Tuple[str, str, int], ...]
+
+
+def parse_jump_spec(spec: str, default_user: str) -> SSHConnection:
+    user = default_user
+    host = spec.strip()
+    port = 22
+    
+    if '@' in host:
+        user, host = host.rsplit('@', 1)
+    
+    if host.startswith('['):
+        end = host.find(']')
+        if end != -1:
+            rest = host[end + 1:]
+            host = host[1:end]
+            if rest.startswith(':') and rest[1:].isdigit():
+                port = int(rest[1:])
+    elif host.count(':') == 1:
+        host, port_str = host.split(':', 1)
+        if port_str.isdigit():
+            port = int(port_str)
+    
+    return SSHConnection(name=spec.strip(), host=host, hostname=host, user=user, port=port)
+
+
+def split_jump_chain(proxy_jump: Optional[str]) -> List[str]:
+    if not proxy_jump or proxy_jump.strip().lower() == 'none':
+        return []
+    return [part.strip() for part in proxy_jump.split(',') if part.strip()]
+
+
+class BastionPool:
+    
+    def __init__(self):
+        self._transports: Dict[BastionKey, paramiko.Transport] = {}
+        self._locks: Dict[BastionKey, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._channels = ChannelTracker()
+    
+    def _key_lock(self, key: BastionKey) -> threading.Lock:
+        with self._lock:
+            lock = self._locks.get(key)
+            if lock is None:
+                lock = self._locks[key] = threading.Lock()
+            return lock
+    
+    def get(self, key: BastionKey, factory: Callable[[], paramiko.Transport]) -> paramiko.Transport:
+        with self._key_lock(key):
+            transport = self._transports.get(key)
+            if transport is not None and transport.is_active():
+                return transport
+            
+            if transport is not None:
+                logger.info(f"Bastion transport lost, reconnecting: {key[-1][1]}")
+                transport.close()
+            
+            transport = factory()
+            self._transports[key] = transport
+            logger.info(f"Bastion transport opened: {key[-1][1]}:{key[-1][2]}")
+            return transport
+    
+    def open_channel(self, transport: paramiko.Transport, hostname: str, port: int,
+                     timeout: Optional[float] = None) -> paramiko.Channel:
+        channel = transport.open_channel('direct-tcpip', (hostname, port), ('127.0.0.1', 0), timeout=timeout)
+        return self._channels.add(transport, channel)
+    
+    def open_channels(self, transport: paramiko.Transport) -> int:
+        return self._channels.open_count(transport)
+    
+    def transports(self) -> List[paramiko.Transport]:
+        with self._lock:
+            return list(self._transports.values())
+    
+    def close_all(self):
+        with self._lock:
+            transports = list(self._transports.values())
+            self._transports.clear()
+        for transport in reversed(transports):
+            try:
+                transport.close()
+            except Exception:
+                pass
+
+
+_bastion_pool: Optional[BastionPool] = None
+_bastion_pool_lock = threading.Lock()
+
+
+def get_bastion_pool() -> BastionPool:
+    global _bastion_pool
+    with _bastion_pool_lock:
+        if _bastion_pool is None:
+            _bastion_pool = BastionPool()
+        return _bastion_pool
@@ -0,0 +1,111 @@
+import threading
+import time
+import paramiko
+from functools import partial
+from paramiko.common import MSG_REQUEST_FAILURE, MSG_REQUEST_SUCCESS, cMSG_GLOBAL_REQUEST
+from typing import Callable, Dict, Optional
+
+KEEPALIVE_REQUEST = "keepalive@openssh.com"
+_REPLIES = (MSG_REQUEST_SUCCESS, MSG_REQUEST_FAILURE)
+
+
+class KeepaliveProbe:
+    # Sends keepalive@openssh.com without waiting and picks up the reply on the transport's
+    # own reader thread: the probe puts handlers for MSG_REQUEST_SUCCESS and MSG_REQUEST_FAILURE
+    # in front of paramiko's and consumes one reply per keepalive it has sent. Nothing waits on
+    # completion_event, which key exchange also uses. The client sends no other global
+    # requests, so replies are matched to keepalives by count.
+    
+    def __init__(self, transport: paramiko.Transport, interval: float, count_max: int = 3):
+        self.transport = transport
+        self.interval = interval
+        self.count_max = count_max
+        self.failures = 0
+        self.rtt: Optional[float] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._waiting = False
+        self._replied_at: Optional[float] = None
+        self._sent_at = 0.0
+        self._next_at = time.monotonic() + interval
+        self._handlers: Dict[int, Callable] = {}
+        self._hooks: Dict[int, Callable] = {}
+        table = transport._handler_table
+        for ptype in _REPLIES:
+            self._handlers[ptype] = table[ptype]
+            self._hooks[ptype] = table[ptype] = partial(self._on_reply, ptype)
+    
+    @property
+    def alive(self) -> bool:
+        return self.transport.is_active() and self.failures < self.count_max
+    
+    def close(self):
+        table = self.transport._handler_table
+        for ptype, hook in self._hooks.items():
+            if table.get(ptype) is hook:
+                table[ptype] = self._handlers[ptype]
+        self._hooks = {}
+    
+    def _on_reply(self, ptype: int, message: paramiko.Message):
+        # runs on the transport thread; a reply to anything but a keepalive goes to paramiko
+        with self._lock:
+            if self._pending:
+                self._pending -= 1
+                if not self._pending:
+                    self._replied_at = time.monotonic()
+                return
+        self._handlers[ptype](message)
+    
+    def _send(self):
+        # _send_user_message blocks while a key exchange is running, so the send is put off
+        # instead of stalling the caller; the wait still counts towards the failures
+        clear_to_send = getattr(self.transport, 'clear_to_send', None)
+        if clear_to_send is not None and not clear_to_send.is_set():
+            return
+        # what global_request(wait=False) sends, but with want_reply set: without it the
+        # server stays silent and there is nothing to time
+        message = paramiko.Message()
+        message.add_byte(cMSG_GLOBAL_REQUEST)
+        message.add_string(KEEPALIVE_REQUEST)
+        message.add_boolean(True)
+        with self._lock:
+            self._pending += 1
+        try:
+            self.transport._send_user_message(message)
+        except (EOFError, OSError, paramiko.SSHException):
+            with self._lock:
+                self._pending -= 1
+    
+    def poll(self, now: Optional[float] = None, slack: float = 0.0) -> bool:
+        # slack lets a coarse scheduler fire a little before the deadline
+        now = time.monotonic() if now is None else now
+        if not self.transport.is_active():
+            return False
+        
+        with self._lock:
+            replied_at, self._replied_at = self._replied_at, None
+            pending = self._pending
+        if replied_at is not None:
+            self.rtt = replied_at - self._sent_at
+            self.failures = 0
+            self._waiting = False
+            self._next_at = self._sent_at + self.interval
+        elif self._waiting:
+            # still unanswered: one failure per interval it has been outstanding
+            self.failures = int((now + slack - self._sent_at) // self.interval)
+            if self.failures >= self.count_max:
+                return False
+            if not pending:
+                self._send()
+            return True
+        
+        if now + slack >= self._next_at:
+            self._sent_at = now
+            self._waiting = True
+            self._send()
+        return True
+    
+    def next_deadline(self) -> float:
+        if self._waiting:
+            return self._sent_at + self.interval * (self.failures + 1)
+        return self._next_at
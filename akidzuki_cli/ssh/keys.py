@@ -0,0 +1,126 @@
+import base64
+import hashlib
+import logging
+import os
+import threading
+import paramiko
+from typing import Dict, List, Optional, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+PASSPHRASE_SERVICE = "ssh-cli"
+
+
+class KeyManager:
+    
+    def __init__(self, use_agent: bool = True):
+        self.use_agent = use_agent
+        self._keys: Dict[str, Tuple[tuple, paramiko.PKey]] = {}
+        self._path_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._agent: Optional[paramiko.Agent] = None
+        self._agent_keys: Optional[List[paramiko.PKey]] = None
+    
+    def _stamp(self, path: str) -> tuple:
+        stat = os.stat(path)
+        return stat.st_mtime_ns, stat.st_size
+    
+    def _path_lock(self, path: str) -> threading.Lock:
+        with self._lock:
+            lock = self._path_locks.get(path)
+            if lock is None:
+                lock = self._path_locks[path] = threading.Lock()
+            return lock
+    
+    def agent_keys(self) -> List[paramiko.PKey]:
+        if not self.use_agent:
+            return []
+        
+        with self._lock:
+            if self._agent_keys is None:
+                try:
+                    self._agent = paramiko.Agent()
+                    self._agent_keys = list(self._agent.get_keys())
+                    logger.debug(f"Loaded {len(self._agent_keys)} key(s) from ssh-agent")
+                except Exception as e:
+                    logger.debug(f"ssh-agent not available: {e}")
+                    self._agent_keys = []
+            return self._agent_keys
+    
+    def find_agent_key(self, fingerprint: str) -> Optional[paramiko.PKey]:
+        for key in self.agent_keys():
+            if key.get_fingerprint().hex() == fingerprint:
+                return key
+        return None
+    
+    def _agent_key_for_file(self, path: str) -> Optional[paramiko.PKey]:
+        if not self.use_agent or not os.path.isfile(path + ".pub"):
+            return None
+        try:
+            with open(path + ".pub", 'r', encoding='utf-8') as f:
+                blob = base64.b64decode(f.read().split()[1])
+        except Exception:
+            return None
+        return self.find_agent_key(hashlib.md5(blob).hexdigest())
+    
+    def _stored_passphrase(self, path: str) -> Optional[str]:
+        try:
+            import keyring
+            return keyring.get_password(PASSPHRASE_SERVICE, f"passphrase:{path}")
+        except Exception:
+            return None
+    
+    def _decrypt(self, path: str, passphrase: Optional[str]) -> paramiko.PKey:
+        try:
+            return paramiko.PKey.from_path(path)
+        except (TypeError, paramiko.PasswordRequiredException):
+            pass
+        
+        for candidate in (self._stored_passphrase(path), passphrase):
+            if not candidate:
+                continue
+            try:
+                return paramiko.PKey.from_path(path, candidate.encode())
+            except (ValueError, TypeError, paramiko.SSHException):
+                continue
+        raise paramiko.PasswordRequiredException(f"Private key is encrypted: {path}")
+    
+    def load(self, path: str, passphrase: Optional[str] = None) -> paramiko.PKey:
+        path = os.path.realpath(os.path.expanduser(path))
+        
+        with self._path_lock(path):
+            stamp = self._stamp(path)
+            cached = self._keys.get(path)
+            if cached and cached[0] == stamp:
+                return cached[1]
+            
+            key = self._agent_key_for_file(path)
+            if key is None:
+                key = self._decrypt(path, passphrase)
+                logger.debug(f"Loaded private key: {path}")
+            else:
+                logger.debug(f"Using ssh-agent key for: {path}")
+            
+            self._keys[path] = (stamp, key)
+            return key
+    
+    def clear(self):
+        with self._lock:
+            self._keys.clear()
+            self._agent_keys = None
+            if self._agent:
+                self._agent.close()
+                self._agent = None
+
+
+_key_manager: Optional[KeyManager] = None
+_key_manager_lock = threading.Lock()
+
+
+def get_key_manager() -> KeyManager:
+    global _key_manager
+    with _key_manager_lock:
+        if _key_manager is None:
+            _key_manager = KeyManager()
+        return _key_manager
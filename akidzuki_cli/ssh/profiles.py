@@ -0,0 +1,81 @@
+import logging
+import paramiko
+from typing import Any, Dict, Optional, Tuple
+
+from ..models.connection import SSHConnection
+from ..settings import Settings
+
+
+logger = logging.getLogger(__name__)
+
+CRYPTO_PROFILES: Dict[str, Dict[str, Any]] = {
+    "default": {},
+    "fast": {
+        "ciphers": ["aes128-gcm@openssh.com", "aes256-gcm@openssh.com", "aes128-ctr", "aes256-ctr"],
+        "macs": ["hmac-sha2-256-etm@openssh.com", "hmac-sha2-256", "hmac-sha2-512"],
+        "kex": ["curve25519-sha256@libssh.org", "ecdh-sha2-nistp256", "diffie-hellman-group14-sha256"],
+        "compression": False,
+    },
+    "secure": {
+        "ciphers": ["aes256-gcm@openssh.com", "aes256-ctr"],
+        "macs": ["hmac-sha2-512-etm@openssh.com", "hmac-sha2-256-etm@openssh.com", "hmac-sha2-512"],
+        "kex": ["curve25519-sha256@libssh.org", "diffie-hellman-group16-sha512", "ecdh-sha2-nistp384"],
+        "compression": False,
+    },
+    "wan": {
+        "ciphers": ["aes128-gcm@openssh.com", "aes128-ctr", "aes256-ctr"],
+        "macs": ["hmac-sha2-256-etm@openssh.com", "hmac-sha2-256"],
+        "kex": ["curve25519-sha256@libssh.org", "ecdh-sha2-nistp256"],
+        "compression": True,
+    },
+    "compat": {
+        "ciphers": ["aes128-ctr", "aes256-ctr", "aes128-cbc", "aes256-cbc", "3des-cbc"],
+        "macs": ["hmac-sha2-256", "hmac-sha1", "hmac-md5"],
+        "compression": False,
+    },
+}
+
+_OPTION_FIELDS = {
+    "ciphers": "ciphers",
+    "macs": "digests",
+    "kex": "kex",
+    "host_key_types": "key_types",
+}
+
+
+def available_profiles(settings: Optional[Settings] = None) -> Dict[str, Dict[str, Any]]:
+    profiles = dict(CRYPTO_PROFILES)
+    if settings:
+        profiles.update(settings.get_crypto_profiles())
+    return profiles
+
+
+def resolve_crypto_profile(connection: SSHConnection, settings: Optional[Settings] = None) -> Tuple[str, Dict[str, Any]]:
+    name = connection.crypto_profile
+    if not name and settings:
+        name = settings.get_group_crypto_profiles().get(connection.group or "") or settings.get_crypto_profile()
+    name = name or "default"
+    
+    profiles = available_profiles(settings)
+    if name not in profiles:
+        logger.warning(f"Unknown crypto profile '{name}' for {connection.name}, using defaults")
+        return "default", {}
+    return name, profiles[name]
+
+
+def apply_crypto_profile(transport: paramiko.Transport, profile: Dict[str, Any]):
+    options = transport.get_security_options()
+    
+    for key, field in _OPTION_FIELDS.items():
+        wanted = profile.get(key)
+        if not wanted:
+            continue
+        supported = set(getattr(options, field))
+        chosen = [name for name in wanted if name in supported]
+        if not chosen:
+            logger.warning(f"None of the {key} in the crypto profile are supported: {', '.join(wanted)}")
+            continue
+        setattr(options, field, chosen)
+    
+    if "compression" in profile:
+        transport.use_compression(bool(profile["compression"]))
@@ -0,0 +1,238 @@
+import codecs
+import gzip
+import io
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import BinaryIO, Iterator, Optional, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+GZIP_MAGIC = b'\x1f\x8b'
+ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+MAX_OVERFLOW_BYTES = 8 * 1024 * 1024
+CLOSE_PUT_TIMEOUT = 0.5
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+def recording_suffix(compression: str) -> str:
+    if compression == "zstd" and zstandard is not None:
+        return ".cast.zst"
+    if compression == "none":
+        return ".cast"
+    return ".cast.gz"
+
+
+def _open_writer(path: Path, compression: str) -> BinaryIO:
+    if compression == "zstd":
+        if zstandard is not None:
+            return zstandard.ZstdCompressor(level=3).stream_writer(open(path, 'wb'))
+        logger.warning("zstandard is not installed, recording with gzip instead")
+    if compression == "none":
+        return open(path, 'wb')
+    return gzip.open(path, 'wb', compresslevel=6)
+
+
+def _open_reader(path: Path) -> io.TextIOBase:
+    with open(path, 'rb') as f:
+        magic = f.read(4)
+    
+    if magic.startswith(GZIP_MAGIC):
+        return io.TextIOWrapper(gzip.open(path, 'rb'), encoding='utf-8')
+    if magic == ZSTD_MAGIC:
+        if zstandard is None:
+            raise RuntimeError("Recording is zstd-compressed but zstandard is not installed")
+        reader = zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'))
+        return io.TextIOWrapper(io.BufferedReader(reader), encoding='utf-8')
+    return open(path, 'r', encoding='utf-8')
+
+
+class SessionRecorder:
+    
+    def __init__(self, path: str, width: int = 80, height: int = 24, record_input: bool = False,
+                 compression: str = "gzip", queue_size: int = 4096, title: Optional[str] = None):
+        self.path = Path(path)
+        self.width = width
+        self.height = height
+        self.record_input = record_input
+        self.compression = compression
+        self.title = title
+        self.dropped_bytes = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._overflow: deque = deque()
+        self._overflow_bytes = 0
+        self._started_at = 0.0
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        self._lock = threading.Lock()
+    
+    @property
+    def started(self) -> bool:
+        return self._thread is not None
+    
+    def start(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        stream = _open_writer(self.path, self.compression)
+        
+        header = {
+            "version": 2,
+            "width": self.width,
+            "height": self.height,
+            "timestamp": int(time.time()),
+            "env": {"TERM": os.environ.get("TERM", "xterm-256color"), "SHELL": os.environ.get("SHELL", "")},
+        }
+        if self.title:
+            header["title"] = self.title
+        stream.write((json.dumps(header) + '\n').encode('utf-8'))
+        
+        self._started_at = time.monotonic()
+        self._thread = threading.Thread(target=self._write_loop, args=(stream,), name="session-recorder", daemon=True)
+        self._thread.start()
+        logger.info(f"Recording session to {self.path}")
+    
+    def _enqueue(self, kind: str, data: bytes):
+        if self._closed or not data:
+            return
+        
+        elapsed = time.monotonic() - self._started_at
+        with self._lock:
+            if self._overflow and not self._flush_overflow():
+                self._buffer_overflow(elapsed, kind, data)
+                return
+            
+            try:
+                self._queue.put_nowait((elapsed, kind, data))
+            except queue.Full:
+                self._buffer_overflow(elapsed, kind, data)
+    
+    def _buffer_overflow(self, elapsed: float, kind: str, data: bytes):
+        if self._overflow_bytes + len(data) > MAX_OVERFLOW_BYTES:
+            self.dropped_bytes += len(data)
+            return
+        self._overflow.append((elapsed, kind, data))
+        self._overflow_bytes += len(data)
+    
+    def _flush_overflow(self) -> bool:
+        while self._overflow:
+            try:
+                self._queue.put_nowait(self._overflow[0])
+            except queue.Full:
+                return False
+            self._overflow_bytes -= len(self._overflow.popleft()[2])
+        return True
+    
+    def record_output(self, data: bytes):
+        self._enqueue("o", data)
+    
+    def record_keys(self, data: bytes):
+        if self.record_input:
+            self._enqueue("i", data)
+    
+    def _write_loop(self, stream: BinaryIO):
+        decoders = {
+            "o": codecs.getincrementaldecoder('utf-8')('replace'),
+            "i": codecs.getincrementaldecoder('utf-8')('replace'),
+        }
+        try:
+            while True:
+                item = self._queue.get()
+                if item is None:
+                    break
+                elapsed, kind, data = item
+                text = decoders[kind].decode(data)
+                if text:
+                    line = json.dumps([round(elapsed, 6), kind, text], ensure_ascii=False)
+                    stream.write((line + '\n').encode('utf-8'))
+        except Exception as e:
+            logger.error(f"Session recorder failed: {e}")
+        finally:
+            try:
+                stream.close()
+            except Exception:
+                pass
+    
+    def _put(self, item) -> bool:
+        # the writer stops on any error (e.g. disk full) and then nobody drains the
+        # queue; closing must not hang the terminal waiting for it
+        while self._thread.is_alive():
+            try:
+                self._queue.put(item, timeout=CLOSE_PUT_TIMEOUT)
+                return True
+            except queue.Full:
+                continue
+        return False
+    
+    def close(self):
+        if self._closed or self._thread is None:
+            self._closed = True
+            return
+        
+        with self._lock:
+            self._closed = True
+            while self._overflow:
+                if not self._put(self._overflow[0]):
+                    self.dropped_bytes += sum(len(item[2]) for item in self._overflow)
+                    break
+                self._overflow.popleft()
+            self._overflow.clear()
+        self._put(None)
+        self._thread.join(timeout=10)
+        
+        if self.dropped_bytes:
+            logger.warning(f"Session recorder dropped {self.dropped_bytes} bytes: {self.path}")
+        logger.info(f"Recording saved: {self.path}")
+
+
+def read_recording(path: str) -> Tuple[dict, Iterator[Tuple[float, str, str]]]:
+    stream = _open_reader(Path(path))
+    header = json.loads(stream.readline())
+    
+    def events():
+        with stream:
+            for line in stream:
+                line = line.strip()
+                if not line:
+                    continue
+                elapsed, kind, data = json.loads(line)
+                yield float(elapsed), kind, data
+    
+    return header, events()
+
+
+def replay_recording(path: str, seek: float = 0.0, speed: float = 1.0, idle_limit: Optional[float] = None,
+                     output: Optional[BinaryIO] = None) -> dict:
+    output = output or sys.stdout.buffer
+    header, events = read_recording(path)
+    speed = speed if speed > 0 else 1.0
+    
+    last = seek
+    for elapsed, kind, data in events:
+        if kind != "o":
+            continue
+        
+        if elapsed > seek:
+            delay = elapsed - last
+            if idle_limit is not None:
+                delay = min(delay, idle_limit)
+            if delay > 0:
+                time.sleep(delay / speed)
+            last = elapsed
+        
+        output.write(data.encode('utf-8'))
+        if elapsed > seek:
+            output.flush()
+    
+    output.flush()
+    
+    return header
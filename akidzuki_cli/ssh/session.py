@@ -5,27 +5,56 @@ import os
 import socket
 import threading
 import queue
+import shutil
 
 from typing import Optional, Callable
 
+from ..models.connection import SSHConnection
+from ..utils.metrics import get_metrics
+from .keepalive import KeepaliveProbe
+from .recorder import SessionRecorder
+from .transport import TransportClient
+
 if sys.platform == 'win32':
     import msvcrt
 
 
 class SSHSession:
-    def __init__(self, ssh_client: paramiko.SSHClient, connection_name: str):
+    def __init__(self, ssh_client: TransportClient, connection_name: str,
+                 recorder: Optional[SessionRecorder] = None, connection: Optional[SSHConnection] = None,
+                 remote_command: Optional[str] = None):
         self.ssh_client = ssh_client
         self.connection_name = connection_name
+        self.connection = connection
+        self.recorder = recorder
+        self.remote_command = remote_command
+        self.keepalive: Optional[KeepaliveProbe] = None
         self.channel: Optional[paramiko.Channel] = None
         self.is_active = False
         self.on_exit: Optional[Callable] = None
         self.returned_to_menu = False
+        self.connection_lost = False
+        self.bytes_received = 0
+        self.bytes_sent = 0
+        self._shell_started = 0.0
+        self._closed = False
+        get_metrics().gauge('akidzuki_sessions_active', 'Interactive sessions currently open').inc()
     
     def start_interactive_shell(self, on_exit: Optional[Callable] = None):
         self.on_exit = on_exit
-        self.channel = self.ssh_client.invoke_shell(term='xterm-256color')
+        self.connection_lost = False
+        width, height = shutil.get_terminal_size()
+        self.channel = self.ssh_client.invoke_shell(
+            term='xterm-256color', width=width, height=height, command=self.remote_command
+        )
         self.channel.setblocking(0)
         self.is_active = True
+        self._shell_started = time.monotonic()
+        
+        if self.recorder and not self.recorder.started:
+            self.recorder.width = width
+            self.recorder.height = height
+            self.recorder.start()
         
         time.sleep(0.1)
         
@@ -51,13 +80,19 @@ class SSHSession:
                 if self.channel.closed:
                     break
                 
+                if self.keepalive and not self.keepalive.alive:
+                    break
+                
                 ready_channels = select.select([self.channel], [], [], 0.1)[0]
                 if ready_channels:
                     try:
                         data = self.channel.recv(4096)
                         if data:
+                            self.bytes_received += len(data)
                             os.write(sys.stdout.fileno(), data)
                             sys.stdout.flush()
+                            if self.recorder:
+                                self.recorder.record_output(data)
                         else:
                             if self.channel.closed:
                                 break
@@ -80,6 +115,9 @@ class SSHSession:
                         
                         if not self.channel.closed:
                             self.channel.send(data)
+                            self.bytes_sent += len(data)
+                            if self.recorder:
+                                self.recorder.record_keys(data)
                     except Exception:
                         if self.channel.closed:
                             break
@@ -87,7 +125,7 @@ class SSHSession:
         except KeyboardInterrupt:
             pass
         finally:
-            self.stop()
+            self._finish_shell()
     
     def _start_interactive_shell_windows(self):        
         input_queue = queue.Queue()
@@ -151,10 +189,16 @@ class SSHSession:
                 if self.channel.closed:
                     break
                 
+                if self.keepalive and not self.keepalive.alive:
+                    break
+                
                 try:
                     data = self.channel.recv(4096)
                     if data:
+                        self.bytes_received += len(data)
                         output_queue.put(data)
+                        if self.recorder:
+                            self.recorder.record_output(data)
                 except (socket.timeout, OSError, IOError) as e:
                     errno = getattr(e, 'errno', None)
                     if errno in (10035, 11):
@@ -181,6 +225,9 @@ class SSHSession:
                         if self.channel.closed:
                             break
                         self.channel.send(ch)
+                        self.bytes_sent += len(ch)
+                        if self.recorder:
+                            self.recorder.record_keys(ch)
                 except queue.Empty:
                     pass
                 except Exception:
@@ -193,15 +240,67 @@ class SSHSession:
             pass
         finally:
             stop_event.set()
+            self._finish_shell()
+    
+    def _transport_lost(self) -> bool:
+        # exit_status_ready() is also true for a channel closed by a dead transport
+        if self.returned_to_menu or self.channel is None or self.channel.exit_status != -1:
+            return False
+        transport = self.ssh_client.get_transport() if self.ssh_client else None
+        if transport is None or not transport.is_active():
+            return True
+        return self.keepalive is not None and not self.keepalive.alive
+    
+    def _report_transfer(self):
+        # counted locally in the shell loop and added to the shared counters once per shell
+        metrics = get_metrics()
+        transferred = metrics.counter('akidzuki_session_bytes_total', 'Bytes moved by interactive sessions',
+                                      ('direction',))
+        transferred.inc(self.bytes_received, direction='received')
+        transferred.inc(self.bytes_sent, direction='sent')
+        self.bytes_received = self.bytes_sent = 0
+        if self._shell_started:
+            metrics.counter('akidzuki_session_seconds_total', 'Time spent in interactive shells').inc(
+                time.monotonic() - self._shell_started
+            )
+            self._shell_started = 0.0
+    
+    def _finish_shell(self):
+        self._report_transfer()
+        self.connection_lost = self._transport_lost()
+        if not self.connection_lost:
             self.stop()
+            return
+        
+        self.is_active = False
+        self._restore_terminal()
+        if self.channel:
+            try:
+                self.channel.close()
+            except Exception:
+                pass
     
-    def _handle_menu_return(self):
+    def resume(self, ssh_client: TransportClient):
+        old_client = self.ssh_client
+        self.ssh_client = ssh_client
+        self.channel = None
+        self.connection_lost = False
+        if old_client and old_client is not ssh_client:
+            try:
+                old_client.close()
+            except Exception:
+                pass
+    
+    def _restore_terminal(self):
         if sys.platform != 'win32' and hasattr(self, 'old_settings'):
             try:
                 import termios
                 termios.tcsetattr(sys.stdin, termios.TCSADRAIN, self.old_settings)
             except Exception:
                 pass
+    
+    def _handle_menu_return(self):
+        self._restore_terminal()
         
         self.returned_to_menu = True
         self.is_active = False
@@ -212,21 +311,23 @@ class SSHSession:
     def stop(self):
         self.is_active = False
         
-        if sys.platform != 'win32' and hasattr(self, 'old_settings'):
-            try:
-                import termios
-                termios.tcsetattr(sys.stdin, termios.TCSADRAIN, self.old_settings)
-            except Exception:
-                pass
+        self._restore_terminal()
         
         if self.channel:
             try:
                 self.channel.close()
             except Exception:
                 pass
-            
+    
     def close(self):
+        # stop() also runs on Ctrl+B, when the session is resumed later; the recording
+        # ends only with the session
         self.stop()
+        if self.recorder:
+            self.recorder.close()
+        if not self._closed:
+            self._closed = True
+            get_metrics().gauge('akidzuki_sessions_active', 'Interactive sessions currently open').dec()
         if self.ssh_client:
             try:
                 self.ssh_client.close()
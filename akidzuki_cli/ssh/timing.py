@@ -0,0 +1,242 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterator, List, Optional
+
+from ..models.connection import SSHConnection
+from ..utils.metrics import get_metrics
+
+
+logger = logging.getLogger(__name__)
+
+# in the order they happen; jump is the bastion transport, tcp the socket or forwarded channel
+PHASES = ('dns', 'jump', 'tcp', 'kex', 'auth', 'channel', 'pty', 'shell', 'exec')
+# operations on an established transport; they add phases but not connection totals
+CHANNEL_OPERATIONS = ('shell', 'exec')
+PERCENTILES = (50, 90, 99)
+STATS_FIELDS = ['connection', 'phase', 'count', 'failures', 'p50_ms', 'p90_ms', 'p99_ms', 'max_ms']
+
+
+class TimingHistory:
+    # append-only NDJSON file; once it holds a quarter more than max_records it is
+    # rewritten with the newest max_records, so appends stay cheap and the file bounded
+    
+    def __init__(self, path: str, max_records: int = 5000):
+        self.path = Path(path)
+        self.max_records = max(1, max_records)
+        self._count: Optional[int] = None
+        self._lock = threading.Lock()
+    
+    def _line_count(self) -> int:
+        try:
+            with open(self.path, 'rb') as f:
+                return sum(chunk.count(b'\n') for chunk in iter(lambda: f.read(1 << 16), b''))
+        except OSError:
+            return 0
+    
+    def append(self, record: Dict[str, Any]):
+        line = json.dumps(record, separators=(',', ':')) + '\n'
+        with self._lock:
+            try:
+                if self._count is None:
+                    self._count = self._line_count()
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write(line)
+                self._count += 1
+                if self._count > self.max_records + self.max_records // 4:
+                    self._compact()
+            except OSError as e:
+                logger.debug(f"Could not write timing history {self.path}: {e}")
+    
+    def _compact(self):
+        records = list(self._iter_lines())[-self.max_records:]
+        tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.writelines(records)
+        os.replace(tmp_path, self.path)
+        self._count = len(records)
+    
+    def _iter_lines(self) -> Iterator[str]:
+        try:
+            f = open(self.path, 'r', encoding='utf-8')
+        except OSError:
+            return
+        with f:
+            yield from f
+    
+    def records(self) -> Iterator[Dict[str, Any]]:
+        for line in self._iter_lines():
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(record, dict) and isinstance(record.get("phases"), dict):
+                yield record
+
+
+class MemoryTimingHistory(TimingHistory):
+    # the same interface without the file, for benchmarks and other short-lived callers
+    
+    def __init__(self, max_records: int = 5000):
+        self.path = None
+        self.max_records = max(1, max_records)
+        self._records: Deque[Dict[str, Any]] = deque(maxlen=self.max_records)
+        self._lock = threading.Lock()
+    
+    def append(self, record: Dict[str, Any]):
+        with self._lock:
+            self._records.append(record)
+    
+    def records(self) -> Iterator[Dict[str, Any]]:
+        with self._lock:
+            return iter(list(self._records))
+
+
+class ConnectTimer:
+    
+    def __init__(self, operation: str, connection: SSHConnection, history: Optional[TimingHistory] = None):
+        self.operation = operation
+        self.connection = connection
+        self.history = history
+        self.phases: Dict[str, float] = {}
+        self.failed_phase: Optional[str] = None
+        self.started_at = time.time()
+        self._started = time.perf_counter()
+    
+    @contextmanager
+    def phase(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            self.failed_phase = self.failed_phase or name
+            raise
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + (time.perf_counter() - started) * 1000
+    
+    def child(self, operation: str) -> 'ConnectTimer':
+        return ConnectTimer(operation, self.connection, self.history)
+    
+    def finish(self, ok: bool, error: Optional[str] = None) -> Dict[str, Any]:
+        total_ms = (time.perf_counter() - self._started) * 1000
+        conn = self.connection
+        record = {
+            "ts": datetime.fromtimestamp(self.started_at).isoformat(timespec='milliseconds'),
+            "op": self.operation,
+            "connection": conn.name,
+            "host": f"{conn.hostname}:{conn.port}",
+            "ok": ok,
+            "total_ms": round(total_ms, 2),
+            "phases": {name: round(ms, 2) for name, ms in self.phases.items()},
+        }
+        if not ok:
+            record["failed_phase"] = self.failed_phase
+            record["error"] = error
+        
+        phases = " ".join(f"{name}={ms:.1f}ms" for name, ms in record["phases"].items())
+        logger.log(
+            logging.INFO if ok else logging.WARNING,
+            f"{self.operation} {conn.name} {'ok' if ok else 'failed'} in {total_ms:.1f}ms: {phases}",
+            extra={"event": "connect_timing", **{f"timing_{key}": value for key, value in record.items()}}
+        )
+        if self.history is not None:
+            self.history.append(record)
+        _observe(record)
+        return record
+
+
+def _observe(record: Dict[str, Any]):
+    metrics = get_metrics()
+    operation = record["op"]
+    metrics.counter(
+        'akidzuki_connect_attempts_total', 'Connect attempts by operation, result and the phase that failed',
+        ('op', 'result', 'failed_phase')
+    ).inc(op=operation, result='ok' if record["ok"] else 'failed', failed_phase=record.get("failed_phase"))
+    if record["ok"] and operation not in CHANNEL_OPERATIONS:
+        metrics.histogram(
+            'akidzuki_connect_duration_seconds', 'Time to an authenticated transport', ('op',)
+        ).observe(record["total_ms"] / 1000, op=operation)
+    
+    phases = metrics.histogram('akidzuki_connect_phase_seconds', 'Duration of completed connect phases', ('op', 'phase'))
+    for phase, ms in record["phases"].items():
+        if record["ok"] or phase != record.get("failed_phase"):
+            phases.observe(ms / 1000, op=operation, phase=phase)
+
+
+def percentile(values: List[float], q: float) -> float:
+    # linear interpolation between closest ranks; values must be sorted
+    if not values:
+        return 0.0
+    position = (len(values) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+def _row(connection: str, phase: str, values: List[float], failures: int) -> Dict[str, Any]:
+    values.sort()
+    row = {"connection": connection, "phase": phase, "count": len(values), "failures": failures}
+    for q in PERCENTILES:
+        row[f"p{q}_ms"] = round(percentile(values, q), 1)
+    row["max_ms"] = round(values[-1], 1) if values else 0.0
+    return row
+
+
+def summarize(records: Iterator[Dict[str, Any]], name: Optional[str] = None,
+              operation: Optional[str] = None) -> List[Dict[str, Any]]:
+    # with a name: total and every phase for that connection; without one: the total per
+    # connection (slowest p90 first) followed by every phase across all connections
+    totals: Dict[str, List[float]] = defaultdict(list)
+    failures: Dict[str, int] = defaultdict(int)
+    phases: Dict[str, List[float]] = defaultdict(list)
+    phase_failures: Dict[str, int] = defaultdict(int)
+    
+    for record in records:
+        connection = record.get("connection")
+        if (name is not None and connection != name) or (operation is not None and record.get("op") != operation):
+            continue
+        if record.get("op") in CHANNEL_OPERATIONS:
+            if not record.get("ok"):
+                phase_failures[record.get("failed_phase") or "total"] += 1
+        elif record.get("ok"):
+            totals[connection].append(record.get("total_ms", 0.0))
+        else:
+            failures[connection] += 1
+            phase_failures[record.get("failed_phase") or "total"] += 1
+        for phase, ms in record["phases"].items():
+            if record.get("ok") or phase != record.get("failed_phase"):
+                phases[phase].append(ms)
+    
+    label = name or "*"
+    phase_rows = [
+        _row(label, phase, phases[phase], phase_failures.get(phase, 0))
+        for phase in sorted(set(phases) | set(phase_failures), key=lambda p: PHASES.index(p) if p in PHASES else 99)
+        if phase != "total"
+    ]
+    if name is not None:
+        if name not in totals and name not in failures:
+            return []
+        return [_row(name, "total", totals[name], failures[name])] + phase_rows
+    
+    connection_rows = [_row(connection, "total", totals[connection], failures[connection])
+                       for connection in set(totals) | set(failures)]
+    connection_rows.sort(key=lambda row: (-row["p90_ms"], row["connection"]))
+    return connection_rows + phase_rows
+
+
+_histories: Dict[str, TimingHistory] = {}
+_histories_lock = threading.Lock()
+
+
+def get_timing_history(path: str, max_records: int = 5000) -> TimingHistory:
+    with _histories_lock:
+        history = _histories.get(path)
+        if history is None:
+            history = _histories[path] = TimingHistory(path, max_records)
+        return history
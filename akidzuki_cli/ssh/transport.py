@@ -0,0 +1,81 @@
+import threading
+import weakref
+import paramiko
+from contextlib import nullcontext
+from typing import List, Optional
+
+from .timing import ConnectTimer
+
+
+class ChannelTracker:
+    # paramiko's channel map is private, so channels are counted as they are opened
+    # here and dropped once paramiko marks them closed
+    
+    def __init__(self):
+        self._channels: 'weakref.WeakKeyDictionary[paramiko.Transport, List[paramiko.Channel]]' = \
+            weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+    
+    def add(self, transport: paramiko.Transport, channel: paramiko.Channel) -> paramiko.Channel:
+        with self._lock:
+            self._channels.setdefault(transport, []).append(channel)
+        return channel
+    
+    def open_count(self, transport: paramiko.Transport) -> int:
+        with self._lock:
+            channels = [channel for channel in self._channels.get(transport, ()) if not channel.closed]
+            if channels:
+                self._channels[transport] = channels
+            else:
+                self._channels.pop(transport, None)
+            return len(channels)
+
+
+class TransportClient:
+    
+    def __init__(self, transport: paramiko.Transport, timer: Optional[ConnectTimer] = None):
+        self._transport = transport
+        self._timer = timer
+        self._channels = ChannelTracker()
+    
+    def get_transport(self) -> Optional[paramiko.Transport]:
+        return self._transport
+    
+    def open_channels(self) -> int:
+        return self._channels.open_count(self._transport) if self._transport else 0
+    
+    def invoke_shell(self, term: str = 'vt100', width: int = 80, height: int = 24,
+                     command: Optional[str] = None) -> paramiko.Channel:
+        if self._timer is None:
+            return self._open_shell(term, width, height, command)
+        
+        timer = self._timer.child('exec' if command else 'shell')
+        try:
+            channel = self._open_shell(term, width, height, command, timer)
+        except Exception as e:
+            timer.finish(False, str(e) or type(e).__name__)
+            raise
+        timer.finish(True)
+        return channel
+    
+    def _open_shell(self, term: str, width: int, height: int, command: Optional[str],
+                    timer: Optional[ConnectTimer] = None) -> paramiko.Channel:
+        def phase(name: str):
+            return timer.phase(name) if timer else nullcontext()
+        
+        with phase('channel'):
+            channel = self._channels.add(self._transport, self._transport.open_session())
+        with phase('pty'):
+            channel.get_pty(term, width, height)
+        if command:
+            with phase('exec'):
+                channel.exec_command(command)
+        else:
+            with phase('shell'):
+                channel.invoke_shell()
+        return channel
+    
+    def close(self):
+        if self._transport:
+            self._transport.close()
+            self._transport = None
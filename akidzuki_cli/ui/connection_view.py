@@ -59,6 +59,8 @@ class ConnectionEditor:
         
         identity_file = Prompt.ask("Identity file path (SSH key)", default="").strip() or None
         
+        proxy_jump = Prompt.ask("ProxyJump (optional, e.g. bastion or user@jump:22)", default="").strip() or None
+        
         group = Prompt.ask("Group (optional)", default="").strip() or None
         
         favorite = False
@@ -73,6 +75,7 @@ class ConnectionEditor:
             port=port,
             password=password,
             identity_file=identity_file,
+            proxy_jump=proxy_jump,
             group=group,
             favorite=favorite
         )
@@ -126,6 +129,11 @@ class ConnectionEditor:
             default=connection.identity_file or ""
         ).strip() or None
         
+        proxy_jump = Prompt.ask(
+            "ProxyJump",
+            default=connection.proxy_jump or ""
+        ).strip() or None
+        
         group = Prompt.ask("Group", default=connection.group or "").strip() or None
         
         favorite = connection.favorite
@@ -140,10 +148,15 @@ class ConnectionEditor:
             port=port,
             password=password,
             identity_file=identity_file,
+            proxy_jump=proxy_jump,
             group=group,
             favorite=favorite,
             last_used=connection.last_used,
-            created_at=connection.created_at
+            created_at=connection.created_at,
+            crypto_profile=connection.crypto_profile,
+            remote_session=connection.remote_session,
+            auth_method=connection.auth_method,
+            auth_key=connection.auth_key
         )
 
 
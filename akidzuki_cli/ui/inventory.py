@@ -0,0 +1,83 @@
+from bisect import bisect_left, bisect_right
+from typing import Any, Dict, List, Tuple
+
+from ..models.connection import SSHConnection
+from ..services.connection_service import ConnectionService, SORT_KEYS
+
+
+class InventoryView:
+    
+    def __init__(self, connection_service: ConnectionService):
+        self.connection_service = connection_service
+        self.config_manager = connection_service.config_manager
+        self.connections: List[SSHConnection] = []
+        self.reloads = 0
+        self._by_name: Dict[str, SSHConnection] = {}
+        self._views: Dict[str, Tuple[List[Any], List[SSHConnection]]] = {}
+        self._snapshot = self.config_manager.snapshot()
+    
+    def reload(self):
+        self._snapshot = self.config_manager.snapshot()
+        self.connections = self.connection_service.list_connections(sort_by=None)
+        self._by_name = {conn.name: conn for conn in self.connections}
+        self._views.clear()
+        self.reloads += 1
+    
+    def sync(self) -> bool:
+        # the snapshot is taken first: a write racing with this sync is applied again next
+        # time, which is harmless because names are re-read rather than replayed
+        snapshot = self.config_manager.snapshot()
+        names = self.config_manager.changes_since(*self._snapshot)
+        if names is None:
+            self.reload()
+            return True
+        
+        for name in names:
+            old = self._by_name.pop(name, None)
+            if old is not None:
+                self._remove(old)
+            new = self.config_manager.get_connection_by_name(name)
+            if new is not None:
+                self._add(new)
+        
+        self._snapshot = snapshot
+        return bool(names)
+    
+    def view(self, sort_by: str) -> List[SSHConnection]:
+        key = SORT_KEYS.get(sort_by)
+        if key is None:
+            return self.connections
+        
+        if sort_by not in self._views:
+            ordered = sorted(self.connections, key=key)
+            self._views[sort_by] = ([key(conn) for conn in ordered], ordered)
+        return self._views[sort_by][1]
+    
+    def _add(self, conn: SSHConnection):
+        self.connections.append(conn)
+        self._by_name[conn.name] = conn
+        for sort_by, (keys, ordered) in self._views.items():
+            value = SORT_KEYS[sort_by](conn)
+            position = bisect_right(keys, value)
+            keys.insert(position, value)
+            ordered.insert(position, conn)
+    
+    @staticmethod
+    def _position(connections: List[SSHConnection], conn: SSHConnection, start: int = 0, end: int = -1) -> int:
+        end = len(connections) if end == -1 else end
+        for position in range(start, end):
+            if connections[position] is conn:
+                return position
+        return -1
+    
+    def _remove(self, conn: SSHConnection):
+        del self.connections[self._position(self.connections, conn)]
+        for sort_by, (keys, ordered) in self._views.items():
+            value = SORT_KEYS[sort_by](conn)
+            low = bisect_left(keys, value)
+            position = self._position(ordered, conn, low, bisect_right(keys, value, low))
+            if position == -1:
+                # services update connections in place, so the stored key may be stale
+                position = self._position(ordered, conn)
+            del keys[position]
+            del ordered[position]
@@ -1,7 +1,7 @@
-from typing import List, Optional, Callable
+from typing import List, Optional, Callable, Set, Tuple
 import sys
-import time
 from rich.console import Console
+from rich.markup import escape
 from rich.text import Text
 from rich.prompt import Prompt, Confirm
 from rich.table import Table
@@ -9,10 +9,20 @@ from rich.layout import Layout
 from rich.align import Align
 
 from ..ui.connection_view import ConnectionEditor
+from ..ui.inventory import InventoryView
+from ..ui.screen import LineRenderer
 from ..models.connection import SSHConnection
 from ..config.manager import ConfigManager
 from ..services.connection_service import ConnectionService
-from ..utils.keyboard_handler import get_key
+from ..services.probe_service import ProbeService
+from ..utils.keyboard_handler import KeyReader, Paste
+
+ASCII_LOGO = r"""           _    _     _           _    _ 
+     /\   | |  (_)   | |         | |  (_)
+    /  \  | | ___  __| |_____   _| | ___ 
+   / /\ \ | |/ / |/ _` |_  / | | | |/ / |
+  / ____ \|   <| | (_| |/ /| |_| |   <| |
+ /_/    \_\_|\_\_|\__,_/___|\__,_|_|\_\_|"""
 
 
 class MainMenu:
@@ -29,91 +39,155 @@ class MainMenu:
         self.sort_by = "name"
         self.show_favorites_only = False
         self.selected_group: Optional[str] = None
+        self.scroll_offset = 0
+        self.page_rows = 10
+        self.screen = LineRenderer(self.console)
+        self.keys = KeyReader()
+        self.probes = ProbeService(connection_service.settings, on_update=self.keys.wake)
+        self._header: Optional[Tuple[int, List[str]]] = None
+        self._recent_names: Set[str] = set()
+        self.inventory = InventoryView(connection_service)
+        self._load_inventory()
+    
+    def _load_inventory(self):
+        self.inventory.reload()
+        self._inventory_changed()
+    
+    def _sync_inventory(self):
+        # picks up writes made by this process (menu actions, sessions) one connection at a time;
+        # edits from elsewhere make the inventory reload
+        if self.inventory.sync():
+            self._inventory_changed()
+    
+    def _inventory_changed(self):
+        # the recent set only changes with the inventory, not with filters or navigation
+        recent_connections = self.inventory.view("last_used")[:3]
+        self._recent_names = {c.name for c in recent_connections if c.last_used}
+        self.probes.set_inventory(self.inventory.connections)
         self._refresh_connections()
     
     def _refresh_connections(self):
+        selected = self.filtered_connections[self.selected_index].name if self.filtered_connections else None
+        
         self.connections = self.connection_service.list_connections(
             filter_text=self.filter_text if self.filter_text else None,
             group=self.selected_group,
             favorite_only=self.show_favorites_only,
-            sort_by=self.sort_by
+            sort_by=None,
+            source=self.inventory.view(self.sort_by)
         )
         self.filtered_connections = self.connections
+        
+        # keep the cursor on the same connection when the list around it changes
+        if selected is not None:
+            for i, conn in enumerate(self.filtered_connections):
+                if conn.name == selected:
+                    self.selected_index = i
+                    break
         if self.selected_index >= len(self.filtered_connections):
             self.selected_index = max(0, len(self.filtered_connections) - 1)
     
-    def _display_menu(self):
-        self.console.clear()
+    def _leave_screen(self, clear: bool = True):
+        self.screen.release()
+        self.keys.stop()
+        if clear:
+            self.console.clear()
+    
+    def _header_lines(self, width: int) -> List[str]:
+        if self._header is None or self._header[0] != width:
+            logo_lines = ASCII_LOGO.splitlines() + ["", "github: z0nyx", "https://github.com/z0nyx/Akidzuki-CLI"]
+            block_width = max(len(line) for line in logo_lines)
+            padding = " " * max(0, (width - block_width) // 2)
+            lines = [f"{padding}[bold cyan]{escape(line)}[/bold cyan]" for line in logo_lines[:-3]]
+            lines += [""] + [f"{padding}[white]{line}[/white]" for line in logo_lines[-2:]] + [""]
+            self._header = (width, lines)
+        return list(self._header[1])
+    
+    def _status_cell(self, conn: SSHConnection) -> str:
+        if conn.proxy_jump:
+            return "[dim]↪ jump[/dim]  "
+        
+        result = self.probes.result(conn)
+        if result is None:
+            return "[dim]·[/dim]       "
+        if not result.reachable:
+            return "[red]✗ down[/red]  "
+        
+        rtt = f"{result.rtt_ms:.0f}ms" if result.rtt_ms < 1000 else f"{result.rtt_ms / 1000:.1f}s"
+        color = "green" if result.rtt_ms < 150 else "yellow"
+        return f"[{color}]● {rtt:>5}[/{color}] "
+    
+    def _format_row(self, conn: SSHConnection, selected: bool) -> str:
+        if selected:
+            prefix = "▶ "
+            style = "bold green"
+        else:
+            prefix = "  "
+            style = "white"
         
-        ascii_logo = r"""           _    _     _           _    _ 
-     /\   | |  (_)   | |         | |  (_)
-    /  \  | | ___  __| |_____   _| | ___ 
-   / /\ \ | |/ / |/ _` |_  / | | | |/ / |
-  / ____ \|   <| | (_| |/ /| |_| |   <| |
- /_/    \_\_|\_\_|\__,_/___|\__,_|_|\_\_|"""
+        favorite_icon = "⭐ " if conn.favorite else "  "
+        group_text = escape(f" [{conn.group}]") if conn.group else ""
+        recent_icon = "🕐 " if conn.name in self._recent_names else "  "
         
-        logo_text = Text(ascii_logo, style="bold cyan")
-        author = Text("github: z0nyx", style="white")
-        github = Text("https://github.com/z0nyx/Akidzuki-CLI", style="white")
+        info = f"{favorite_icon}{recent_icon}{escape(conn.name)}{group_text} - {escape(f'{conn.user}@{conn.hostname}')}:{conn.port}"
         
-        content = Text()
-        content.append(logo_text)
-        content.append("\n\n")
-        content.append(author)
-        content.append("\n")
-        content.append(github)
+        if conn.identity_file:
+            info += " 🔑"
         
-        centered = Align.center(content)
-        self.console.print(centered)
-        self.console.print()
+        status = self._status_cell(conn) if self.probes.enabled else ""
+        return f"{prefix}{status}[{style}]{info}[/{style}]"
+    
+    def _scroll_to_selection(self, rows: int):
+        if self.selected_index < self.scroll_offset:
+            self.scroll_offset = self.selected_index
+        elif self.selected_index >= self.scroll_offset + rows:
+            self.scroll_offset = self.selected_index - rows + 1
+        self.scroll_offset = max(0, min(self.scroll_offset, len(self.filtered_connections) - rows))
+    
+    def _display_menu(self):
+        width, height = self.console.size
+        # the logo is dropped on short terminals so the list keeps a usable height
+        lines = self._header_lines(width) if height >= 24 else []
         
         if self.filter_mode:
-            self.console.print(f"[yellow]Search: {self.filter_text}_[/yellow]")
-            self.console.print()
+            lines.append(f"[yellow]Search: {escape(self.filter_text)}_[/yellow]")
+            lines.append("")
         
         if self.show_favorites_only:
-            self.console.print("[yellow]⭐ Showing favorites only[/yellow]")
+            lines.append("[yellow]⭐ Showing favorites only[/yellow]")
         
         if self.selected_group:
-            self.console.print(f"[cyan]📁 Group: {self.selected_group}[/cyan]")
+            lines.append(f"[cyan]📁 Group: {escape(self.selected_group)}[/cyan]")
+        
+        status_lines = self._status_bar_lines(width)
         
         if not self.filtered_connections:
             if self.filter_text or self.show_favorites_only or self.selected_group:
-                self.console.print("[yellow]No connections match the current filters.[/yellow]")
+                lines.append("[yellow]No connections match the current filters.[/yellow]")
             else:
-                self.console.print("[yellow]No connections found. Add a new connection to get started.[/yellow]")
-            self.console.print()
+                lines.append("[yellow]No connections found. Add a new connection to get started.[/yellow]")
+            lines.append("")
         else:
-            self.console.print(f"[bold]Connections ({len(self.filtered_connections)}/{len(self.connection_service.list_connections())}):[/bold]")
-            self.console.print()
+            rows = max(3, height - len(lines) - len(status_lines) - 3)
+            self.page_rows = rows
+            self._scroll_to_selection(rows)
+            end = min(len(self.filtered_connections), self.scroll_offset + rows)
             
-            recent_connections = self.connection_service.get_recent_connections(limit=3)
-            recent_names = {c.name for c in recent_connections}
+            title = f"[bold]Connections ({len(self.filtered_connections)}/{len(self.inventory.connections)}):[/bold]"
+            if rows < len(self.filtered_connections):
+                title += f" [dim]{self.scroll_offset + 1}-{end}[/dim]"
+            lines.append(title)
+            lines.append("")
             
-            for i, conn in enumerate(self.filtered_connections):
-                if i == self.selected_index:
-                    prefix = "▶ "
-                    style = "bold green"
-                else:
-                    prefix = "  "
-                    style = "white"
-                
-                favorite_icon = "⭐ " if conn.favorite else "  "
-                group_text = f" [{conn.group}]" if conn.group else ""
-                recent_icon = "🕐 " if conn.name in recent_names else "  "
-                
-                info = f"{favorite_icon}{recent_icon}{conn.name}{group_text} - {conn.user}@{conn.hostname}:{conn.port}"
-                
-                if conn.identity_file:
-                    info += " 🔑"
-                
-                self.console.print(f"{prefix}[{style}]{info}[/{style}]")
+            for i in range(self.scroll_offset, end):
+                lines.append(self._format_row(self.filtered_connections[i], i == self.selected_index))
+            self.probes.set_visible(self.filtered_connections[self.scroll_offset:end])
             
-            self.console.print()
+            lines.append("")
         
-        self._display_status_bar()
+        self.screen.render(lines + status_lines)
     
-    def _display_status_bar(self):
+    def _status_bar_lines(self, width: int) -> List[str]:
         status_parts = []
         
         if self.filter_mode:
@@ -133,21 +207,42 @@ class MainMenu:
             status_parts.append("[dim]?[/dim] Help")
             status_parts.append("[dim]Q[/dim] Quit")
         
-        status_line = " | ".join(status_parts)
-        self.console.print(f"[dim]{'─' * 80}[/dim]")
-        self.console.print(status_line)
+        # every frame line is one screen row, so the bar is wrapped here rather than by the terminal
+        lines = [f"[dim]{'─' * min(80, width)}[/dim]"]
+        current: List[str] = []
+        current_width = 0
+        for part in status_parts:
+            part_width = Text.from_markup(part).cell_len
+            if current and current_width + 3 + part_width > width:
+                lines.append(" | ".join(current))
+                current = []
+                current_width = 0
+            current_width += part_width + (3 if current else 0)
+            current.append(part)
+        if current:
+            lines.append(" | ".join(current))
+        return lines
     
     def _handle_navigation(self, key: str) -> bool:
+        last = len(self.filtered_connections) - 1
         if key == 'up' and self.selected_index > 0:
             self.selected_index -= 1
             return True
-        elif key == 'down' and self.selected_index < len(self.filtered_connections) - 1:
+        elif key == 'down' and self.selected_index < last:
             self.selected_index += 1
             return True
+        elif key in ('pageup', 'home') and self.selected_index > 0:
+            self.selected_index = 0 if key == 'home' else max(0, self.selected_index - self.page_rows)
+            return True
+        elif key in ('pagedown', 'end') and self.selected_index < last:
+            self.selected_index = last if key == 'end' else min(last, self.selected_index + self.page_rows)
+            return True
         return False
     
     def _handle_filter_input(self, char: str):
-        if char == 'backspace':
+        if isinstance(char, Paste):
+            self.filter_text += ''.join(ch for ch in char if ch.isprintable())
+        elif char == 'backspace':
             self.filter_text = self.filter_text[:-1]
         elif char == 'escape':
             self.filter_mode = False
@@ -159,7 +254,7 @@ class MainMenu:
         self._refresh_connections()
     
     def _add_connection(self):
-        self.console.clear()
+        self._leave_screen()
         self.console.print("[bold cyan]Add New SSH Connection[/bold cyan]")
         self.console.print()
         
@@ -170,7 +265,7 @@ class MainMenu:
             success = self.connection_service.add_connection(connection)
             if success:
                 self.console.print("\n[green]✓ Connection added successfully![/green]")
-                self._refresh_connections()
+                self._sync_inventory()
             else:
                 self.console.print("\n[red]✗ Connection with this name already exists![/red]")
         else:
@@ -185,7 +280,7 @@ class MainMenu:
         
         conn = self.filtered_connections[self.selected_index]
         
-        self.console.clear()
+        self._leave_screen()
         self.console.print(f"[bold cyan]Edit Connection: {conn.name}[/bold cyan]")
         self.console.print()
         
@@ -196,7 +291,7 @@ class MainMenu:
             success = self.connection_service.update_connection(conn.name, updated)
             if success:
                 self.console.print("\n[green]✓ Connection updated successfully![/green]")
-                self._refresh_connections()
+                self._sync_inventory()
             else:
                 self.console.print("\n[red]✗ Failed to update connection![/red]")
         else:
@@ -211,11 +306,12 @@ class MainMenu:
         
         conn = self.filtered_connections[self.selected_index]
         
+        self._leave_screen(clear=False)
         if Confirm.ask(f"\n[red]Delete connection '{conn.name}'?[/red]"):
             success = self.connection_service.delete_connection(conn.name)
             if success:
                 self.console.print("[green]✓ Connection deleted![/green]")
-                self._refresh_connections()
+                self._sync_inventory()
             else:
                 self.console.print("[red]✗ Failed to delete connection![/red]")
             self.console.print("\nPress Enter to continue...")
@@ -227,7 +323,7 @@ class MainMenu:
         
         conn = self.filtered_connections[self.selected_index]
         
-        self.console.clear()
+        self._leave_screen()
         self.console.print(f"[cyan]Testing connection: {conn.name}[/cyan]")
         self.console.print(f"Host: {conn.hostname}:{conn.port}")
         self.console.print()
@@ -249,7 +345,7 @@ class MainMenu:
         
         conn = self.filtered_connections[self.selected_index]
         
-        self.console.clear()
+        self._leave_screen()
         self.console.print(f"[bold cyan]Connection Info: {conn.name}[/bold cyan]")
         self.console.print()
         
@@ -264,6 +360,9 @@ class MainMenu:
         table.add_row("Group:", conn.group or "None")
         table.add_row("Favorite:", "⭐ Yes" if conn.favorite else "No")
         table.add_row("Identity File:", conn.identity_file or "None")
+        table.add_row("Proxy Jump:", conn.proxy_jump or "None")
+        table.add_row("Crypto Profile:", conn.crypto_profile or "Default")
+        table.add_row("Remote Session:", conn.remote_session or "None")
         table.add_row("Last Used:", conn.last_used.strftime("%Y-%m-%d %H:%M:%S") if conn.last_used else "Never")
         table.add_row("Created:", conn.created_at.strftime("%Y-%m-%d %H:%M:%S") if conn.created_at else "Unknown")
         
@@ -278,7 +377,7 @@ class MainMenu:
         
         conn = self.filtered_connections[self.selected_index]
         self.connection_service.toggle_favorite(conn)
-        self._refresh_connections()
+        self._sync_inventory()
     
     def _change_sort(self):
         sort_options = ["name", "host", "last_used", "group"]
@@ -288,14 +387,15 @@ class MainMenu:
         self._refresh_connections()
     
     def _change_group_filter(self):
-        groups = self.connection_service.get_groups()
+        groups = self.connection_service.get_groups(source=self.inventory.connections)
         if not groups:
+            self._leave_screen(clear=False)
             self.console.print("[yellow]No groups available.[/yellow]")
             self.console.print("Press Enter to continue...")
             input()
             return
         
-        self.console.clear()
+        self._leave_screen()
         self.console.print("[bold cyan]Select Group:[/bold cyan]")
         self.console.print()
         self.console.print("[dim]0[/dim] - All groups")
@@ -322,7 +422,7 @@ class MainMenu:
         self._refresh_connections()
     
     def _show_help(self):
-        self.console.clear()
+        self._leave_screen()
         self.console.print("[bold cyan]Keyboard Shortcuts[/bold cyan]")
         self.console.print()
         
@@ -331,6 +431,8 @@ class MainMenu:
         help_table.add_column("Action")
         
         help_table.add_row("↑ / ↓", "Navigate connections")
+        help_table.add_row("PgUp / PgDn", "Move one page")
+        help_table.add_row("Home / End", "First / last connection")
         help_table.add_row("Enter", "Connect to selected connection")
         help_table.add_row("A", "Add new connection")
         help_table.add_row("E", "Edit selected connection")
@@ -363,28 +465,43 @@ class MainMenu:
         return conn
     
     def run(self) -> Optional[SSHConnection]:
+        self.running = True
+        self._sync_inventory()
+        self.probes.start()
+        try:
+            return self._run()
+        finally:
+            self.probes.pause()
+            self.screen.release()
+            self.keys.stop()
+    
+    def close(self):
+        self.probes.stop()
+    
+    def _run(self) -> Optional[SSHConnection]:
         while self.running:
-            self._display_menu()
+            # keys that arrived together (held arrows, key repeat) produce a single frame
+            if not self.keys.pending:
+                self._display_menu()
             
             try:
-                key = None
-                while key is None and self.running:
-                    key = get_key()
-                    if key is None:
-                        time.sleep(0.05)
-                
+                key = self.keys.read_key()
                 if key is None:
+                    # woken by the probe worker: redraw with the new status
                     continue
                 
                 if self.filter_mode:
                     self._handle_filter_input(key)
                     continue
                 
-                if key == 'up':
-                    if self._handle_navigation('up'):
-                        continue
-                elif key == 'down':
-                    if self._handle_navigation('down'):
+                # pasted text is only meaningful in the search field, never as a burst of commands
+                if isinstance(key, Paste):
+                    continue
+                if len(key) == 1:
+                    key = key.lower()
+                
+                if key in ('up', 'down', 'pageup', 'pagedown', 'home', 'end'):
+                    if self._handle_navigation(key):
                         continue
                 elif key == 'enter':
                     if self.filtered_connections:
@@ -425,7 +542,7 @@ class MainMenu:
                         if conn:
                             return conn
                 elif key == 'r':
-                    self._refresh_connections()
+                    self._load_inventory()
                 elif key == 'q' or key == '\x03':
                     self.running = False
                     return None
@@ -442,6 +559,7 @@ class MainMenu:
                 self.running = False
                 return None
             except Exception as e:
+                self._leave_screen(clear=False)
                 try:
                     choice = input("\nEnter command: ").lower().strip()
                     if choice == 'a':
@@ -455,7 +573,7 @@ class MainMenu:
                     elif choice == 'c' and self.filtered_connections:
                         return self._connect_to_selected()
                     elif choice == 'r':
-                        self._refresh_connections()
+                        self._load_inventory()
                     elif choice == 'q':
                         self.running = False
                         return None
@@ -0,0 +1,85 @@
+from typing import Dict, List, Optional, Tuple
+
+from rich.console import Console
+
+CLEAR_SCREEN = "\x1b[H\x1b[2J"
+HIDE_CURSOR = "\x1b[?25l"
+SHOW_CURSOR = "\x1b[?25h"
+
+
+class LineRenderer:
+    
+    def __init__(self, console: Console, cache_size: int = 512):
+        self.console = console
+        self.cache_size = cache_size
+        self._frame: List[str] = []
+        self._size: Optional[Tuple[int, int]] = None
+        self._rendered: Dict[str, str] = {}
+        self._cursor_hidden = False
+        self.full_redraws = 0
+        self.lines_written = 0
+    
+    @property
+    def supports_diff(self) -> bool:
+        return self.console.is_terminal and not self.console.legacy_windows
+    
+    def invalidate(self):
+        # something else wrote to the screen; the next frame is drawn from scratch
+        self._frame = []
+        self._size = None
+    
+    def _render_line(self, markup: str, width: int) -> str:
+        rendered = self._rendered.get(markup)
+        if rendered is None:
+            with self.console.capture() as capture:
+                self.console.print(markup, end="", no_wrap=True, overflow="ellipsis", crop=True, width=width,
+                                   highlight=False)
+            rendered = capture.get()
+            if len(self._rendered) >= self.cache_size:
+                self._rendered.clear()
+            self._rendered[markup] = rendered
+        return rendered
+    
+    def render(self, lines: List[str]):
+        if not self.supports_diff:
+            self.console.clear()
+            for line in lines:
+                self.console.print(line, no_wrap=True, overflow="ellipsis", crop=True, highlight=False)
+            return
+        
+        size = tuple(self.console.size)
+        width, height = size
+        lines = lines[:height]
+        output = []
+        
+        if size != self._size:
+            self._rendered.clear()
+            self._frame = []
+            self._size = size
+            output.append(CLEAR_SCREEN)
+            self.full_redraws += 1
+        if not self._cursor_hidden:
+            output.append(HIDE_CURSOR)
+            self._cursor_hidden = True
+        
+        previous = self._frame
+        for row, line in enumerate(lines):
+            if row < len(previous) and previous[row] == line:
+                continue
+            output.append(f"\x1b[{row + 1};1H{self._render_line(line, width)}\x1b[K")
+            self.lines_written += 1
+        for row in range(len(lines), len(previous)):
+            output.append(f"\x1b[{row + 1};1H\x1b[K")
+        
+        self._frame = list(lines)
+        if output:
+            self.console.file.write("".join(output))
+            self.console.file.flush()
+    
+    def release(self):
+        # leave the cursor below the last drawn line so following output starts cleanly
+        if self._cursor_hidden:
+            self.console.file.write(f"\x1b[{len(self._frame) + 1};1H{SHOW_CURSOR}")
+            self.console.file.flush()
+            self._cursor_hidden = False
+        self.invalidate()
@@ -1,9 +1,3 @@
 from .validators import validate_host, validate_port, validate_user
 
 __all__ = ['validate_host', 'validate_port', 'validate_user']
-
-try:
-    from .keyboard_handler import get_key
-    __all__.append('get_key')
-except ImportError:
-    pass
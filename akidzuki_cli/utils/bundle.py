@@ -0,0 +1,296 @@
+import json
+import logging
+import os
+import struct
+import sys
+import zlib
+from pathlib import Path
+from typing import BinaryIO, Iterator, List, Optional, Tuple, Union
+
+from ..models.connection import SSHConnection
+from ..config.manager import ConfigManager
+from .export_import import (
+    MAX_RECORD_SIZE, ImportReport, ProgressCallback, RecordError, _counted, connection_from_dict, connection_to_dict,
+    merge_connections, validate_connection,
+)
+
+
+logger = logging.getLogger(__name__)
+
+# Layout: header (magic, scrypt parameters, salt, nonce prefix), then frames of
+# [final flag: 1 byte][length: 4 bytes][AES-256-GCM ciphertext]. The plaintext is a
+# zlib-compressed NDJSON stream split into CHUNK_SIZE pieces. Every frame is encrypted
+# with nonce = prefix + frame counter and authenticates the header and its own frame
+# header, so reordered, dropped or truncated frames fail to decrypt.
+BUNDLE_MAGIC = b'AKZB\x01'
+BUNDLE_SUFFIX = '.akzb'
+CHUNK_SIZE = 64 * 1024
+SCRYPT_LOG_N = 15
+SCRYPT_R = 8
+SCRYPT_P = 1
+SALT_SIZE = 16
+NONCE_PREFIX_SIZE = 8
+
+_HEADER = struct.Struct('>BBB')
+_FRAME = struct.Struct('>BI')
+_HEADER_SIZE = len(BUNDLE_MAGIC) + _HEADER.size + SALT_SIZE + NONCE_PREFIX_SIZE
+
+KEYRING_SERVICE = "ssh-cli"
+
+
+def is_bundle(path: Union[str, Path]) -> bool:
+    if str(path) == '-':
+        return False
+    try:
+        with open(path, 'rb') as f:
+            return f.read(len(BUNDLE_MAGIC)) == BUNDLE_MAGIC
+    except OSError:
+        return False
+
+
+def _derive_key(passphrase: str, salt: bytes, log_n: int, r: int, p: int) -> bytes:
+    from cryptography.hazmat.primitives.kdf.scrypt import Scrypt
+    return Scrypt(salt=salt, length=32, n=1 << log_n, r=r, p=p).derive(passphrase.encode('utf-8'))
+
+
+def _nonce(prefix: bytes, counter: int) -> bytes:
+    return prefix + struct.pack('>I', counter)
+
+
+class BundleWriter:
+    
+    def __init__(self, stream: BinaryIO, passphrase: str):
+        from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+        
+        salt = os.urandom(SALT_SIZE)
+        self._prefix = os.urandom(NONCE_PREFIX_SIZE)
+        self._header = BUNDLE_MAGIC + _HEADER.pack(SCRYPT_LOG_N, SCRYPT_R, SCRYPT_P) + salt + self._prefix
+        self._aead = AESGCM(_derive_key(passphrase, salt, SCRYPT_LOG_N, SCRYPT_R, SCRYPT_P))
+        self._compressor = zlib.compressobj(6)
+        self._buffer = bytearray()
+        self._counter = 0
+        self.stream = stream
+        self.stream.write(self._header)
+    
+    def _frame(self, data: bytes, final: bool):
+        frame_header = _FRAME.pack(final, len(data) + 16)
+        ciphertext = self._aead.encrypt(_nonce(self._prefix, self._counter), data, self._header + frame_header)
+        self.stream.write(frame_header + ciphertext)
+        self._counter += 1
+    
+    def write_record(self, record: dict):
+        self._buffer += self._compressor.compress(json.dumps(record, ensure_ascii=False).encode('utf-8') + b'\n')
+        while len(self._buffer) >= CHUNK_SIZE:
+            self._frame(bytes(self._buffer[:CHUNK_SIZE]), False)
+            del self._buffer[:CHUNK_SIZE]
+    
+    def close(self):
+        self._buffer += self._compressor.flush()
+        while len(self._buffer) > CHUNK_SIZE:
+            self._frame(bytes(self._buffer[:CHUNK_SIZE]), False)
+            del self._buffer[:CHUNK_SIZE]
+        self._frame(bytes(self._buffer), True)
+        self._buffer.clear()
+        self.stream.flush()
+
+
+def _read_exact(stream: BinaryIO, size: int) -> bytes:
+    data = stream.read(size)
+    while len(data) < size:
+        more = stream.read(size - len(data))
+        if not more:
+            break
+        data += more
+    return data
+
+
+def iter_bundle_chunks(stream: BinaryIO, passphrase: str) -> Iterator[bytes]:
+    from cryptography.exceptions import InvalidTag
+    from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+    
+    header = _read_exact(stream, _HEADER_SIZE)
+    if len(header) < _HEADER_SIZE or not header.startswith(BUNDLE_MAGIC):
+        raise ValueError("not an Akidzuki bundle")
+    offset = len(BUNDLE_MAGIC)
+    log_n, r, p = _HEADER.unpack_from(header, offset)
+    offset += _HEADER.size
+    salt = header[offset:offset + SALT_SIZE]
+    prefix = header[offset + SALT_SIZE:]
+    if not (10 <= log_n <= 22 and 1 <= r <= 32 and 1 <= p <= 16):
+        raise ValueError("unsupported bundle key derivation parameters")
+    aead = AESGCM(_derive_key(passphrase, salt, log_n, r, p))
+    
+    counter = 0
+    while True:
+        frame_header = _read_exact(stream, _FRAME.size)
+        if len(frame_header) < _FRAME.size:
+            raise ValueError("bundle is truncated")
+        final, length = _FRAME.unpack(frame_header)
+        if length > CHUNK_SIZE + 16:
+            raise ValueError("corrupted bundle frame")
+        ciphertext = _read_exact(stream, length)
+        if len(ciphertext) < length:
+            raise ValueError("bundle is truncated")
+        try:
+            yield aead.decrypt(_nonce(prefix, counter), ciphertext, header + frame_header)
+        except InvalidTag:
+            raise ValueError("wrong passphrase or corrupted bundle") from None
+        counter += 1
+        if final:
+            if stream.read(1):
+                raise ValueError("unexpected data after the end of the bundle")
+            return
+
+
+def verify_bundle(stream: BinaryIO, passphrase: str) -> int:
+    # authenticates every frame without keeping anything, so a truncated or tampered
+    # file is rejected before the config is touched
+    return sum(len(chunk) for chunk in iter_bundle_chunks(stream, passphrase))
+
+
+def iter_bundle_records(stream: BinaryIO, passphrase: str) -> Iterator[Tuple[int, bytes]]:
+    # yields (record number, raw NDJSON line); decompression is bounded per call so a
+    # hostile bundle cannot expand into memory all at once
+    decompressor = zlib.decompressobj()
+    pending = b''
+    number = 0
+    
+    def lines(data: bytes) -> Iterator[Tuple[int, bytes]]:
+        nonlocal pending, number
+        pending += data
+        start = 0
+        while True:
+            end = pending.find(b'\n', start)
+            if end == -1:
+                break
+            number += 1
+            yield number, pending[start:end]
+            start = end + 1
+        pending = pending[start:]
+        if len(pending) > MAX_RECORD_SIZE:
+            raise ValueError(f"record {number + 1} is larger than {MAX_RECORD_SIZE} bytes")
+    
+    for chunk in iter_bundle_chunks(stream, passphrase):
+        data = decompressor.decompress(chunk, CHUNK_SIZE)
+        while True:
+            yield from lines(data)
+            if not decompressor.unconsumed_tail:
+                break
+            data = decompressor.decompress(decompressor.unconsumed_tail, CHUNK_SIZE)
+    
+    yield from lines(decompressor.flush())
+    if not decompressor.eof:
+        raise ValueError("bundle is truncated")
+    if pending.strip():
+        number += 1
+        yield number, pending
+
+
+def export_bundle(config_manager: ConfigManager, output_file: Union[str, Path], passphrase: str,
+                  secrets: bool = True, progress: Optional[ProgressCallback] = None) -> Tuple[int, int]:
+    backend = None
+    if secrets:
+        import keyring
+        backend = keyring.get_keyring()
+    
+    def write(stream: BinaryIO) -> Tuple[int, int]:
+        writer = BundleWriter(stream, passphrase)
+        count = 0
+        secret_count = 0
+        for conn in _counted(config_manager.iter_connections(), progress):
+            record = connection_to_dict(conn)
+            for field in ('auth_method', 'auth_key'):
+                record[field] = getattr(conn, field)
+            if backend is not None:
+                try:
+                    password = backend.get_password(KEYRING_SERVICE, f"{conn.name}@{conn.host}")
+                except Exception as e:
+                    logger.warning(f"Could not read the password of {conn.name} from keyring: {e}")
+                    password = None
+                if password:
+                    record["password"] = password
+                    secret_count += 1
+            writer.write_record(record)
+            count += 1
+        writer.close()
+        return count, secret_count
+    
+    if str(output_file) == '-':
+        return write(sys.stdout.buffer)
+    
+    # written under a temporary name so a failed export never leaves a half bundle behind
+    output_path = Path(output_file)
+    tmp_path = output_path.with_name(f".{output_path.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp_path, 'wb') as f:
+            os.chmod(tmp_path, 0o600)
+            result = write(f)
+        os.replace(tmp_path, output_path)
+    except BaseException:
+        try:
+            tmp_path.unlink()
+        except OSError:
+            pass
+        raise
+    return result
+
+
+def _read_bundle(stream: BinaryIO, passphrase: str, report: ImportReport,
+                 progress: Optional[ProgressCallback]) -> Iterator[Tuple[int, SSHConnection]]:
+    for number, line in _counted(iter_bundle_records(stream, passphrase), progress):
+        try:
+            item = json.loads(line)
+            conn = connection_from_dict(item)
+            conn.password = item.get("password") or None
+            conn.auth_method = item.get("auth_method") or None
+            conn.auth_key = item.get("auth_key") or None
+            validate_connection(conn)
+        except (KeyError, TypeError, ValueError) as e:
+            report.errors.append(RecordError(number, None, str(e)))
+            continue
+        yield number, conn
+
+
+def store_secrets(secrets: List[Tuple[str, str]], report: ImportReport):
+    # keyring has no bulk API, so each password is one backend call; the backend is
+    # resolved once instead of per call
+    import keyring
+    backend = keyring.get_keyring()
+    for username, password in secrets:
+        try:
+            backend.set_password(KEYRING_SERVICE, username, password)
+            report.secrets += 1
+        except Exception as e:
+            report.errors.append(RecordError(0, username, f"keyring: {e}"))
+    logger.debug(f"Stored {report.secrets} of {len(secrets)} passwords in keyring")
+
+
+def import_bundle(config_manager: ConfigManager, input_file: Union[str, Path], passphrase: str,
+                  policy: str = 'skip', progress: Optional[ProgressCallback] = None) -> ImportReport:
+    # the config file is committed first and passwords are written afterwards,
+    # only for connections the merge actually added or replaced; a file is verified
+    # completely before anything is imported
+    report = ImportReport()
+    secrets: List[Tuple[str, str]] = []
+    
+    def accept(conn: SSHConnection):
+        if conn.password:
+            secrets.append((f"{conn.name}@{conn.host}", conn.password))
+            conn.password = None
+    
+    def merge(stream: BinaryIO):
+        records = _read_bundle(stream, passphrase, report, progress)
+        merge_connections(config_manager, records, report, policy, on_accept=accept)
+    
+    if str(input_file) == '-':
+        # a pipe cannot be read twice; frames are still authenticated as they arrive
+        merge(sys.stdin.buffer)
+    else:
+        with open(input_file, 'rb') as f:
+            verify_bundle(f, passphrase)
+            f.seek(0)
+            merge(f)
+    
+    if secrets:
+        store_secrets(secrets, report)
+    return report
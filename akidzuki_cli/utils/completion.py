@@ -0,0 +1,166 @@
+import shlex
+from pathlib import Path
+
+COMMANDS = "list test connect replay bench export import sync stats monitor completion"
+FORMATS = "table json ndjson tsv"
+SORT_ORDERS = "name host last_used group none"
+MERGE_POLICIES = "skip overwrite rename update-metadata"
+BENCH_SUITES = "crypto startup client scaling inventory"
+SHELLS = "bash zsh fish index"
+MONITOR_CHECKS = "tcp ssh"
+
+# Index columns: name, hostname, user, port, group (see ConfigManager.write_index).
+# The scripts only start Python when the config file is newer than the index.
+
+_BASH = r'''# akidzuki bash completion
+_akidzuki_index() {
+    local default_index=%(index)s
+    local index="${AKIDZUKI_INDEX:-$default_index}"
+    if [[ ! -f "$index" || %(config)s -nt "$index" ]]; then
+        akidzuki completion index --config %(config)s >/dev/null 2>&1
+    fi
+    printf '%%s' "$index"
+}
+
+_akidzuki() {
+    local cur="${COMP_WORDS[COMP_CWORD]}"
+    local prev="${COMP_WORDS[COMP_CWORD-1]}"
+    local index
+
+    if (( COMP_CWORD == 1 )); then
+        COMPREPLY=($(compgen -W "%(commands)s" -- "$cur"))
+        return
+    fi
+
+    case "$prev" in
+        --group)
+            index="$(_akidzuki_index)"
+            COMPREPLY=($(awk -F'\t' -v p="$cur" '$5 != "" && index($5, p) == 1 && !seen[$5]++ { print $5 }' "$index"))
+            return ;;
+        --format) COMPREPLY=($(compgen -W "%(formats)s" -- "$cur")); return ;;
+        --sort) COMPREPLY=($(compgen -W "%(sort_orders)s" -- "$cur")); return ;;
+        --merge) COMPREPLY=($(compgen -W "%(merge_policies)s" -- "$cur")); return ;;
+        --check) COMPREPLY=($(compgen -W "%(monitor_checks)s" -- "$cur")); return ;;
+        --metrics-file|--textfile) COMPREPLY=($(compgen -f -- "$cur")); return ;;
+    esac
+
+    case "${COMP_WORDS[1]}" in
+        connect|test)
+            if [[ "$cur" == -* ]]; then
+                COMPREPLY=($(compgen -W "--first --group --all --jobs --format --fields --no-header --metrics-file --record --record-input" -- "$cur"))
+            else
+                index="$(_akidzuki_index)"
+                COMPREPLY=($(awk -F'\t' -v p="$cur" 'index($1, p) == 1 { print $1 }' "$index"))
+            fi ;;
+        list) COMPREPLY=($(compgen -W "--sort --group --format --fields --no-header" -- "$cur")) ;;
+        stats)
+            index="$(_akidzuki_index)"
+            COMPREPLY=($(awk -F'\t' -v p="$cur" 'index($1, p) == 1 { print $1 }' "$index")) ;;
+        monitor) COMPREPLY=($(compgen -W "--group --check --interval --jobs --listen --textfile --once" -- "$cur")) ;;
+        replay|export|import|sync) COMPREPLY=($(compgen -f -- "$cur")) ;;
+        bench) COMPREPLY=($(compgen -W "%(bench_suites)s" -- "$cur")) ;;
+        completion) COMPREPLY=($(compgen -W "%(shells)s" -- "$cur")) ;;
+    esac
+}
+
+complete -o default -F _akidzuki akidzuki
+'''
+
+_ZSH = r'''#compdef akidzuki
+# akidzuki zsh completion
+_akidzuki_index() {
+    local default_index=%(index)s
+    local index="${AKIDZUKI_INDEX:-$default_index}"
+    if [[ ! -f "$index" || %(config)s -nt "$index" ]]; then
+        akidzuki completion index --config %(config)s >/dev/null 2>&1
+    fi
+    REPLY="$index"
+}
+
+_akidzuki() {
+    local REPLY
+
+    if (( CURRENT == 2 )); then
+        compadd -- %(commands)s
+        return
+    fi
+
+    case "$words[CURRENT-1]" in
+        --group)
+            _akidzuki_index
+            compadd -- ${(f)"$(awk -F'\t' '$5 != "" && !seen[$5]++ { print $5 }' "$REPLY")"}
+            return ;;
+        --format) compadd -- %(formats)s; return ;;
+        --sort) compadd -- %(sort_orders)s; return ;;
+        --merge) compadd -- %(merge_policies)s; return ;;
+        --check) compadd -- %(monitor_checks)s; return ;;
+        --metrics-file|--textfile) _files; return ;;
+    esac
+
+    case "$words[2]" in
+        connect|test|stats)
+            _akidzuki_index
+            compadd -- ${(f)"$(awk -F'\t' -v p="$PREFIX" 'index($1, p) == 1 { print $1 }' "$REPLY")"} ;;
+        monitor) compadd -- --group --check --interval --jobs --listen --textfile --once ;;
+        replay|export|import|sync) _files ;;
+        bench) compadd -- %(bench_suites)s ;;
+        completion) compadd -- %(shells)s ;;
+    esac
+}
+
+compdef _akidzuki akidzuki
+'''
+
+_FISH = r'''# akidzuki fish completion
+function __akidzuki_index
+    set -l index %(index)s
+    set -q AKIDZUKI_INDEX; and set index $AKIDZUKI_INDEX
+    if not command test -f $index; or command test %(config)s -nt $index
+        akidzuki completion index --config %(config)s >/dev/null 2>&1
+    end
+    echo $index
+end
+
+function __akidzuki_names
+    awk -F'\t' '{ d = $5 != "" ? $5 : $3 "@" $2; print $1 "\t" d }' (__akidzuki_index)
+end
+
+function __akidzuki_groups
+    awk -F'\t' '$5 != "" && !seen[$5]++ { print $5 }' (__akidzuki_index)
+end
+
+complete -c akidzuki -f
+complete -c akidzuki -n __fish_use_subcommand -a '%(commands)s'
+complete -c akidzuki -n '__fish_seen_subcommand_from connect test stats' -a '(__akidzuki_names)'
+complete -c akidzuki -n '__fish_seen_subcommand_from list test monitor' -l group -x -a '(__akidzuki_groups)'
+complete -c akidzuki -n '__fish_seen_subcommand_from list test' -l format -x -a '%(formats)s'
+complete -c akidzuki -n '__fish_seen_subcommand_from list' -l sort -x -a '%(sort_orders)s'
+complete -c akidzuki -n '__fish_seen_subcommand_from replay export import sync' -F
+complete -c akidzuki -n '__fish_seen_subcommand_from import' -l merge -x -a '%(merge_policies)s'
+complete -c akidzuki -n '__fish_seen_subcommand_from test' -l metrics-file -r -F
+complete -c akidzuki -n '__fish_seen_subcommand_from monitor' -l check -x -a '%(monitor_checks)s'
+complete -c akidzuki -n '__fish_seen_subcommand_from monitor' -l textfile -r -F
+complete -c akidzuki -n '__fish_seen_subcommand_from monitor' -l listen -l interval -l jobs -x
+complete -c akidzuki -n '__fish_seen_subcommand_from monitor' -l once
+complete -c akidzuki -n '__fish_seen_subcommand_from bench' -a '%(bench_suites)s'
+complete -c akidzuki -n '__fish_seen_subcommand_from completion' -a '%(shells)s'
+'''
+
+_SCRIPTS = {"bash": _BASH, "zsh": _ZSH, "fish": _FISH}
+
+
+def completion_script(shell: str, config_path: Path, index_path: Path) -> str:
+    if shell not in _SCRIPTS:
+        raise ValueError(f"Unsupported shell: {shell}")
+    
+    return _SCRIPTS[shell] % {
+        "index": shlex.quote(str(index_path.resolve())),
+        "config": shlex.quote(str(config_path.resolve())),
+        "commands": COMMANDS,
+        "formats": FORMATS,
+        "sort_orders": SORT_ORDERS,
+        "merge_policies": MERGE_POLICIES,
+        "bench_suites": BENCH_SUITES,
+        "shells": SHELLS,
+        "monitor_checks": MONITOR_CHECKS,
+    }
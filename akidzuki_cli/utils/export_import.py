@@ -1,76 +1,554 @@
+import csv
 import json
+import logging
+import re
+import sys
+from dataclasses import fields, replace
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import IO, Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
 from datetime import datetime
 
 from ..models.connection import SSHConnection
-from ..config.manager import ConfigManager
+from ..config.manager import ConfigManager, IndexEntry, iter_blocks
+from .output import write_records
+
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = ['json', 'ndjson']
+IMPORT_FORMATS = ['json', 'ndjson', 'csv', 'ssh_config']
+MERGE_POLICIES = ['skip', 'overwrite', 'rename', 'update-metadata']
+EXPORT_FIELDS = [
+    'name', 'host', 'hostname', 'port', 'user', 'identity_file', 'proxy_jump', 'crypto_profile',
+    'remote_session', 'group', 'favorite', 'last_used', 'created_at',
+]
+
+# column names seen in CMDB dumps, mapped to connection fields when the field itself is absent
+FIELD_ALIASES = {
+    'hostname': ('fqdn', 'ip', 'ip_address', 'address'),
+    'user': ('username', 'ssh_user', 'login'),
+    'port': ('ssh_port',),
+    'group': ('environment', 'env'),
+}
+# written as OpenSSH directives, where whitespace would let a value smuggle in more options
+DIRECTIVE_FIELDS = ('name', 'host', 'hostname', 'user', 'identity_file', 'proxy_jump')
+# written as '# Key: value' comments: spaces are fine, line breaks are not
+COMMENT_FIELDS = ('group', 'crypto_profile', 'remote_session', 'auth_method', 'auth_key')
+# fields update-metadata may change; connection parameters and LOCAL_FIELDS are left alone
+METADATA_FIELDS = ('group', 'crypto_profile', 'remote_session')
+# state of this machine that an overwrite or a sync never replaces
+LOCAL_FIELDS = ('favorite', 'last_used', 'created_at', 'auth_method', 'auth_key')
+
+PROGRESS_EVERY = 1000
+READ_CHUNK = 64 * 1024
+MAX_RECORD_SIZE = 1024 * 1024
+
+ProgressCallback = Callable[[int], None]
+Identity = Tuple[str, str, int]
+
+_OPTION = re.compile(r'(\S+?)\s*(?:=\s*|\s+)(.*)')
+
+
+class RecordError(NamedTuple):
+    line: int
+    name: Optional[str]
+    message: str
+
+
+class ImportReport:
+    
+    def __init__(self):
+        self.imported = 0
+        self.updated = 0
+        self.renamed = 0
+        self.skipped = 0
+        # name clashes with a different host; counted in addition to how they were resolved
+        self.conflicts = 0
+        # keyring passwords restored from a bundle
+        self.secrets = 0
+        self.errors: List[RecordError] = []
+    
+    @property
+    def processed(self) -> int:
+        return self.imported + self.updated + self.skipped + len(self.errors)
+
+
+def connection_identity(user: Optional[str], hostname: str, port: Union[int, str, None]) -> Identity:
+    return (user or "root", hostname.strip().rstrip('.').lower(), int(port or 22))
+
+
+class InventoryIndex:
+    # existing connections by name and by (user, hostname, port), built from the completion index
+    
+    def __init__(self, entries: Iterable[IndexEntry] = ()):
+        self.by_name: Dict[str, Identity] = {}
+        self.by_identity: Dict[Identity, str] = {}
+        for entry in entries:
+            self.add(entry.name, connection_identity(entry.user, entry.hostname, entry.port))
+    
+    def add(self, name: str, identity: Identity):
+        self.by_name[name] = identity
+        self.by_identity.setdefault(identity, name)
+    
+    def remove(self, name: str):
+        identity = self.by_name.pop(name, None)
+        if identity is not None and self.by_identity.get(identity) == name:
+            del self.by_identity[identity]
+    
+    def unique_name(self, name: str) -> str:
+        suffix = 2
+        while f"{name}-{suffix}" in self.by_name:
+            suffix += 1
+        return f"{name}-{suffix}"
+
+
+def detect_format(path: Union[str, Path, None], default: str = 'json') -> str:
+    if path is None or str(path) == '-':
+        return default
+    return 'ndjson' if Path(path).suffix.lower() in ('.ndjson', '.jsonl') else 'json'
+
+
+def connection_to_dict(conn: SSHConnection) -> Dict[str, Any]:
+    return {
+        "name": conn.name,
+        "host": conn.host,
+        "hostname": conn.hostname,
+        "port": conn.port,
+        "user": conn.user,
+        "identity_file": conn.identity_file,
+        "proxy_jump": conn.proxy_jump,
+        "crypto_profile": conn.crypto_profile,
+        "remote_session": conn.remote_session,
+        "group": conn.group,
+        "favorite": conn.favorite,
+        "last_used": conn.last_used.isoformat() if conn.last_used else None,
+        "created_at": conn.created_at.isoformat() if conn.created_at else None
+    }
+
+
+def _flag(value: Any) -> bool:
+    if isinstance(value, str):
+        return value.strip().lower() in ('1', 'true', 'yes', 'y')
+    return bool(value)
+
+
+def validate_connection(conn: SSHConnection) -> SSHConnection:
+    # every import path ends up in the config file, so values from files, shared
+    # inventories and bundles are checked before they can reach it
+    for field in DIRECTIVE_FIELDS + COMMENT_FIELDS:
+        value = getattr(conn, field)
+        if value is None:
+            continue
+        if not isinstance(value, str):
+            raise ValueError(f"{field} must be a string, got {type(value).__name__}")
+        if not value.isprintable() or (field in DIRECTIVE_FIELDS and any(ch.isspace() for ch in value)):
+            raise ValueError(f"invalid {field} {value!r}")
+    return conn
+
+
+def connection_from_dict(item: Any) -> SSHConnection:
+    if not isinstance(item, dict):
+        raise ValueError(f"expected an object, got {type(item).__name__}")
+    
+    # CSV cells are always strings, so empty ones count as missing
+    item = {key: value for key, value in item.items() if value != ""}
+    for field, aliases in FIELD_ALIASES.items():
+        if field not in item:
+            for alias in aliases:
+                if alias in item:
+                    item[field] = item[alias]
+                    break
+    
+    name = item.get("name")
+    if not isinstance(name, str) or not name or any(ch.isspace() for ch in name):
+        raise ValueError(f"invalid name {name!r}")
+    host = item.get("host") or item.get("hostname")
+    if not isinstance(host, str) or not host:
+        raise ValueError("missing host")
+    
+    port = item.get("port", 22)
+    if isinstance(port, bool) or not isinstance(port, (int, str)) or not 0 < int(port) < 65536:
+        raise ValueError(f"invalid port {port!r}")
+    
+    return validate_connection(SSHConnection(
+        name=name,
+        host=host,
+        hostname=item.get("hostname") or host,
+        port=int(port),
+        user=item.get("user") or "root",
+        identity_file=item.get("identity_file"),
+        proxy_jump=item.get("proxy_jump"),
+        crypto_profile=item.get("crypto_profile"),
+        remote_session=item.get("remote_session"),
+        group=item.get("group"),
+        favorite=_flag(item.get("favorite", False)),
+        last_used=datetime.fromisoformat(item["last_used"]) if item.get("last_used") else None,
+        created_at=datetime.fromisoformat(item["created_at"]) if item.get("created_at") else None
+    ))
+
+
+def _counted(items: Iterable[Any], progress: Optional[ProgressCallback]) -> Iterator[Any]:
+    count = 0
+    for item in items:
+        yield item
+        count += 1
+        if progress and count % PROGRESS_EVERY == 0:
+            progress(count)
+
+
+def write_connections(connections: Iterable[SSHConnection], stream: IO[str], output_format: str = 'ndjson',
+                      progress: Optional[ProgressCallback] = None) -> int:
+    if output_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {output_format}")
+    records = (connection_to_dict(conn) for conn in _counted(connections, progress))
+    return write_records(records, output_format, EXPORT_FIELDS, stream)
+
+
+def export_connections(config_manager: ConfigManager, output_file: Union[str, Path], output_format: Optional[str] = None,
+                       progress: Optional[ProgressCallback] = None) -> int:
+    # one connection at a time from the config file to the output, never the whole list
+    output_format = output_format or detect_format(output_file)
+    if str(output_file) == '-':
+        return write_connections(config_manager.iter_connections(), sys.stdout, output_format, progress)
+    with open(output_file, 'w', encoding='utf-8', newline='\n') as f:
+        return write_connections(config_manager.iter_connections(), f, output_format, progress)
 
 
 def export_to_json(config_manager: ConfigManager, output_file: str) -> bool:
     try:
-        connections = config_manager.get_all_connections()
-        data = []
-        
-        for conn in connections:
-            conn_dict = {
-                "name": conn.name,
-                "host": conn.host,
-                "hostname": conn.hostname,
-                "port": conn.port,
-                "user": conn.user,
-                "identity_file": conn.identity_file,
-                "group": conn.group,
-                "favorite": conn.favorite,
-                "last_used": conn.last_used.isoformat() if conn.last_used else None,
-                "created_at": conn.created_at.isoformat() if conn.created_at else None
-            }
-            data.append(conn_dict)
-        
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
-        
+        export_connections(config_manager, output_file, 'json')
         return True
-    except Exception:
+    except (OSError, ValueError) as e:
+        logger.error(f"Export to {output_file} failed: {e}")
         return False
 
 
-def import_from_json(config_manager: ConfigManager, input_file: str) -> Tuple[int, int]:
-    try:
-        with open(input_file, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+def _iter_ndjson(stream: IO[str]) -> Iterator[Tuple[int, Any, Optional[str]]]:
+    for number, text in enumerate(stream, 1):
+        if not text.strip():
+            continue
+        try:
+            yield number, json.loads(text), None
+        except json.JSONDecodeError as e:
+            yield number, None, e.msg
+
+
+def _iter_json_array(stream: IO[str]) -> Iterator[Tuple[int, Any, Optional[str]]]:
+    # raw_decode over a sliding buffer: only the current record and one chunk are held in memory
+    decoder = json.JSONDecoder()
+    buffer = ''
+    position = 0
+    line = 1
+    opened = False
+    
+    while True:
+        while True:
+            while position < len(buffer) and buffer[position] in ' \t\r\n,[':
+                if buffer[position] == '[':
+                    if opened:
+                        break
+                    opened = True
+                elif buffer[position] == '\n':
+                    line += 1
+                position += 1
+            if position < len(buffer):
+                break
+            chunk = stream.read(READ_CHUNK)
+            if not chunk:
+                if opened:
+                    yield line, None, "unexpected end of input, expected ']'"
+                return
+            buffer = buffer[position:] + chunk
+            position = 0
         
-        imported = 0
-        skipped = 0
+        if not opened:
+            yield line, None, "expected '[' or one JSON object per line"
+            return
+        if buffer[position] == ']':
+            return
         
-        for item in data:
+        while True:
             try:
-                conn = SSHConnection(
-                    name=item["name"],
-                    host=item["host"],
-                    hostname=item.get("hostname", item["host"]),
-                    port=item.get("port", 22),
-                    user=item.get("user", "root"),
-                    identity_file=item.get("identity_file"),
-                    group=item.get("group"),
-                    favorite=item.get("favorite", False),
-                    last_used=datetime.fromisoformat(item["last_used"]) if item.get("last_used") else None,
-                    created_at=datetime.fromisoformat(item["created_at"]) if item.get("created_at") else None
-                )
-                
-                existing = config_manager.get_connection_by_name(conn.name)
-                if existing:
-                    skipped += 1
-                    continue
-                
-                if config_manager.add_connection(conn):
-                    imported += 1
-            except Exception:
-                skipped += 1
+                value, end = decoder.raw_decode(buffer, position)
+                break
+            except json.JSONDecodeError as e:
+                chunk = stream.read(READ_CHUNK) if len(buffer) - position < MAX_RECORD_SIZE else ''
+                if not chunk:
+                    # the array cannot be resynchronised after a syntax error
+                    yield line + buffer.count('\n', position, e.pos), None, e.msg
+                    return
+                buffer = buffer[position:] + chunk
+                position = 0
         
-        return imported, skipped
-    except Exception:
+        yield line, value, None
+        line += buffer.count('\n', position, end)
+        position = end
+
+
+def _sniff_format(stream: IO[str]) -> Tuple[str, IO[str]]:
+    # looks at the first non-blank character, and for anything but JSON at the rest of
+    # that line; everything read is put back in front of the stream
+    head = stream.read(1)
+    while head[-1:].isspace():
+        head += stream.read(1)
+    
+    if head.endswith('['):
+        input_format = 'json'
+    elif head.endswith('{') or not head:
+        input_format = 'ndjson'
+    else:
+        head += stream.readline()
+        first = head.lstrip().splitlines()[0]
+        keyword = first.split(None, 1)[0].split('=', 1)[0].lower()
+        if first.startswith('#') or keyword in ('host', 'match', 'include') or ',' not in first:
+            input_format = 'ssh_config'
+        else:
+            input_format = 'csv'
+    return input_format, _Prefixed(head, stream)
+
+
+def _iter_csv(stream: IO[str]) -> Iterator[Tuple[int, Any, Optional[str]]]:
+    reader = csv.DictReader(stream)
+    try:
+        for row in reader:
+            if None in row:
+                yield reader.line_num, None, "more cells than header columns"
+            else:
+                yield reader.line_num, {key.strip().lower(): value.strip() for key, value in row.items()
+                                        if value is not None}, None
+    except csv.Error as e:
+        yield reader.line_num, None, str(e)
+
+
+def _split_option(line: str) -> Tuple[str, str]:
+    match = _OPTION.match(line)
+    if not match:
+        return line, ""
+    value = match.group(2).strip()
+    if len(value) > 1 and value[0] == value[-1] == '"':
+        value = value[1:-1]
+    return match.group(1), value
+
+
+def ssh_config_connections(block: str) -> List[SSHConnection]:
+    # one OpenSSH Host block to connections: each plain alias becomes its own connection,
+    # wildcard patterns and Match blocks describe no concrete host and are left out
+    lines = [line.strip() for line in block.split('\n')]
+    keyword, value = _split_option(lines[0])
+    if keyword.lower() != 'host':
+        return []
+    
+    body = []
+    has_hostname = False
+    for line in lines[1:]:
+        if line.startswith('#'):
+            body.append(line)
+            continue
+        option, option_value = _split_option(line)
+        has_hostname = has_hostname or option.lower() == 'hostname'
+        body.append(f"{option} {option_value}")
+    
+    connections = []
+    for alias in value.split():
+        if any(char in alias for char in '*?!'):
+            continue
+        text = '\n'.join([f"Host {alias}"] + ([] if has_hostname else [f"HostName {alias}"]) + body)
+        conn = SSHConnection.from_ssh_config_block(text)
+        if conn:
+            connections.append(conn)
+    return connections
+
+
+def _iter_ssh_config(stream: IO[str]) -> Iterator[Tuple[int, Any, Optional[str]]]:
+    for line, block in iter_blocks((text.rstrip('\n') for text in stream), blank_lines=False):
+        for conn in ssh_config_connections(block):
+            yield line, conn, None
+
+
+_READERS = {
+    'json': _iter_json_array,
+    'ndjson': _iter_ndjson,
+    'csv': _iter_csv,
+    'ssh_config': _iter_ssh_config,
+}
+
+
+def iter_records(stream: IO[str], input_format: Optional[str] = None) -> Iterator[Tuple[int, Any, Optional[str]]]:
+    # yields (line, value, error); values are dicts, or connections for ssh_config
+    if input_format is None:
+        input_format, stream = _sniff_format(stream)
+    if input_format not in _READERS:
+        raise ValueError(f"Unsupported import format: {input_format}")
+    return _READERS[input_format](stream)
+
+
+class _Prefixed:
+    # puts back the characters read while sniffing the format
+    
+    def __init__(self, prefix: str, stream: IO[str]):
+        self.prefix = prefix
+        self.stream = stream
+    
+    def read(self, size: int = -1) -> str:
+        prefix, self.prefix = self.prefix, ''
+        return prefix + self.stream.read(size)
+    
+    def __iter__(self) -> Iterator[str]:
+        prefix, self.prefix = self.prefix, ''
+        yield from (prefix + self.stream.readline()).splitlines(True)
+        yield from self.stream
+
+
+def _describe(error: Exception) -> str:
+    if isinstance(error, KeyError):
+        return f"missing field {error.args[0]!r}"
+    return str(error)
+
+
+def read_connections(stream: IO[str], report: ImportReport, input_format: Optional[str] = None,
+                     progress: Optional[ProgressCallback] = None) -> Iterator[Tuple[int, SSHConnection]]:
+    # parse errors and invalid records go to the report with their line number; valid ones are yielded
+    for line, item, error in _counted(iter_records(stream, input_format), progress):
+        if error is not None:
+            report.errors.append(RecordError(line, None, error))
+            continue
+        try:
+            yield line, validate_connection(item) if isinstance(item, SSHConnection) else connection_from_dict(item)
+        except (KeyError, TypeError, ValueError) as e:
+            name = item.get("name") if isinstance(item, dict) else None
+            report.errors.append(RecordError(line, name if isinstance(name, str) else None, _describe(e)))
+
+
+def _metadata_changes(conn: SSHConnection, incoming: SSHConnection) -> Dict[str, Any]:
+    # only fields the record actually sets; an empty CMDB column does not clear anything
+    return {field: getattr(incoming, field) for field in METADATA_FIELDS
+            if getattr(incoming, field) and getattr(incoming, field) != getattr(conn, field)}
+
+
+def merge_connections(config_manager: ConfigManager, records: Iterable[Tuple[int, SSHConnection]],
+                      report: ImportReport, policy: str = 'skip',
+                      on_accept: Optional[Callable[[SSHConnection], None]] = None) -> int:
+    # Duplicates and conflicts are found with two dict lookups per record. A record whose
+    # (user, hostname, port) is already known is a duplicate of that connection; otherwise
+    # a record whose name is taken is a conflict. New connections stream straight to the
+    # end of the config file; replacements and metadata updates are applied to existing
+    # connections in a single rewrite at the end.
+    if policy not in MERGE_POLICIES:
+        raise ValueError(f"Unknown merge policy: {policy}")
+    
+    index = InventoryIndex(config_manager.read_index())
+    replacements: Dict[str, SSHConnection] = {}
+    metadata: Dict[str, SSHConnection] = {}
+    # connections added by this import, kept so later records can still change them
+    pending: Dict[str, SSHConnection] = {}
+    
+    def overwrite(name: str, conn: SSHConnection, identity: Identity):
+        conn.name = name
+        if name in pending:
+            for field in fields(conn):
+                setattr(pending[name], field.name, getattr(conn, field.name))
+        else:
+            replacements[name] = conn
+            metadata.pop(name, None)
+        index.remove(name)
+        index.add(name, identity)
+        report.updated += 1
+        if on_accept:
+            on_accept(conn)
+    
+    def update_metadata(name: str, conn: SSHConnection):
+        # existing connections are compared in transform, where they are read anyway
+        target = pending.get(name) or replacements.get(name)
+        if target is not None:
+            changes = _metadata_changes(target, conn)
+            for field, value in changes.items():
+                setattr(target, field, value)
+            if changes:
+                report.updated += 1
+            else:
+                report.skipped += 1
+        else:
+            metadata[name] = conn
+    
+    def additions() -> Iterator[SSHConnection]:
+        for line, conn in records:
+            identity = connection_identity(conn.user, conn.hostname, conn.port)
+            owner = index.by_identity.get(identity)
+            
+            if owner is not None:
+                if policy == 'overwrite':
+                    overwrite(owner, conn, identity)
+                elif policy == 'update-metadata':
+                    update_metadata(owner, conn)
+                else:
+                    report.skipped += 1
+                continue
+            
+            if conn.name in index.by_name:
+                report.conflicts += 1
+                if policy == 'overwrite':
+                    overwrite(conn.name, conn, identity)
+                    continue
+                if policy != 'rename':
+                    report.skipped += 1
+                    continue
+                conn.name = index.unique_name(conn.name)
+                report.renamed += 1
+            
+            index.add(conn.name, identity)
+            if policy != 'skip':
+                pending[conn.name] = conn
+            report.imported += 1
+            if on_accept:
+                on_accept(conn)
+            yield conn
+    
+    if policy == 'skip':
+        # nothing existing can change, so new connections never have to be held in memory
+        return config_manager.append_connections(additions())
+    
+    added = list(additions())
+    if not replacements and not metadata:
+        return config_manager.append_connections(added)
+    
+    def transform(conn: SSHConnection) -> SSHConnection:
+        if conn.name in replacements:
+            return replace(replacements[conn.name], **{field: getattr(conn, field) for field in LOCAL_FIELDS})
+        if conn.name not in metadata:
+            return conn
+        changes = _metadata_changes(conn, metadata[conn.name])
+        if not changes:
+            report.skipped += 1
+            return conn
+        report.updated += 1
+        return replace(conn, **changes)
+    
+    config_manager.rewrite_connections(transform, added)
+    return len(added)
+
+
+def import_connections(config_manager: ConfigManager, source: Union[str, Path, IO[str]],
+                       input_format: Optional[str] = None, policy: str = 'skip',
+                       progress: Optional[ProgressCallback] = None) -> ImportReport:
+    report = ImportReport()
+    if isinstance(source, (str, Path)) and str(source) != '-':
+        with open(source, 'r', encoding='utf-8', newline='') as f:
+            merge_connections(config_manager, read_connections(f, report, input_format, progress), report, policy)
+    else:
+        stream = sys.stdin if isinstance(source, (str, Path)) else source
+        merge_connections(config_manager, read_connections(stream, report, input_format, progress), report, policy)
+    return report
+
+
+def import_from_json(config_manager: ConfigManager, input_file: str) -> Tuple[int, int]:
+    try:
+        report = import_connections(config_manager, input_file)
+    except (OSError, ValueError) as e:
+        logger.error(f"Import from {input_file} failed: {e}")
         return 0, 0
+    for error in report.errors:
+        logger.warning(f"{input_file}:{error.line}: {error.message}")
+    return report.imported, report.skipped + len(report.errors)
 
 
 def export_to_ssh_config(config_manager: ConfigManager, output_file: str) -> bool:
@@ -88,43 +566,8 @@ def export_to_ssh_config(config_manager: ConfigManager, output_file: str) -> boo
 
 def import_from_ssh_config(config_manager: ConfigManager, input_file: str) -> Tuple[int, int]:
     try:
-        with open(input_file, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        blocks = []
-        current_block = []
-        
-        for line in content.split('\n'):
-            stripped = line.strip()
-            if not stripped:
-                if current_block:
-                    blocks.append('\n'.join(current_block))
-                    current_block = []
-                continue
-            
-            if stripped.lower().startswith('host ') and current_block:
-                blocks.append('\n'.join(current_block))
-                current_block = [line]
-            else:
-                current_block.append(line)
-        
-        if current_block:
-            blocks.append('\n'.join(current_block))
-        
-        imported = 0
-        skipped = 0
-        
-        for block in blocks:
-            conn = SSHConnection.from_ssh_config_block(block)
-            if conn:
-                existing = config_manager.get_connection_by_name(conn.name)
-                if existing:
-                    skipped += 1
-                    continue
-                
-                if config_manager.add_connection(conn):
-                    imported += 1
-        
-        return imported, skipped
-    except Exception:
+        report = import_connections(config_manager, input_file, 'ssh_config')
+    except (OSError, ValueError) as e:
+        logger.error(f"Import from {input_file} failed: {e}")
         return 0, 0
+    return report.imported, report.skipped
@@ -0,0 +1,120 @@
+import heapq
+import re
+from typing import Iterable, List, Optional, Sequence, Tuple, TypeVar
+
+Entry = TypeVar('Entry', bound=Sequence[str])
+
+SCORE_EXACT = 1000
+SCORE_EXACT_NOCASE = 950
+SCORE_EXACT_HOST = 900
+SCORE_PREFIX = 800
+SCORE_HOST_PREFIX = 700
+SCORE_GROUP = 650
+SCORE_SUBSTRING = 600
+SCORE_HOST_SUBSTRING = 500
+SCORE_FUZZY = 300
+
+
+def _subsequence_pattern(query: str) -> re.Pattern:
+    # lazy gaps prefer the tightest match, so span length reflects how scattered it is
+    return re.compile('.*?'.join(re.escape(char) for char in query))
+
+
+def score_entry(query: str, lowered: str, name: str, hostname: str, user: str, group: str,
+                pattern: Optional[re.Pattern] = None) -> int:
+    if name == query:
+        return SCORE_EXACT
+    
+    name_lower = name.lower()
+    if name_lower == lowered:
+        return SCORE_EXACT_NOCASE
+    
+    hostname_lower = hostname.lower()
+    user_host = f"{user}@{hostname}".lower()
+    if lowered in (hostname_lower, user_host, f"{user}@{name}".lower()):
+        return SCORE_EXACT_HOST
+    
+    # shorter names win among prefix and substring matches
+    if name_lower.startswith(lowered):
+        return SCORE_PREFIX - min(len(name) - len(query), 99)
+    if hostname_lower.startswith(lowered) or user_host.startswith(lowered):
+        return SCORE_HOST_PREFIX - min(len(hostname) - len(query), 49)
+    if group and group.lower() == lowered:
+        return SCORE_GROUP
+    
+    position = name_lower.find(lowered)
+    if position != -1:
+        return SCORE_SUBSTRING - min(position, 49) - min(len(name) - len(query), 49)
+    if lowered in user_host:
+        return SCORE_HOST_SUBSTRING - min(len(hostname) - len(query), 99)
+    
+    if pattern is not None:
+        match = pattern.search(name_lower)
+        if match:
+            gaps = (match.end() - match.start()) - len(lowered)
+            return SCORE_FUZZY - min(gaps * 5, 150) - min(match.start(), 49)
+    return 0
+
+
+def candidate_lines(query: str, text: str) -> List[str]:
+    # prefilter the raw tab-separated index with str.find so only plausible lines
+    # are scored in Python; fuzzy (subsequence) matches on the name column are only
+    # looked for when the query does not occur literally anywhere
+    lowered = query.strip().lower()
+    if not lowered:
+        return []
+    
+    text_lower = text.lower()
+    needle = lowered.rsplit('@', 1)[-1] or lowered
+    lines = []
+    seen = set()
+    position = text_lower.find(needle)
+    while position != -1:
+        start = text_lower.rfind('\n', 0, position) + 1
+        end = text_lower.find('\n', position)
+        if end == -1:
+            end = len(text_lower)
+        if start not in seen:
+            seen.add(start)
+            lines.append(text[start:end])
+        position = text_lower.find(needle, end)
+    
+    if not lines:
+        fuzzy = re.compile(r'^(?=[^\t\n]*?' + r'[^\t\n]*?'.join(re.escape(char) for char in lowered) + r')[^\n]*',
+                           re.MULTILINE)
+        for match in fuzzy.finditer(text_lower):
+            if match.start() not in seen:
+                seen.add(match.start())
+                lines.append(text[match.start():match.end()])
+    return lines
+
+
+def rank_entries(query: str, entries: Iterable[Entry], limit: int = 10) -> List[Tuple[int, Entry]]:
+    query = query.strip()
+    if not query:
+        return []
+    
+    lowered = query.lower()
+    pattern = _subsequence_pattern(lowered)
+    scored = []
+    for index, entry in enumerate(entries):
+        name, hostname, user, _, group = entry
+        score = score_entry(query, lowered, name, hostname, user, group, pattern)
+        if score:
+            scored.append((score, -len(name), -index, entry))
+    
+    best = heapq.nlargest(limit, scored, key=lambda item: item[:3])
+    return [(score, entry) for score, _, _, entry in best]
+
+
+def is_unambiguous(ranked: List[Tuple[int, Entry]]) -> bool:
+    if not ranked:
+        return False
+    if len(ranked) == 1:
+        return True
+    
+    best, runner_up = ranked[0][0], ranked[1][0]
+    if best >= SCORE_EXACT_HOST:
+        return runner_up < best
+    # otherwise the best match has to be clearly better, e.g. a prefix against fuzzy matches
+    return best - runner_up >= 200
@@ -1,74 +1,283 @@
+import codecs
 import sys
 import os
+import time
+from collections import deque
+from typing import Deque, List, Optional
+
+ESCAPE_TIMEOUT = 0.025
+# without bracketed paste, a read of at least this many printable characters is taken
+# for a paste; shorter bursts are fast typing or key repeat and stay separate keys
+PASTE_BURST_MIN = 16
+
+PASTE_START = '\x1b[200~'
+PASTE_END = '\x1b[201~'
+BRACKETED_PASTE_ON = '\x1b[?2004h'
+BRACKETED_PASTE_OFF = '\x1b[?2004l'
+
+_CSI_KEYS = {'A': 'up', 'B': 'down', 'C': 'right', 'D': 'left', 'H': 'home', 'F': 'end'}
+_TILDE_KEYS = {'1': 'home', '7': 'home', '4': 'end', '8': 'end', '3': 'delete', '5': 'pageup', '6': 'pagedown'}
+_CONTROL_KEYS = {'\r': 'enter', '\n': 'enter', '\x7f': 'backspace', '\x08': 'backspace', '\t': 'tab'}
+
+
+class Paste(str):
+    pass
+
+
+class KeyDecoder:
+    
+    def __init__(self):
+        self._decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        self._buffer = ''
+        self._paste: Optional[List[str]] = None
+        self.events: Deque[str] = deque()
+        # set by the first bracketed paste; from then on the burst heuristic is off
+        self.bracketed = False
+    
+    @property
+    def pending(self) -> bool:
+        return bool(self._buffer)
+    
+    def feed(self, data: bytes):
+        text = self._decoder.decode(data)
+        # terminals without bracketed paste deliver a paste as one burst of plain text
+        if (not self.bracketed and not self._buffer and self._paste is None and len(text) >= PASTE_BURST_MIN
+                and '\x1b' not in text and all(ch.isprintable() or ch in '\r\n\t' for ch in text)):
+            self.events.append(Paste(text))
+            return
+        self._buffer += text
+        self._parse(final=False)
+    
+    def flush(self):
+        # nothing followed an ESC within ESCAPE_TIMEOUT, so it was the Escape key
+        self._parse(final=True)
+    
+    def _parse(self, final: bool):
+        buffer = self._buffer
+        i = 0
+        while i < len(buffer):
+            if self._paste is not None:
+                end = buffer.find(PASTE_END, i)
+                if end != -1:
+                    self._paste.append(buffer[i:end])
+                    self.events.append(Paste(''.join(self._paste)))
+                    self._paste = None
+                    i = end + len(PASTE_END)
+                    continue
+                tail = buffer.rfind('\x1b', i)
+                if tail != -1 and PASTE_END.startswith(buffer[tail:]):
+                    self._paste.append(buffer[i:tail])
+                    i = tail
+                else:
+                    self._paste.append(buffer[i:])
+                    i = len(buffer)
+                break
+            
+            ch = buffer[i]
+            if ch != '\x1b':
+                self.events.append(_CONTROL_KEYS.get(ch, ch))
+                i += 1
+                continue
+            
+            if i + 1 == len(buffer):
+                if final:
+                    self.events.append('escape')
+                    i += 1
+                break
+            
+            introducer = buffer[i + 1]
+            if introducer == '[':
+                j = i + 2
+                while j < len(buffer) and not '\x40' <= buffer[j] <= '\x7e':
+                    j += 1
+                if j == len(buffer):
+                    if final:
+                        self.events.append('escape')
+                        i = len(buffer)
+                    break
+                if buffer[i:j + 1] == PASTE_START:
+                    self._paste = []
+                    self.bracketed = True
+                else:
+                    params, terminator = buffer[i + 2:j], buffer[j]
+                    if terminator == '~':
+                        key = _TILDE_KEYS.get(params.split(';')[0])
+                    else:
+                        key = _CSI_KEYS.get(terminator)
+                    # unknown sequences (focus reports, function keys) are dropped, not read as Escape
+                    if key:
+                        self.events.append(key)
+                i = j + 1
+            elif introducer == 'O':
+                if i + 2 == len(buffer):
+                    if final:
+                        self.events.append('escape')
+                        i = len(buffer)
+                    break
+                self.events.append(_CSI_KEYS.get(buffer[i + 2], 'escape'))
+                i += 3
+            else:
+                self.events.append('escape')
+                i += 1
+        
+        self._buffer = buffer[i:]
+
 
 if sys.platform == 'win32':
     import msvcrt
     
-    def get_key():
-        if msvcrt.kbhit():
-            ch = msvcrt.getch()
-            if ch == b'\xe0':
-                ch = msvcrt.getch()
-                if ch == b'H':  # Up arrow
-                    return 'up'
-                elif ch == b'P':  # Down arrow
-                    return 'down'
-                elif ch == b'M':  # Right arrow
-                    return 'right'
-                elif ch == b'K':  # Left arrow
-                    return 'left'
-            elif ch == b'\r':  # Enter
-                return 'enter'
-            elif ch == b'\x1b':  # Escape
+    _SCAN_KEYS = {'H': 'up', 'P': 'down', 'M': 'right', 'K': 'left', 'G': 'home', 'O': 'end',
+                  'I': 'pageup', 'Q': 'pagedown', 'S': 'delete'}
+    
+    class KeyReader:
+        
+        def __init__(self, stream=None):
+            self.stream = stream or sys.stdin
+            self._woken = False
+            self._queued: Deque[str] = deque()
+        
+        @property
+        def pending(self) -> bool:
+            return bool(self._queued)
+        
+        def start(self):
+            pass
+        
+        def stop(self):
+            pass
+        
+        def wake(self):
+            self._woken = True
+        
+        def _translate(self, ch: str) -> Optional[str]:
+            if ch in ('\x00', '\xe0'):
+                return _SCAN_KEYS.get(msvcrt.getwch())
+            if ch == '\x1b':
                 return 'escape'
-            elif ch == b'\x08':  # Backspace
-                return 'backspace'
-            else:
-                try:
-                    decoded = ch.decode('utf-8')
-                    if decoded == '*':
-                        return '*'
-                    return decoded.lower()
-                except:
+            return _CONTROL_KEYS.get(ch, ch)
+        
+        def _split(self, burst: List[str]) -> List[str]:
+            keys = []
+            chars = iter(burst)
+            for ch in chars:
+                key = _SCAN_KEYS.get(next(chars, '')) if ch in ('\x00', '\xe0') else self._translate(ch)
+                if key:
+                    keys.append(key)
+            return keys
+        
+        def read_key(self, timeout: Optional[float] = None) -> Optional[str]:
+            if self._queued:
+                return self._queued.popleft()
+            # msvcrt offers no waitable handle, so waiting for a key or a wake-up falls back to kbhit
+            deadline = None if timeout is None else time.monotonic() + timeout
+            while not msvcrt.kbhit():
+                if self._woken or (deadline is not None and time.monotonic() >= deadline):
+                    self._woken = False
                     return None
-        return None
+                time.sleep(0.02)
+            
+            ch = msvcrt.getwch()
+            if not ch.isprintable() or not msvcrt.kbhit():
+                return self._translate(ch)
+            
+            burst = [ch]
+            while msvcrt.kbhit():
+                burst.append(msvcrt.getwch())
+            if len(burst) < PASTE_BURST_MIN:
+                self._queued.extend(self._split(burst))
+                return self._queued.popleft() if self._queued else None
+            
+            text = []
+            chars = iter(burst)
+            for ch in chars:
+                if ch in ('\x00', '\xe0'):
+                    next(chars, None)
+                    continue
+                text.append('\n' if ch == '\r' else ch)
+            return Paste(''.join(text))
 else:
     import termios
-    import tty
-    import select
+    import selectors
     
-    def get_key():
-        if not select.select([sys.stdin], [], [], 0)[0]:
-            return None
+    class KeyReader:
         
-        fd = sys.stdin.fileno()
-        old_settings = termios.tcgetattr(fd)
-        try:
-            tty.setraw(sys.stdin.fileno())
-            ch = sys.stdin.read(1)
-            if ch == '\x1b':
-                if select.select([sys.stdin], [], [], 0.05)[0]:
-                    ch2 = sys.stdin.read(1)
-                    ch3 = sys.stdin.read(1) if ch2 == '[' and select.select([sys.stdin], [], [], 0.05)[0] else ''
-                    ch = ch + ch2 + ch3
-                    if ch == '\x1b[A':  # Up arrow
-                        return 'up'
-                    elif ch == '\x1b[B':  # Down arrow
-                        return 'down'
-                    elif ch == '\x1b[C':  # Right arrow
-                        return 'right'
-                    elif ch == '\x1b[D':  # Left arrow
-                        return 'left'
-                    else:
-                        return 'escape'
-                else:
-                    return 'escape'
-            elif ch == '\r' or ch == '\n':  # Enter
-                return 'enter'
-            elif ch == '\x7f':  # Backspace
-                return 'backspace'
-            else:
-                return ch.lower()
-        finally:
-            termios.tcsetattr(fd, termios.TCSADRAIN, old_settings)
-        return None
+        def __init__(self, stream=None):
+            self.stream = stream or sys.stdin
+            self.fd = self.stream.fileno()
+            self.decoder = KeyDecoder()
+            self._selector = selectors.DefaultSelector()
+            self._selector.register(self.fd, selectors.EVENT_READ)
+            # background workers write to this pipe to make read_key return early
+            self._wake_read, self._wake_write = os.pipe()
+            os.set_blocking(self._wake_read, False)
+            os.set_blocking(self._wake_write, False)
+            self._selector.register(self._wake_read, selectors.EVENT_READ)
+            self._saved = None
+        
+        @property
+        def pending(self) -> bool:
+            return bool(self.decoder.events)
+        
+        def start(self):
+            if self._saved is not None or not os.isatty(self.fd):
+                return
+            
+            self._saved = termios.tcgetattr(self.fd)
+            mode = termios.tcgetattr(self.fd)
+            # like cbreak, but Ctrl+C and Ctrl+S arrive as keys; output processing stays on
+            mode[0] &= ~(termios.IXON | termios.ICRNL)
+            mode[3] &= ~(termios.ICANON | termios.ECHO | termios.ISIG | termios.IEXTEN)
+            mode[6][termios.VMIN] = 1
+            mode[6][termios.VTIME] = 0
+            termios.tcsetattr(self.fd, termios.TCSADRAIN, mode)
+            sys.stdout.write(BRACKETED_PASTE_ON)
+            sys.stdout.flush()
+        
+        def stop(self):
+            if self._saved is None:
+                return
+            
+            sys.stdout.write(BRACKETED_PASTE_OFF)
+            sys.stdout.flush()
+            termios.tcsetattr(self.fd, termios.TCSADRAIN, self._saved)
+            self._saved = None
+        
+        def wake(self):
+            try:
+                os.write(self._wake_write, b'\0')
+            except BlockingIOError:
+                pass
+        
+        def read_key(self, timeout: Optional[float] = None) -> Optional[str]:
+            self.start()
+            deadline = None if timeout is None else time.monotonic() + timeout
+            
+            while not self.decoder.events:
+                wait = None if deadline is None else max(0.0, deadline - time.monotonic())
+                if self.decoder.pending:
+                    wait = ESCAPE_TIMEOUT if wait is None else min(wait, ESCAPE_TIMEOUT)
+                
+                ready = self._selector.select(wait)
+                woken = False
+                for key, _ in ready:
+                    if key.fd == self._wake_read:
+                        try:
+                            os.read(self._wake_read, 4096)
+                        except BlockingIOError:
+                            pass
+                        woken = True
+                        continue
+                    data = os.read(self.fd, 4096)
+                    if not data:
+                        raise EOFError
+                    self.decoder.feed(data)
+                
+                if ready:
+                    if woken and not self.decoder.events:
+                        return None
+                elif self.decoder.pending:
+                    self.decoder.flush()
+                elif deadline is not None:
+                    return None
+            
+            return self.decoder.events.popleft()
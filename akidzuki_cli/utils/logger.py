@@ -1,35 +1,141 @@
+import atexit
+import json
 import logging
-import sys
+import queue
+import threading
+from datetime import datetime
 from pathlib import Path
-from typing import Optional
-from logging.handlers import RotatingFileHandler
+from typing import Dict, List, Optional, TextIO
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 
 
-def setup_logging(log_file: Optional[str] = None, level: int = logging.INFO):
-    logger = logging.getLogger('akidzuki_cli')
-    logger.setLevel(level)
+# loggers fed into the pipeline; paramiko's would otherwise fall through to the
+# last-resort handler and print into the terminal
+PIPELINE_LOGGERS = ('akidzuki_cli', 'paramiko')
+CONSOLE_LEVEL = logging.WARNING
+LOG_FORMATS = ('text', 'json')
+
+# attributes every LogRecord has; anything else was passed through extra= and is kept
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime'}
+
+_lock = threading.Lock()
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional[QueueHandler] = None
+_configured_levels: List[str] = []
+
+
+class _QueueHandler(QueueHandler):
+    # the stdlib version formats the whole record, traceback included, and copies it on
+    # the calling thread; this handler is the only one on the pipeline loggers, so the
+    # record is finished in place and everything else is left to the listener
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.message = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class JsonFormatter(logging.Formatter):
     
-    formatter = logging.Formatter(
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "thread": record.threadName,
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+def _formatter(log_format: str) -> logging.Formatter:
+    if log_format == 'json':
+        return JsonFormatter()
+    return logging.Formatter(
         '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
         datefmt='%Y-%m-%d %H:%M:%S'
     )
+
+
+def _level(value, default: int) -> int:
+    if isinstance(value, int):
+        return value
+    return getattr(logging, str(value).upper(), default)
+
+
+def shutdown_logging():
+    # stops the listener after it has written everything still queued
+    global _listener, _queue_handler
+    with _lock:
+        if _listener is not None:
+            _listener.stop()
+            for handler in _listener.handlers:
+                handler.close()
+        if _queue_handler is not None:
+            for name in PIPELINE_LOGGERS:
+                logging.getLogger(name).removeHandler(_queue_handler)
+        for name in _configured_levels:
+            logging.getLogger(name).setLevel(logging.NOTSET)
+        _configured_levels.clear()
+        _listener = None
+        _queue_handler = None
+
+
+def setup_logging(log_file: Optional[str] = None, level: int = logging.INFO, stream: Optional[TextIO] = None,
+                  log_format: str = 'text', levels: Optional[Dict[str, str]] = None) -> logging.Logger:
+    # Callers only enqueue records; a listener thread does the formatting and file I/O.
+    # Nothing is written to a terminal unless a stream is passed, and then only warnings
+    # and errors. Calling this again replaces the previous configuration.
+    shutdown_logging()
     
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(level)
-    console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
-    
+    handlers: List[logging.Handler] = []
     if log_file:
         log_path = Path(log_file)
         log_path.parent.mkdir(parents=True, exist_ok=True)
-        
         file_handler = RotatingFileHandler(
             log_file,
             maxBytes=10*1024*1024,
-            backupCount=5
+            backupCount=5,
+            encoding='utf-8'
         )
         file_handler.setLevel(logging.DEBUG)
-        file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
+        file_handler.setFormatter(_formatter(log_format))
+        handlers.append(file_handler)
+    
+    if stream is not None:
+        console_handler = logging.StreamHandler(stream)
+        console_handler.setLevel(CONSOLE_LEVEL)
+        console_handler.setFormatter(_formatter('text'))
+        handlers.append(console_handler)
+    
+    global _listener, _queue_handler
+    with _lock:
+        log_queue: queue.SimpleQueue = queue.SimpleQueue()
+        _queue_handler = _QueueHandler(log_queue)
+        _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+        
+        for name in PIPELINE_LOGGERS:
+            pipeline_logger = logging.getLogger(name)
+            pipeline_logger.addHandler(_queue_handler)
+            pipeline_logger.propagate = False
+        
+        logger = logging.getLogger('akidzuki_cli')
+        logger.setLevel(level)
+        for name, name_level in (levels or {}).items():
+            logging.getLogger(name).setLevel(_level(name_level, level))
+            _configured_levels.append(name)
     
     return logger
+
+
+atexit.register(shutdown_logging)
@@ -0,0 +1,82 @@
+import json
+import sys
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, TextIO
+
+from ..models.connection import SSHConnection
+
+OUTPUT_FORMATS = ['table', 'json', 'ndjson', 'tsv']
+
+CONNECTION_FIELDS = [
+    'name', 'host', 'hostname', 'port', 'user', 'identity_file', 'proxy_jump', 'crypto_profile',
+    'remote_session', 'group', 'favorite', 'last_used', 'created_at', 'auth_method', 'auth_key',
+]
+TEST_RESULT_FIELDS = ['ok', 'message', 'elapsed_ms']
+
+LIST_DEFAULT_FIELDS = ['name', 'hostname', 'port', 'user', 'group', 'favorite']
+TEST_DEFAULT_FIELDS = ['name', 'hostname', 'port', 'ok', 'message', 'elapsed_ms']
+
+
+def parse_fields(value: Optional[str], default: List[str], available: List[str]) -> List[str]:
+    if not value:
+        return list(default)
+    if value == 'all':
+        return list(available)
+    
+    fields = [field.strip() for field in value.split(',') if field.strip()]
+    unknown = [field for field in fields if field not in available]
+    if unknown:
+        raise ValueError(f"Unknown field(s): {', '.join(unknown)}. Available: {', '.join(available)}")
+    return fields
+
+
+def connection_record(connection: SSHConnection, fields: List[str],
+                      extra: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    record = {}
+    for field in fields:
+        if extra is not None and field in extra:
+            value = extra[field]
+        else:
+            value = getattr(connection, field)
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        record[field] = value
+    return record
+
+
+def _tsv_value(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value).replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n').replace('\r', '\\r')
+
+
+def write_records(records: Iterable[Dict[str, Any]], output_format: str, fields: List[str],
+                  stream: Optional[TextIO] = None, header: bool = True, flush: bool = False) -> int:
+    stream = stream or sys.stdout
+    count = 0
+    
+    if output_format == 'json':
+        stream.write('[')
+    elif output_format == 'tsv' and header:
+        stream.write('\t'.join(fields) + '\n')
+    
+    for record in records:
+        if output_format == 'json':
+            stream.write(('\n  ' if count == 0 else ',\n  ') + json.dumps(record, ensure_ascii=False))
+        elif output_format == 'ndjson':
+            stream.write(json.dumps(record, ensure_ascii=False) + '\n')
+        else:
+            stream.write('\t'.join(_tsv_value(record[field]) for field in fields) + '\n')
+        count += 1
+        
+        # the first row goes out at once so readers like fzf start immediately;
+        # after that the stream's own buffering decides unless every row matters
+        if flush or count == 1:
+            stream.flush()
+    
+    if output_format == 'json':
+        stream.write('\n]\n' if count else ']\n')
+    stream.flush()
+    return count
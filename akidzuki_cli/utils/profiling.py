@@ -0,0 +1,131 @@
+import os
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional, TextIO
+
+PROFILE_MODES = ('cpu', 'alloc')
+PROFILE_ENV = 'AKIDZUKI_PROFILE'
+PROFILE_TOP = 25
+# frames kept per allocation; deeper stacks make snapshots much larger
+ALLOC_FRAMES = 25
+
+_SUFFIXES = {'cpu': '.pstats', 'alloc': '.tracemalloc'}
+
+
+def normalize_profile_args(argv: List[str]) -> List[str]:
+    # --profile takes an optional value, which argparse would fill with the subcommand or
+    # reject as one; '--profile alloc' and a bare --profile are joined into --profile=MODE
+    # before parsing. Arguments after '--' are left alone.
+    args = []
+    rest = iter(argv)
+    for arg in rest:
+        if arg == '--':
+            args.append(arg)
+            args.extend(rest)
+            break
+        if arg != '--profile':
+            args.append(arg)
+            continue
+        mode = next(rest, None)
+        args.append(f"--profile={mode if mode in PROFILE_MODES else 'cpu'}")
+        if mode is not None and mode not in PROFILE_MODES:
+            args.append(mode)
+    return args
+
+
+def profile_mode_from_env() -> Optional[str]:
+    mode = os.environ.get(PROFILE_ENV, '').strip().lower()
+    if not mode or mode in ('0', 'off', 'false', 'no'):
+        return None
+    if mode in ('1', 'on', 'true', 'yes'):
+        return 'cpu'
+    if mode not in PROFILE_MODES:
+        sys.stderr.write(f"Ignoring {PROFILE_ENV}={mode}: expected one of {', '.join(PROFILE_MODES)}\n")
+        return None
+    return mode
+
+
+class Profiler:
+    # cpu: cProfile of the calling thread, written as pstats; alloc: tracemalloc across all
+    # threads, written as a snapshot. The file is saved and the summary printed to stderr
+    # on any exit, including sys.exit() and Ctrl+C.
+    
+    def __init__(self, mode: str, label: str, directory: str = "profiles", top: int = PROFILE_TOP,
+                 stream: Optional[TextIO] = None):
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Unknown profile mode: {mode}")
+        self.mode = mode
+        self.top = top
+        self.stream = stream
+        timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        safe_label = "".join(c if c.isalnum() or c in "-_." else "_" for c in label)
+        self.path = Path(directory) / f"akidzuki-{safe_label}-{timestamp}-{os.getpid()}{_SUFFIXES[mode]}"
+        self._profile = None
+    
+    def __enter__(self) -> 'Profiler':
+        if self.mode == 'cpu':
+            import cProfile
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        else:
+            import tracemalloc
+            tracemalloc.start(ALLOC_FRAMES)
+        return self
+    
+    def __exit__(self, *exc):
+        stream = self.stream or sys.stderr
+        # profiling stops before anything can fail, so it never stays on for the rest of the process
+        if self.mode == 'cpu':
+            self._profile.disable()
+            snapshot = peak = None
+        else:
+            snapshot, peak = self._stop_alloc()
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            if self.mode == 'cpu':
+                self._profile.dump_stats(str(self.path))
+                self._print_cpu(stream)
+            else:
+                self._write_alloc(stream, snapshot, peak)
+        except OSError as e:
+            stream.write(f"Could not write profile {self.path}: {e}\n")
+        return False
+    
+    def _print_cpu(self, stream: TextIO):
+        import pstats
+        
+        stream.write(f"\nCPU profile written to {self.path} (python -m pstats {self.path})\n")
+        stats = pstats.Stats(self._profile, stream=stream)
+        stats.strip_dirs().sort_stats(pstats.SortKey.CUMULATIVE).print_stats(self.top)
+    
+    def _stop_alloc(self):
+        import tracemalloc
+        
+        try:
+            _, peak = tracemalloc.get_traced_memory()
+            snapshot = tracemalloc.take_snapshot()
+        finally:
+            tracemalloc.stop()
+        return snapshot, peak
+    
+    def _write_alloc(self, stream: TextIO, snapshot, peak: int):
+        import tracemalloc
+        
+        snapshot = snapshot.filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+            tracemalloc.Filter(False, "<unknown>"),
+        ])
+        snapshot.dump(str(self.path))
+        
+        statistics = snapshot.statistics('lineno')
+        total = sum(stat.size for stat in statistics)
+        stream.write(
+            f"\nAllocation snapshot written to {self.path}\n"
+            f"Peak traced memory {peak / 1024 / 1024:.1f} MiB, still allocated at exit {total / 1024 / 1024:.1f} MiB\n"
+            f"Top {self.top} lines by memory still allocated:\n"
+        )
+        for stat in statistics[:self.top]:
+            frame = stat.traceback[0]
+            stream.write(f"{stat.size / 1024:10.1f} KiB {stat.count:8d} blocks  {frame.filename}:{frame.lineno}\n")
@@ -1,4 +1,4 @@
-from akidzuki_cli.main import main
+from akidzuki_cli.cli import main
 
 if __name__ == "__main__":
     main()
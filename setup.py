@@ -34,7 +34,7 @@ setup(
     install_requires=requirements,
     entry_points={
         "console_scripts": [
-            "akidzuki=akidzuki_cli.main:main",
+            "akidzuki=akidzuki_cli.cli:main",
         ],
     },
 )
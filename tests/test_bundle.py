@@ -0,0 +1,132 @@
+import io
+import json
+
+import pytest
+
+from akidzuki_cli.config.manager import ConfigManager
+from akidzuki_cli.models.connection import SSHConnection
+from akidzuki_cli.utils import bundle
+from akidzuki_cli.utils.bundle import BundleWriter, export_bundle, import_bundle, iter_bundle_records, verify_bundle
+
+PASSPHRASE = "correct horse battery staple"
+
+
+@pytest.fixture
+def small_frames(monkeypatch):
+    # a handful of records then spans several frames
+    monkeypatch.setattr(bundle, 'CHUNK_SIZE', 64)
+
+
+def _bundle(records) -> bytes:
+    stream = io.BytesIO()
+    writer = BundleWriter(stream, PASSPHRASE)
+    for record in records:
+        writer.write_record(record)
+    writer.close()
+    return stream.getvalue()
+
+
+def _split(data: bytes):
+    # header, then the raw frames (frame header + ciphertext) in file order
+    header, offset, frames = data[:bundle._HEADER_SIZE], bundle._HEADER_SIZE, []
+    while offset < len(data):
+        _, length = bundle._FRAME.unpack_from(data, offset)
+        end = offset + bundle._FRAME.size + length
+        frames.append(data[offset:end])
+        offset = end
+    return header, frames
+
+
+def _records(data: bytes, passphrase: str = PASSPHRASE):
+    return [json.loads(line) for _, line in iter_bundle_records(io.BytesIO(data), passphrase)]
+
+
+RECORDS = [{"name": f"host-{i}", "host": f"10.0.0.{i}", "note": f"{i:08x}" * 8} for i in range(20)]
+
+
+def test_round_trip(small_frames):
+    data = _bundle(RECORDS)
+    assert len(_split(data)[1]) > 2
+    assert _records(data) == RECORDS
+    assert verify_bundle(io.BytesIO(data), PASSPHRASE) > 0
+
+
+def test_empty_bundle():
+    assert _records(_bundle([])) == []
+
+
+def test_wrong_passphrase():
+    with pytest.raises(ValueError, match="wrong passphrase"):
+        _records(_bundle(RECORDS), "wrong")
+
+
+@pytest.mark.parametrize("position", [0, len(bundle.BUNDLE_MAGIC), bundle._HEADER_SIZE + bundle._FRAME.size, -1])
+def test_flipped_byte(position):
+    data = bytearray(_bundle(RECORDS))
+    data[position] ^= 0x01
+    with pytest.raises(ValueError):
+        verify_bundle(io.BytesIO(bytes(data)), PASSPHRASE)
+
+
+def test_reordered_frames(small_frames):
+    header, frames = _split(_bundle(RECORDS))
+    frames[0], frames[1] = frames[1], frames[0]
+    with pytest.raises(ValueError, match="corrupted bundle"):
+        verify_bundle(io.BytesIO(header + b''.join(frames)), PASSPHRASE)
+
+
+def test_dropped_frame(small_frames):
+    header, frames = _split(_bundle(RECORDS))
+    del frames[1]
+    with pytest.raises(ValueError, match="corrupted bundle"):
+        verify_bundle(io.BytesIO(header + b''.join(frames)), PASSPHRASE)
+
+
+def test_missing_final_frame(small_frames):
+    header, frames = _split(_bundle(RECORDS))
+    with pytest.raises(ValueError, match="truncated"):
+        verify_bundle(io.BytesIO(header + b''.join(frames[:-1])), PASSPHRASE)
+
+
+@pytest.mark.parametrize("cut", [1, 17, bundle._FRAME.size + 1])
+def test_truncated(cut):
+    data = _bundle(RECORDS)
+    with pytest.raises(ValueError, match="truncated|corrupted"):
+        verify_bundle(io.BytesIO(data[:-cut]), PASSPHRASE)
+
+
+def test_trailing_data():
+    with pytest.raises(ValueError, match="unexpected data"):
+        verify_bundle(io.BytesIO(_bundle(RECORDS) + b'\0'), PASSPHRASE)
+
+
+def test_not_a_bundle():
+    with pytest.raises(ValueError, match="not an Akidzuki bundle"):
+        verify_bundle(io.BytesIO(b'{"name": "web"}\n'), PASSPHRASE)
+
+
+def test_export_import(tmp_path):
+    source = ConfigManager(str(tmp_path / "source"))
+    source.append_connections([SSHConnection(name="web", host="web.example.com", user="deploy", port=2222),
+                               SSHConnection(name="db", host="db.example.com", group="prod")])
+    path = tmp_path / "inventory.akzb"
+    assert export_bundle(source, path, PASSPHRASE, secrets=False) == (2, 0)
+    
+    target = ConfigManager(str(tmp_path / "target"))
+    report = import_bundle(target, path, PASSPHRASE)
+    assert not report.errors
+    imported = {conn.name: conn for conn in target.iter_connections()}
+    assert (imported["web"].hostname, imported["web"].user, imported["web"].port) == ("web.example.com", "deploy", 2222)
+    assert imported["db"].group == "prod"
+
+
+def test_import_rejects_tampered_file(tmp_path):
+    path = tmp_path / "inventory.akzb"
+    data = bytearray(_bundle([{"name": "web", "host": "web.example.com"}]))
+    data[-1] ^= 0x01
+    path.write_bytes(bytes(data))
+    
+    target = ConfigManager(str(tmp_path / "target"))
+    with pytest.raises(ValueError):
+        import_bundle(target, path, PASSPHRASE)
+    assert list(target.iter_connections()) == []
@@ -0,0 +1,38 @@
+import io
+
+import pytest
+
+from akidzuki_cli.config.manager import ConfigManager
+from akidzuki_cli.models.connection import SSHConnection
+from akidzuki_cli.utils.export_import import import_connections, write_connections
+
+
+@pytest.fixture
+def config_manager(tmp_path):
+    config_manager = ConfigManager(str(tmp_path / "config"))
+    config_manager.append_connections([SSHConnection(name="web", host="web.example.com", group="old")])
+    return config_manager
+
+
+def _import(config_manager: ConfigManager, conn: SSHConnection, policy: str):
+    stream = io.StringIO()
+    write_connections([conn], stream)
+    stream.seek(0)
+    return import_connections(config_manager, stream, policy=policy)
+
+
+@pytest.mark.parametrize("policy", ['update-metadata', 'overwrite'])
+def test_import_keeps_local_favorite(config_manager, policy):
+    incoming = SSHConnection(name="web", host="web.example.com", group="new", favorite=True)
+    assert not _import(config_manager, incoming, policy).errors
+    
+    [conn] = config_manager.iter_connections()
+    assert conn.group == "new"
+    assert not conn.favorite
+
+
+def test_update_metadata_counts_only_changes(config_manager):
+    incoming = SSHConnection(name="web", host="web.example.com", group="new")
+    assert _import(config_manager, incoming, 'update-metadata').updated == 1
+    report = _import(config_manager, incoming, 'update-metadata')
+    assert (report.updated, report.skipped) == (0, 1)
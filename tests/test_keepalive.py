@@ -0,0 +1,104 @@
+import threading
+import time
+
+import paramiko
+from paramiko.common import MSG_REQUEST_FAILURE, MSG_REQUEST_SUCCESS
+
+from akidzuki_cli.ssh.health import HealthScheduler
+from akidzuki_cli.ssh.keepalive import KeepaliveProbe
+
+
+class FakeTransport:
+    # answers every keepalive on the calling thread, like a server on a fast link would
+    
+    def __init__(self, answer: bool = True):
+        self.answer = answer
+        self.active = True
+        self.sent = []
+        self.replies = []
+        self._handler_table = {MSG_REQUEST_SUCCESS: self._reply, MSG_REQUEST_FAILURE: self._reply}
+    
+    def is_active(self) -> bool:
+        return self.active
+    
+    def close(self):
+        self.active = False
+    
+    def _send_user_message(self, message: paramiko.Message):
+        self.sent.append(message)
+        if self.answer:
+            self.receive()
+    
+    def receive(self, ptype: int = MSG_REQUEST_FAILURE):
+        self._handler_table[ptype](paramiko.Message())
+    
+    def _reply(self, message: paramiko.Message):
+        self.replies.append(message)
+
+
+def test_reply_sets_rtt():
+    transport = FakeTransport()
+    probe = KeepaliveProbe(transport, interval=1)
+    assert probe.poll(slack=1)
+    assert len(transport.sent) == 1
+    assert probe.poll()
+    assert probe.rtt is not None and probe.rtt >= 0
+    assert probe.failures == 0
+    assert transport.replies == []
+
+
+def test_unanswered_keepalives_count_as_failures():
+    transport = FakeTransport(answer=False)
+    probe = KeepaliveProbe(transport, interval=1, count_max=3)
+    start = time.monotonic()
+    assert probe.poll(start, slack=1)
+    assert probe.poll(start + 1.5)
+    assert probe.failures == 1 and probe.next_deadline() == start + 2
+    assert not probe.poll(start + 3)
+    assert not probe.alive
+    assert len(transport.sent) == 1
+
+
+def test_other_replies_reach_paramiko():
+    transport = FakeTransport(answer=False)
+    probe = KeepaliveProbe(transport, interval=1)
+    transport.receive(MSG_REQUEST_SUCCESS)
+    assert len(transport.replies) == 1
+    
+    probe.close()
+    assert probe.poll(slack=1)
+    transport.receive()
+    assert len(transport.replies) == 2
+
+
+def test_scheduler_runs_on_one_thread():
+    scheduler = HealthScheduler(tick=0.05)
+    transports = [FakeTransport() for _ in range(300)]
+    before = threading.active_count()
+    probes = [scheduler.watch(transport, f"host-{i}", interval=0.1) for i, transport in enumerate(transports)]
+    time.sleep(0.5)
+    
+    assert threading.active_count() <= before + 1
+    assert all(probe.rtt is not None for probe in probes)
+    assert all(transport.sent for transport in transports)
+    assert scheduler.wakeups <= 12
+    for transport in transports:
+        scheduler.unwatch(transport)
+
+
+def test_keepalive_waits_for_key_exchange():
+    transport = FakeTransport()
+    transport.clear_to_send = threading.Event()
+    probe = KeepaliveProbe(transport, interval=1, count_max=3)
+    start = time.monotonic()
+    assert probe.poll(start, slack=1)
+    assert transport.sent == []
+    
+    assert probe.poll(start + 1)
+    assert probe.failures == 1 and transport.sent == []
+    
+    transport.clear_to_send.set()
+    assert probe.poll(start + 1.5)
+    assert len(transport.sent) == 1
+    assert probe.poll(start + 1.6)
+    assert probe.failures == 0 and probe.rtt is not None
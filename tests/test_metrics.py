@@ -0,0 +1,71 @@
+import pytest
+
+from akidzuki_cli.utils.metrics import MetricsRegistry
+
+
+def _samples(registry: MetricsRegistry, prefix: str):
+    return [line for line in registry.render().splitlines() if line.startswith(prefix)]
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry()
+    histogram = registry.histogram('connect_seconds', 'Connect time', buckets=(1.0, 0.1, 0.5))
+    for value in (0.05, 0.1, 0.3, 0.7, 2.0):
+        histogram.observe(value)
+    
+    assert _samples(registry, 'connect_seconds') == [
+        'connect_seconds_bucket{le="0.1"} 2',
+        'connect_seconds_bucket{le="0.5"} 3',
+        'connect_seconds_bucket{le="1"} 4',
+        'connect_seconds_bucket{le="+Inf"} 5',
+        'connect_seconds_sum 3.15',
+        'connect_seconds_count 5',
+    ]
+
+
+def test_histogram_above_every_bucket_counts_only_in_inf():
+    registry = MetricsRegistry()
+    registry.histogram('connect_seconds', 'Connect time', buckets=(0.1,)).observe(30)
+    
+    assert _samples(registry, 'connect_seconds_bucket') == [
+        'connect_seconds_bucket{le="0.1"} 0',
+        'connect_seconds_bucket{le="+Inf"} 1',
+    ]
+
+
+def test_histogram_labels():
+    registry = MetricsRegistry()
+    histogram = registry.histogram('connect_seconds', 'Connect time', ('host',), buckets=(0.5,))
+    histogram.observe(0.2, host='web')
+    histogram.observe(0.9, host='db "primary"')
+    
+    assert _samples(registry, 'connect_seconds') == [
+        'connect_seconds_bucket{host="web",le="0.5"} 1',
+        'connect_seconds_bucket{host="web",le="+Inf"} 1',
+        'connect_seconds_sum{host="web"} 0.2',
+        'connect_seconds_count{host="web"} 1',
+        'connect_seconds_bucket{host="db \\"primary\\"",le="0.5"} 0',
+        'connect_seconds_bucket{host="db \\"primary\\"",le="+Inf"} 1',
+        'connect_seconds_sum{host="db \\"primary\\""} 0.9',
+        'connect_seconds_count{host="db \\"primary\\""} 1',
+    ]
+
+
+def test_render_header_and_order():
+    registry = MetricsRegistry()
+    registry.gauge('b_up', 'Up').set(1)
+    registry.histogram('a_seconds', 'Latency', buckets=(1,)).observe(0.5)
+    
+    assert registry.render().splitlines()[:3] == [
+        '# HELP a_seconds Latency',
+        '# TYPE a_seconds histogram',
+        'a_seconds_bucket{le="1"} 1',
+    ]
+    assert registry.render().endswith('# TYPE b_up gauge\nb_up 1\n')
+
+
+def test_kind_mismatch():
+    registry = MetricsRegistry()
+    registry.counter('requests_total', 'Requests')
+    with pytest.raises(ValueError):
+        registry.histogram('requests_total', 'Requests')
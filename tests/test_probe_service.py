@@ -0,0 +1,32 @@
+import threading
+import time
+
+from akidzuki_cli.models.connection import SSHConnection
+from akidzuki_cli.services.probe_service import ProbeResult, ProbeService
+
+
+def test_stop_ends_scheduler_and_workers(monkeypatch):
+    release = threading.Event()
+    checked = []
+    
+    def check(target):
+        checked.append(target)
+        release.wait(5)
+        return ProbeResult(True, 1.0, None, time.monotonic())
+    
+    service = ProbeService()
+    monkeypatch.setattr(service, 'check', check)
+    service.set_inventory([SSHConnection(name=f"host-{i}", host=f"10.0.0.{i}") for i in range(50)])
+    before = threading.active_count()
+    service.start()
+    time.sleep(0.5)
+    assert threading.active_count() > before
+    
+    service.stop()
+    release.set()
+    deadline = time.monotonic() + 2
+    while threading.active_count() > before and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert threading.active_count() == before
+    # only the probes already running finished; the rest were cancelled
+    assert len(checked) <= service.concurrency
@@ -0,0 +1,22 @@
+import pytest
+
+from akidzuki_cli.cli import build_parser
+from akidzuki_cli.utils.profiling import normalize_profile_args
+
+
+@pytest.mark.parametrize("argv, profile, command", [
+    (['--profile', 'alloc', 'list'], 'alloc', 'list'),
+    (['list', '--profile', 'alloc'], 'alloc', 'list'),
+    (['--profile=alloc', 'list'], 'alloc', 'list'),
+    (['--profile', 'list'], 'cpu', 'list'),
+    (['list', '--profile'], 'cpu', 'list'),
+    (['--profile'], 'cpu', None),
+    (['list'], None, 'list'),
+])
+def test_profile_argument(argv, profile, command):
+    args = build_parser().parse_args(normalize_profile_args(argv))
+    assert (args.profile, args.command) == (profile, command)
+
+
+def test_arguments_after_double_dash_are_kept():
+    assert normalize_profile_args(['test', '--', '--profile']) == ['test', '--', '--profile']
@@ -0,0 +1,30 @@
+from akidzuki_cli.ssh.recorder import SessionRecorder, read_recording
+from akidzuki_cli.ssh.session import SSHSession
+
+
+class FakeClient:
+    
+    def __init__(self):
+        self.closed = False
+    
+    def close(self):
+        self.closed = True
+
+
+def test_recording_survives_return_to_menu(tmp_path):
+    recorder = SessionRecorder(str(tmp_path / "web.cast.gz"))
+    first = FakeClient()
+    session = SSHSession(first, "web", recorder=recorder)
+    recorder.start()
+    recorder.record_output(b"before")
+    
+    # Ctrl+B stops the session, picking it from the menu again resumes it
+    session.stop()
+    session.resume(FakeClient())
+    assert recorder.started
+    recorder.record_output(b"after")
+    
+    session.close()
+    assert first.closed
+    _, events = read_recording(str(recorder.path))
+    assert [data for _, _, data in events] == ["before", "after"]
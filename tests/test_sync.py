@@ -0,0 +1,76 @@
+import pytest
+
+from akidzuki_cli.config.manager import ConfigManager
+from akidzuki_cli.models.connection import SSHConnection
+from akidzuki_cli.services.sync_service import SyncService, content_hash
+from akidzuki_cli.utils.export_import import write_connections
+
+
+def _conn(hostname: str) -> SSHConnection:
+    return SSHConnection(name="web", host=hostname)
+
+
+@pytest.fixture
+def sync(tmp_path):
+    config_manager = ConfigManager(str(tmp_path / "config"))
+    source = tmp_path / "inventory.ndjson"
+    
+    def plan(base, local, remote):
+        # each side is a hostname for the single connection "web", or None when it is absent there
+        if local is not None:
+            config_manager.append_connections([_conn(local)])
+        with open(source, 'w', encoding='utf-8') as f:
+            write_connections([_conn(remote)] if remote is not None else [], f)
+        service = SyncService(config_manager)
+        if base is not None:
+            service._save_state({service.source_key(source): {"web": content_hash(_conn(base))}})
+        return service.plan(source)
+    
+    return plan
+
+
+@pytest.mark.parametrize("base, local, remote, action, remote_action", [
+    (None, "a", None, None, None),
+    ("a", "a", None, 'remove', None),
+    ("a", "b", None, 'conflict', 'remove'),
+    (None, "a", "a", None, None),
+    ("a", "b", "a", None, None),
+    ("a", "a", "b", 'update', None),
+    ("a", "b", "c", 'conflict', 'update'),
+    (None, "a", "b", 'conflict', 'update'),
+    (None, None, "a", 'add', None),
+    ("a", None, "a", None, None),
+    ("a", None, "b", 'conflict', 'add'),
+])
+def test_plan(sync, base, local, remote, action, remote_action):
+    plan = sync(base, local, remote)
+    assert plan.first_sync is (base is None)
+    assert not plan.report.errors
+    if action is None:
+        assert plan.changes == []
+    else:
+        [change] = plan.changes
+        assert (change.action, change.name, change.remote_action) == (action, "web", remote_action)
+
+
+def test_plan_counts_untouched_connections(sync):
+    assert sync(None, "a", None).local_only == 1
+
+
+def test_plan_counts_unchanged_connections(sync):
+    assert sync("a", "b", "a").unchanged == 1
+
+
+def test_apply_records_base(tmp_path):
+    config_manager = ConfigManager(str(tmp_path / "config"))
+    source = tmp_path / "inventory.ndjson"
+    with open(source, 'w', encoding='utf-8') as f:
+        write_connections([_conn("a")], f)
+    service = SyncService(config_manager)
+    
+    service.apply(service.plan(source))
+    assert [conn.hostname for conn in config_manager.iter_connections()] == ["a"]
+    
+    plan = service.plan(source)
+    assert not plan.first_sync
+    assert plan.changes == [] and plan.unchanged == 1